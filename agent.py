@@ -1,20 +1,50 @@
+import re
+import time
+from functools import lru_cache
 from typing import TypedDict, Annotated, Literal
 from loguru import logger
 from langchain.chat_models import init_chat_model
 from langgraph.graph import add_messages
 from langchain.messages import (
+    HumanMessage,
+    RemoveMessage,
     SystemMessage,
 )
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, message_chunk_to_message
+from langchain_core.messages.utils import count_tokens_approximately
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import InMemorySaver
 
+from checkpointer import create_checkpointer
+from metrics import Histogram
+from phases import CLOSING, INTRODUCTION, TECHNICAL, phase_schedule
 from settings import settings
-from prompts import SYSTEM_PROMPT, TECHNICAL_PHASE_PROMPT, CLOSING_PROMPT
+from prompts import (
+    SYSTEM_PROMPT,
+    INTRODUCTION_PHASE_PROMPT,
+    TECHNICAL_PHASE_PROMPT,
+    CLOSING_PROMPT,
+    TIME_STATUS_PROMPT,
+    HISTORY_SUMMARY_PROMPT,
+    HISTORY_SUMMARY_CONTEXT,
+)
 
 
 model = init_chat_model(model=settings.LLM_MODEL_NAME, model_provider="openai", temperature=0, api_key=settings.OPENAI_API_KEY)
-    
+# Small low-latency model for turns that need no evaluation (see route_turn)
+fast_model = (
+    init_chat_model(model=settings.LLM_FAST_MODEL_NAME, model_provider="openai", temperature=0, api_key=settings.OPENAI_API_KEY)
+    if settings.LLM_FAST_MODEL_NAME else None
+)
+
+FULL_TIER = "full"
+FAST_TIER = "fast"
+
+llm_latency_seconds = Histogram(
+    "llm_latency_seconds",
+    "First-token and total latency of agent replies, by model tier.",
+    labelnames=("tier", "phase"),
+)
+
 
 class AgentState(TypedDict):
     messages: Annotated[list[BaseMessage], add_messages]
@@ -22,80 +52,223 @@ class AgentState(TypedDict):
     resume: str
     duration: int
     time_left: int
+    phase: str  # interview phase from the session clock (see phases.py)
+    replied_phase: str  # phase of the latest agent reply
+    agent_speaking: bool  # the candidate's turn started while the agent was still talking
+    summary: str  # rolling summary of turns dropped from `messages`
 
 
-async def call_llm(state: AgentState):
-    """Call the LLM with the given messages."""
+async def _stream_reply(messages: list[BaseMessage], tier: str = FULL_TIER) -> BaseMessage:
+    """
+    Stream the model reply token by token and return the aggregated message.
 
-    response = await model.ainvoke(
-        [
-            SystemMessage(
-                content=SYSTEM_PROMPT.format(JOB_DESCRIPTION=state["job_description"],
-                                             RESUME_DATA=state.get("resume", "N/A"),
-                                             DURATION = state["duration"],
-                                             TIME_LEFT = state["time_left"])
-            )
-        ]
-        + state["messages"]
-    )
-    return {"messages": response.content}
+    Streaming (rather than ainvoke) lets `agent.astream(stream_mode="messages")`
+    surface each token as soon as it is generated, so TTS can start on the
+    first clause instead of waiting for the whole completion.
+    """
+    llm = fast_model if tier == FAST_TIER else model
+    started = time.monotonic()
+    response = None
+    async for chunk in llm.astream(messages):
+        if response is None:
+            llm_latency_seconds.observe(time.monotonic() - started, tier=tier, phase="first_token")
+        response = chunk if response is None else response + chunk
+    llm_latency_seconds.observe(time.monotonic() - started, tier=tier, phase="total")
+    return message_chunk_to_message(response)
 
-async def technical_phase(state: AgentState):
-    """ Call the LLM with the given messages."""
 
-    response = await model.ainvoke(
-        [
-            SystemMessage(content=TECHNICAL_PHASE_PROMPT.format(JOB_DESCRIPTION=state["job_description"],
-                                             RESUME_DATA=state.get("resume", "N/A"),
-                                             DURATION = state["duration"],
-                                             TIME_LEFT = state["time_left"]))
-        ]
+def _minutes(seconds: int) -> str:
+    """Render a duration sent by the client (in seconds) as minutes for the prompt."""
+    return f"{seconds / 60:.1f}".rstrip("0").rstrip(".")
+
+
+@lru_cache(maxsize=256)
+def _session_prompt(job_description: str, resume: str, duration: int) -> SystemMessage:
+    """
+    Render the per-session system prefix once.
+
+    The result only depends on inputs that are fixed for the whole interview,
+    so it is memoized and stays byte-identical across turns for prompt caching.
+    """
+    return SystemMessage(content=SYSTEM_PROMPT.format(JOB_DESCRIPTION=job_description,
+                                                      RESUME_DATA=resume,
+                                                      DURATION=_minutes(duration)))
+
+
+# Phase instructions, rendered once for every session
+_PHASE_PROMPTS = {
+    INTRODUCTION: SystemMessage(content=INTRODUCTION_PHASE_PROMPT),
+    TECHNICAL: SystemMessage(content=TECHNICAL_PHASE_PROMPT),
+    CLOSING: SystemMessage(content=CLOSING_PROMPT),
+}
+
+
+def _build_prompt(state: AgentState, phase: str) -> list[BaseMessage]:
+    """
+    Assemble the model input: stable session prefix, phase instructions,
+    summary of older turns, recent history, then the volatile time status as
+    a trailing message.
+    """
+    prefix = [
+        _session_prompt(state["job_description"], state.get("resume", "N/A"), state["duration"]),
+        _PHASE_PROMPTS[phase],
+    ]
+    if state.get("summary"):
+        prefix.append(SystemMessage(content=HISTORY_SUMMARY_CONTEXT.format(SUMMARY=state["summary"])))
+
+    return (
+        prefix
         + state["messages"]
+        + [
+            SystemMessage(content=TIME_STATUS_PROMPT.format(TIME_LEFT=_minutes(state["time_left"]),
+                                                            DURATION=_minutes(state["duration"])))
+        ]
     )
-    return {"messages": response.content}   
 
-async def end_session(state: AgentState):
 
-    """ Bring the session to a close when the time is almost up"""
+def _fold_point(messages: list[BaseMessage]) -> int:
+    """
+    Number of leading messages to fold into the summary (0 below the budget).
 
+    Compaction starts above HISTORY_TOKEN_BUDGET and removes the oldest
+    exchanges until the rest fits HISTORY_TOKEN_LOW_WATER, so it does not run
+    again on the very next turn. The last HISTORY_KEEP_TURNS exchanges are
+    always kept, and the kept history starts on a candidate message.
+    """
+    keep = 2 * settings.HISTORY_KEEP_TURNS
+    if len(messages) <= keep or count_tokens_approximately(messages) <= settings.HISTORY_TOKEN_BUDGET:
+        return 0
+
+    sizes = [count_tokens_approximately([message]) for message in messages]
+    remaining = sum(sizes)
+    cut = 0
+    while cut < len(messages) - keep and remaining > settings.HISTORY_TOKEN_LOW_WATER:
+        remaining -= sizes[cut]
+        cut += 1
+    while cut < len(messages) - keep and messages[cut].type != "human":
+        cut += 1
+    return cut
+
+
+async def compact_history(state: AgentState) -> dict:
+    """
+    Fold older turns of a long interview into the rolling summary.
+
+    Returns the state update (new summary and RemoveMessage for each folded
+    message), or an empty dict when the history is within budget. It makes a
+    model call, so it runs in the background between turns rather than in the
+    graph, and the caller applies the update with the next turn's input.
+    """
+    messages = state.get("messages", [])
+    folded = messages[:_fold_point(messages)]
+    if not folded:
+        return {}
+
+    transcript = "\n".join(
+        f"{'Interviewer' if message.type == 'ai' else 'Candidate'}: {message.text}"
+        for message in folded
+    )
     response = await model.ainvoke(
-        [
-            SystemMessage(
-                content=CLOSING_PROMPT.format(JOB_DESCRIPTION=state["job_description"],
-                                             RESUME_DATA=state.get("resume", "N/A"),
-                                             DURATION = state["duration"],
-                                             TIME_LEFT = state["time_left"])
-            )
-        ]
-        + state["messages"]
+        [HumanMessage(content=HISTORY_SUMMARY_PROMPT.format(SUMMARY=state.get("summary") or "None yet.",
+                                                             TRANSCRIPT=transcript,
+                                                             MAX_WORDS=settings.HISTORY_SUMMARY_MAX_WORDS))],
+        # keep the summary out of stream_mode="messages" so it is never spoken
+        config={"tags": ["nostream"]},
     )
-    return {"messages": response.content}
+    logger.info(f"Compacted {len(folded)} messages into the history summary")
 
-async def check_time(state: AgentState) -> Literal["end_session", "technical_phase", "call_llm"]:
-    """ Check if the time is almost up"""
-    if state["time_left"] <= 60:
-        return "end_session"
-    elif 60 < state["time_left"] <= 0.9 * state['duration']:
-        return "technical_phase"
-    else:
-        return "call_llm"
+    return {
+        "summary": response.text,
+        "messages": [RemoveMessage(id=message.id) for message in folded],
+    }
 
-graph_builder = StateGraph(AgentState)
-graph_builder.add_node("call_llm", call_llm)
-graph_builder.add_node("technical_phase", technical_phase)
-graph_builder.add_node("end_session", end_session)
+
+def _phase(state: AgentState) -> str:
+    """The phase set by the caller's session clock, or derived from `time_left` if absent."""
+    return state.get("phase") or phase_schedule(state["duration"]).phase(state["time_left"])
+
+
+# Candidate turns the fast model can answer: requests to repeat or clarify,
+# and listening tokens said over the agent. Short answers such as "yes", "no"
+# or "sure" usually answer a question and need the full model.
+_CLARIFICATION = re.compile(
+    r"\b(repeat|say (that|it) again|come again|pardon|rephrase|clarify|what do you mean"
+    r"|didn'?t (catch|hear|get) (that|it|you)|can you hear me)\b"
+)
+_BACKCHANNEL = re.compile(r"((ok|okay|alright|all right|got it|i see|mm ?hmm|mhm|uh ?huh|hmm) ?)+")
+
+
+def classify_turn(text: str, agent_speaking: bool = False) -> str:
+    """
+    Model tier for a candidate turn, from its transcript alone (no model call).
+
+    Backchannels only count when the candidate said them while the agent was
+    still talking; after the agent has finished, "okay" is an answer.
+    """
+    words = re.sub(r"[^\w\s']", " ", text.lower()).split()
+    if not words or len(words) > settings.LLM_FAST_TURN_MAX_WORDS:
+        return FULL_TIER
+    normalized = " ".join(words)
+    if _CLARIFICATION.search(normalized) or (agent_speaking and _BACKCHANNEL.fullmatch(normalized)):
+        return FAST_TIER
+    return FULL_TIER
+
+
+def route_turn(state: AgentState) -> Literal["respond", "acknowledge"]:
+    """
+    Send short acknowledgements and clarification requests to the fast model.
+
+    The first reply of each phase always uses the full model, since it has to
+    follow the phase's transition directive.
+    """
+    if fast_model is None or state.get("replied_phase") != _phase(state):
+        return "respond"
+    last = state["messages"][-1] if state["messages"] else None
+    if isinstance(last, HumanMessage) and classify_turn(last.text, state.get("agent_speaking", False)) == FAST_TIER:
+        return "acknowledge"
+    return "respond"
 
 
+async def respond(state: AgentState):
+    """Reply in the current interview phase."""
+
+    phase = _phase(state)
+    response = await _stream_reply(_build_prompt(state, phase))
+    return {"messages": [response], "replied_phase": phase}
+
+
+async def acknowledge(state: AgentState):
+    """Reply to a short turn with the fast model."""
+
+    phase = _phase(state)
+    response = await _stream_reply(_build_prompt(state, phase), tier=FAST_TIER)
+    return {"messages": [response], "replied_phase": phase}
+
+
+async def opening_reply(state: AgentState) -> BaseMessage:
+    """
+    Produce the agent's reply to the opening trigger without touching any thread.
+
+    The reply can later be written into a thread with
+    `agent.aupdate_state(..., as_node=RESPOND_NODE)`.
+    """
+    return await model.ainvoke(_build_prompt(state, _phase(state)), config={"tags": ["nostream"]})
+
+
+RESPOND_NODE = "respond"
+
+graph_builder = StateGraph(AgentState)
+graph_builder.add_node(RESPOND_NODE, respond)
+graph_builder.add_node("acknowledge", acknowledge)
+
 graph_builder.add_conditional_edges(
     START,
-    check_time,
-    {"call_llm": "call_llm",
-     "technical_phase": "technical_phase",
-     "end_session": "end_session"}
+    route_turn,
+    {RESPOND_NODE: RESPOND_NODE,
+     "acknowledge": "acknowledge"}
 )
+graph_builder.add_edge(RESPOND_NODE, END)
+graph_builder.add_edge("acknowledge", END)
 
-graph_builder.add_edge("call_llm", END)
-graph_builder.add_edge("technical_phase", END)
-graph_builder.add_edge("end_session", END)
-
-agent = graph_builder.compile(checkpointer=InMemorySaver())
\ No newline at end of file
+checkpointer = create_checkpointer()
+agent = graph_builder.compile(checkpointer=checkpointer)
\ No newline at end of file
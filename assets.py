@@ -0,0 +1,63 @@
+"""
+Docstring for assets
+
+Content-addressed storage for session inputs (job descriptions, parsed resumes).
+
+Clients upload these once over REST and reference them by ID in the WebSocket
+init message, which keeps large payloads off the latency-critical socket and
+lets repeat sessions start instantly.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Generic, Optional, TypeVar
+
+from settings import settings
+
+
+V = TypeVar("V")
+
+
+def content_id(data: bytes) -> str:
+    """Content hash used as the ID of an uploaded asset."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ContentStore(Generic[V]):
+    """Bounded LRU mapping of content IDs to values; `on_evict` sees each dropped value."""
+
+    def __init__(self, max_items: int, on_evict: Optional[Callable[[str, V], None]] = None):
+        self.max_items = max_items
+        self.on_evict = on_evict
+        self._items: OrderedDict[str, V] = OrderedDict()
+
+    def get(self, key: str) -> Optional[V]:
+        if key not in self._items:
+            return None
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def put(self, key: str, value: V) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            evicted = self._items.popitem(last=False)
+            if self.on_evict:
+                self.on_evict(*evicted)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+
+job_descriptions: ContentStore[str] = ContentStore(settings.ASSET_CACHE_SIZE)
+
+
+def store_job_description(text: str) -> str:
+    """Store a job description and return its ID."""
+    key = content_id(text.encode("utf-8"))
+    job_descriptions.put(key, text)
+    return key
+
+
+def get_job_description(job_description_id: str) -> Optional[str]:
+    return job_descriptions.get(job_description_id)
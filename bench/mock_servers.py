@@ -0,0 +1,223 @@
+"""
+Docstring for mock_servers
+
+Local stand-ins for the speech vendors, for benchmarking without live services.
+
+A single WebSocket server routes on the request path:
+    /v2/listen                         Deepgram Flux STT (TurnInfo protocol)
+    /v1/speak                          Deepgram Aura TTS (Speak/Flush/Clear)
+    /v1/text-to-speech/{voice}/stream-input   ElevenLabs stream-input TTS
+
+Point the app at it with DEEPGRAM_BASE_URL / ELEVENLABS_BASE_URL.
+"""
+
+import asyncio
+import base64
+import contextlib
+import json
+import math
+import struct
+from dataclasses import dataclass
+from urllib.parse import parse_qs, urlparse
+
+from loguru import logger
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+
+@dataclass
+class MockConfig:
+    """Delays and sizes that shape the simulated vendor behaviour."""
+    # STT
+    stt_utterance_seconds: float = 1.5  # audio per candidate turn before EndOfTurn
+    stt_update_interval: float = 0.25  # seconds of audio between Update events
+    stt_eot_delay: float = 0.3  # delay between the last audio byte and EndOfTurn
+    stt_transcript: str = "I have been working on distributed systems and real time audio pipelines for about five years"
+    # TTS
+    tts_first_byte_delay: float = 0.15  # delay between Flush and the first audio byte
+    tts_seconds_per_word: float = 0.3  # audio generated per word of text
+    tts_chunk_ms: int = 100  # audio per message
+    tts_realtime_factor: float = 4.0  # how much faster than real time audio is produced
+    tts_sample_rate: int = 24000
+
+
+def tone(sample_rate: int, seconds: float, freq: float = 220.0) -> bytes:
+    """A quiet sine tone as 16-bit little-endian PCM."""
+    n = int(sample_rate * seconds)
+    return struct.pack(f"<{n}h", *(int(3000 * math.sin(2 * math.pi * freq * i / sample_rate)) for i in range(n)))
+
+
+class MockVendorServer:
+    """WebSocket server that speaks the Deepgram and ElevenLabs streaming protocols."""
+
+    def __init__(self, config: MockConfig, host: str = "127.0.0.1", port: int = 8766):
+        self.config = config
+        self.host = host
+        self.port = port
+        self._server = None
+        self._pcm = tone(config.tts_sample_rate, 1.0)
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        self._server = await serve(self._route, self.host, self.port, max_size=None)
+        logger.info(f"Mock vendor server listening on {self.url}")
+
+    async def close(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _route(self, ws: ServerConnection) -> None:
+        path = urlparse(ws.request.path)
+        query = {k: v[0] for k, v in parse_qs(path.query).items()}
+        try:
+            if path.path.startswith("/v2/listen"):
+                await self._deepgram_listen(ws, query)
+            elif path.path.startswith("/v1/speak"):
+                await self._deepgram_speak(ws)
+            elif path.path.startswith("/v1/text-to-speech/") and path.path.endswith("/stream-input"):
+                await self._elevenlabs_stream_input(ws)
+            else:
+                await ws.close(code=4004, reason="unknown path")
+        except ConnectionClosed:
+            pass
+
+    # ------------------------------------------------------------------ STT
+
+    async def _deepgram_listen(self, ws: ServerConnection, query: dict) -> None:
+        cfg = self.config
+        bytes_per_second = int(query.get("sample_rate", 16000)) * 2
+        utterance_bytes = int(cfg.stt_utterance_seconds * bytes_per_second)
+        update_bytes = int(cfg.stt_update_interval * bytes_per_second)
+        words = cfg.stt_transcript.split()
+        eager = "eager_eot_threshold" in query
+
+        await ws.send(json.dumps({"type": "Connected"}))
+
+        turn_index = 0
+        received = 0
+        next_update = update_bytes
+
+        def turn_info(event: str, transcript: str, confidence: float) -> str:
+            return json.dumps({
+                "type": "TurnInfo",
+                "event": event,
+                "turn_index": turn_index,
+                "transcript": transcript,
+                "end_of_turn_confidence": confidence,
+            })
+
+        async def end_of_turn(index: int) -> None:
+            await asyncio.sleep(cfg.stt_eot_delay)
+            with contextlib.suppress(ConnectionClosed):
+                await ws.send(json.dumps({
+                    "type": "TurnInfo",
+                    "event": "EndOfTurn",
+                    "turn_index": index,
+                    "transcript": cfg.stt_transcript,
+                    "end_of_turn_confidence": 0.95,
+                }))
+
+        pending: set[asyncio.Task] = set()
+        try:
+            async for message in ws:
+                if isinstance(message, str):
+                    if json.loads(message).get("type") == "CloseStream":
+                        break
+                    continue
+
+                if received == 0:
+                    await ws.send(turn_info("StartOfTurn", "", 0.0))
+                received += len(message)
+
+                if received >= utterance_bytes:
+                    if eager:
+                        # Flux reports a likely end of turn before its final EndOfTurn
+                        await ws.send(turn_info("EagerEndOfTurn", cfg.stt_transcript, 0.8))
+                    task = asyncio.create_task(end_of_turn(turn_index))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                    turn_index += 1
+                    received = 0
+                    next_update = update_bytes
+
+                elif received >= next_update:
+                    progress = received / utterance_bytes
+                    partial = " ".join(words[: max(1, int(len(words) * progress))])
+                    await ws.send(turn_info("Update", partial, round(progress * 0.9, 2)))
+                    next_update += update_bytes
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # ------------------------------------------------------------------ TTS
+
+    async def _synthesize(self, text: str):
+        """Yield PCM chunks for `text`, paced like a streaming TTS vendor."""
+        cfg = self.config
+        await asyncio.sleep(cfg.tts_first_byte_delay)
+        seconds = max(1, len(text.split())) * cfg.tts_seconds_per_word
+        total = int(seconds * cfg.tts_sample_rate) * 2
+        chunk = int(cfg.tts_sample_rate * cfg.tts_chunk_ms / 1000) * 2
+        sent = 0
+        while sent < total:
+            size = min(chunk, total - sent)
+            offset = sent % (len(self._pcm) - size)
+            yield self._pcm[offset:offset + size]
+            sent += size
+            await asyncio.sleep(cfg.tts_chunk_ms / 1000 / cfg.tts_realtime_factor)
+
+    async def _deepgram_speak(self, ws: ServerConnection) -> None:
+        queue: asyncio.Queue[str] = asyncio.Queue()
+
+        async def worker() -> None:
+            while True:
+                text = await queue.get()
+                async for pcm in self._synthesize(text):
+                    await ws.send(pcm)
+                await ws.send(json.dumps({"type": "Flushed"}))
+
+        worker_task = asyncio.create_task(worker())
+        buffer: list[str] = []
+        try:
+            async for message in ws:
+                data = json.loads(message)
+                kind = data.get("type")
+                if kind == "Speak":
+                    buffer.append(data.get("text", ""))
+                elif kind == "Flush":
+                    if buffer:
+                        queue.put_nowait("".join(buffer))
+                    buffer = []
+                elif kind == "Clear":
+                    buffer = []
+                    while not queue.empty():
+                        queue.get_nowait()
+                    worker_task.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await worker_task
+                    worker_task = asyncio.create_task(worker())
+                    await ws.send(json.dumps({"type": "Cleared"}))
+                elif kind == "Close":
+                    break
+        finally:
+            worker_task.cancel()
+
+    async def _elevenlabs_stream_input(self, ws: ServerConnection) -> None:
+        buffer: list[str] = []
+        async for message in ws:
+            data = json.loads(message)
+            text = data.get("text")
+            if text == "":
+                # end of stream
+                break
+            if text and text != " ":
+                buffer.append(text)
+            if data.get("flush") and buffer:
+                async for pcm in self._synthesize("".join(buffer)):
+                    await ws.send(json.dumps({"audio": base64.b64encode(pcm).decode("ascii"), "isFinal": None}))
+                buffer = []
+                await ws.send(json.dumps({"isFinal": True}))
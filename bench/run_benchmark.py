@@ -0,0 +1,298 @@
+"""
+Docstring for run_benchmark
+
+End-to-end latency benchmark for the voice pipeline.
+
+Starts the mock vendor servers, swaps the agent's chat model for a fake one,
+serves the real FastAPI app in-process and drives N concurrent simulated
+candidates through /ws. Reports per-stage and end-to-end latency percentiles.
+
+Usage (from the repository root):
+    python -m bench.run_benchmark --sessions 20 --turns 3
+    python -m bench.run_benchmark --sessions 50 --output bench_output.json
+    python -m bench.run_benchmark --speculative
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from bench.mock_servers import MockConfig, MockVendorServer, tone
+from events import FRAME_HEADER
+
+
+STT_SAMPLE_RATE = 16000
+UPLINK_CHUNK_SECONDS = 0.1
+# silence sent right after init, as a browser does once its microphone opens;
+# the server's pipeline (and so the greeting) starts on the first uplink message
+MIC_OPEN_SECONDS = 0.02
+
+# Stage name -> (start mark, end mark) of a turn
+STAGES = {
+    "stt": ("speech_end", "stt_output"),
+    "llm_first_token": ("stt_output", "agent_chunk"),
+    "tts_first_byte": ("agent_chunk", "tts_first"),
+    "voice_to_voice": ("speech_end", "tts_first"),
+    "reply_complete": ("speech_end", "tts_last"),
+    "greeting": ("connected", "tts_first"),
+}
+
+
+@dataclass
+class TurnTimings:
+    """Client-side receive times (perf_counter seconds) for one agent turn."""
+    marks: dict[str, float] = field(default_factory=dict)
+
+    def mark(self, name: str, ts: Optional[float] = None) -> None:
+        self.marks.setdefault(name, ts if ts is not None else time.perf_counter())
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(turns: list[TurnTimings]) -> dict[str, dict[str, float]]:
+    samples: dict[str, list[float]] = defaultdict(list)
+    rejected: dict[str, int] = defaultdict(int)
+    for turn in turns:
+        for stage, (start, end) in STAGES.items():
+            if start in turn.marks and end in turn.marks:
+                latency = (turn.marks[end] - turn.marks[start]) * 1000
+                if latency < 0:
+                    # the marks were attributed to the wrong turn; never average these in
+                    rejected[stage] += 1
+                    continue
+                samples[stage].append(latency)
+
+    report = {
+        stage: {
+            "n": len(values),
+            "p50": percentile(values, 50),
+            "p90": percentile(values, 90),
+            "p99": percentile(values, 99),
+            "max": max(values),
+        }
+        for stage, values in samples.items()
+    }
+    for stage, count in rejected.items():
+        report.setdefault(stage, {"n": 0})["rejected"] = count
+    return report
+
+
+def print_report(report: dict[str, dict[str, float]]) -> None:
+    print(f"{'stage':<18}{'n':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage in STAGES:
+        if not report.get(stage, {}).get("n"):
+            continue
+        row = report[stage]
+        print(f"{stage:<18}{row['n']:>6}{row['p50']:>10.1f}{row['p90']:>10.1f}{row['p99']:>10.1f}{row['max']:>10.1f}")
+    for stage in STAGES:
+        if report.get(stage, {}).get("rejected"):
+            print(f"  warning: {report[stage]['rejected']} negative {stage} samples rejected")
+
+
+class SimulatedCandidate:
+    """One candidate: connects, listens to the greeting, then speaks `turns` times."""
+
+    def __init__(self, url: str, args: argparse.Namespace, config: MockConfig):
+        self.url = url
+        self.args = args
+        self.config = config
+        self.turns: list[TurnTimings] = []
+        self._events: asyncio.Queue[tuple[float, str, Optional[int]]] = asyncio.Queue()
+        # candidate turns (greeting included) waiting for the server to open their agent turn
+        self._awaiting: deque[TurnTimings] = deque()
+        # agent turn id -> the candidate turn it answers
+        self._by_agent_turn: dict[int, TurnTimings] = {}
+        self._agent_turns = 0  # agent turns the server has opened so far
+
+    async def _receive(self, ws) -> None:
+        async for message in ws:
+            ts = time.perf_counter()
+            if isinstance(message, bytes):
+                # only TTS audio is sent as binary frames
+                turn_id = FRAME_HEADER.unpack_from(message)[2]
+                self._events.put_nowait((ts, "tts_chunk", turn_id))
+            else:
+                data = json.loads(message)
+                self._events.put_nowait((ts, data.get("type", ""), data.get("turn_id")))
+
+    def _record(self, ts: float, kind: str, turn_id: Optional[int]) -> None:
+        """Attribute one server event to the candidate turn it belongs to."""
+        if kind in ("stt_output", "agent_trigger"):
+            # the server opens agent turns 1, 2, 3... in order, one per transcript or trigger
+            self._agent_turns += 1
+            if self._awaiting:
+                turn = self._awaiting.popleft()
+                self._by_agent_turn[self._agent_turns] = turn
+                turn.mark("stt_output", ts)
+            return
+
+        turn = self._by_agent_turn.get(turn_id) if turn_id is not None else None
+        if turn is None:
+            return
+        if kind == "agent_chunk":
+            turn.mark("agent_chunk", ts)
+        elif kind == "agent_end":
+            turn.mark("agent_end", ts)
+        elif kind == "tts_chunk":
+            turn.mark("tts_first", ts)
+            turn.marks["tts_last"] = ts
+
+    async def _collect_reply(self, turn: TurnTimings) -> None:
+        """Consume events until the agent has finished speaking `turn`'s reply."""
+        deadline = time.perf_counter() + self.args.turn_timeout
+        while True:
+            # once the reply text is complete, a quiet period means the audio is done too
+            done = "agent_end" in turn.marks and "tts_last" in turn.marks
+            timeout = self.args.quiet_period if done else deadline - time.perf_counter()
+            try:
+                event = await asyncio.wait_for(self._events.get(), timeout=max(0.0, timeout))
+            except asyncio.TimeoutError:
+                return
+            self._record(*event)
+
+    async def _speak(self, ws) -> float:
+        """Send one utterance in real time and return when its last byte left."""
+        # loud enough to pass the server's silence gate
+        chunk = tone(STT_SAMPLE_RATE, UPLINK_CHUNK_SECONDS)
+        remaining = int(self.config.stt_utterance_seconds * STT_SAMPLE_RATE) * 2
+        while remaining > 0:
+            data = chunk[:remaining]
+            await ws.send(data)
+            remaining -= len(data)
+            if remaining > 0:
+                await asyncio.sleep(UPLINK_CHUNK_SECONDS)
+        return time.perf_counter()
+
+    async def run(self) -> None:
+        import websockets
+
+        async with websockets.connect(self.url, max_size=None) as ws:
+            receiver = asyncio.create_task(self._receive(ws))
+            try:
+                greeting = TurnTimings()
+                self._awaiting.append(greeting)
+                greeting.mark("connected")
+                await ws.send(json.dumps({
+                    "type": "init",
+                    "job_description": "Senior backend engineer, Python, real-time systems.",
+                    "duration": self.args.duration,
+                    "time_left": self.args.duration,
+                    "audio_transport": "json" if self.args.json_audio else "binary",
+                }))
+                await ws.send(bytes(int(MIC_OPEN_SECONDS * STT_SAMPLE_RATE) * 2))
+                await self._collect_reply(greeting)
+                self.turns.append(greeting)
+
+                for _ in range(self.args.turns):
+                    turn = TurnTimings()
+                    self._awaiting.append(turn)
+                    turn.mark("speech_end", await self._speak(ws))
+                    await self._collect_reply(turn)
+                    self.turns.append(turn)
+                await ws.send(json.dumps({"type": "end"}))
+            finally:
+                receiver.cancel()
+
+
+def _configure_environment(mock_url: str, speculative: bool = False) -> None:
+    """Point the app at the mock vendors before any app module reads settings."""
+    os.environ.update({
+        "SPECULATIVE_LLM": "true" if speculative else "false",
+        "DEEPGRAM_API_KEY": "mock",
+        "DEEPGRAM_BASE_URL": mock_url,
+        "ELEVENLABS_API_KEY": "mock",
+        "ELEVENLABS_BASE_URL": mock_url,
+        "OPENAI_API_KEY": "mock",
+        "ENVIRONMENT": "benchmark",
+    })
+
+
+async def main(args: argparse.Namespace) -> None:
+    config = MockConfig(
+        stt_utterance_seconds=args.utterance_seconds,
+        stt_eot_delay=args.stt_eot_delay,
+        tts_first_byte_delay=args.tts_first_byte_delay,
+    )
+    mock = MockVendorServer(config, port=args.mock_port)
+    _configure_environment(mock.url, args.speculative)
+    await mock.start()
+
+    import uvicorn
+    import agent as agent_module
+    from bench.fake_llm import FakeStreamingChatModel
+
+    agent_module.model = FakeStreamingChatModel(
+        first_token_delay=args.llm_first_token_delay,
+        token_delay=args.llm_token_delay,
+    )
+    if agent_module.fast_model is not None:
+        # LLM_FAST_MODEL_NAME is set: stub the fast tier too, never call the real API
+        agent_module.fast_model = FakeStreamingChatModel(
+            first_token_delay=args.llm_fast_first_token_delay,
+            token_delay=args.llm_token_delay,
+        )
+
+    import main as app_module
+
+    server = uvicorn.Server(uvicorn.Config(app_module.app, host="127.0.0.1", port=args.port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    url = f"ws://127.0.0.1:{args.port}/ws"
+    candidates = [SimulatedCandidate(url, args, config) for _ in range(args.sessions)]
+    started = time.perf_counter()
+    results = await asyncio.gather(*(c.run() for c in candidates), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    failures = [r for r in results if isinstance(r, Exception)]
+    turns = [turn for c in candidates for turn in c.turns]
+    report = summarize(turns)
+
+    print(f"\n{args.sessions} sessions, {args.turns} turns each, {len(failures)} failed, {elapsed:.1f}s wall clock\n")
+    print_report(report)
+    for failure in failures[:5]:
+        print(f"  failure: {failure!r}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "mock": asdict(config), "failures": len(failures), "stages": report}, f, indent=2)
+
+    server.should_exit = True
+    await server_task
+    await mock.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Voice pipeline latency benchmark against local mock vendors")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent simulated candidates")
+    parser.add_argument("--turns", type=int, default=3, help="candidate turns per session after the greeting")
+    parser.add_argument("--duration", type=int, default=600, help="interview duration in seconds")
+    parser.add_argument("--port", type=int, default=8765, help="port for the app under test")
+    parser.add_argument("--mock-port", type=int, default=8766, help="port for the mock vendor server")
+    parser.add_argument("--utterance-seconds", type=float, default=1.5)
+    parser.add_argument("--stt-eot-delay", type=float, default=0.3)
+    parser.add_argument("--tts-first-byte-delay", type=float, default=0.15)
+    parser.add_argument("--llm-first-token-delay", type=float, default=0.35)
+    parser.add_argument("--llm-token-delay", type=float, default=0.02)
+    parser.add_argument("--llm-fast-first-token-delay", type=float, default=0.15,
+                        help="time to first token of the fast tier, when LLM_FAST_MODEL_NAME is set")
+    parser.add_argument("--quiet-period", type=float, default=0.5, help="silence after the last audio chunk that ends a turn")
+    parser.add_argument("--turn-timeout", type=float, default=20.0)
+    parser.add_argument("--json-audio", action="store_true", help="use base64-in-JSON audio instead of binary frames")
+    parser.add_argument("--speculative", action="store_true", help="start the agent on high-confidence partial transcripts")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,141 @@
+"""
+Docstring for checkpointer
+
+Conversation checkpointers for the interview graph.
+
+The default LangGraph InMemorySaver keeps every thread forever. This module
+provides a bounded in-memory saver with per-thread TTL and LRU eviction, and an
+optional SQLite-backed saver for sessions that should survive a restart.
+
+The SQLite saver holds an aiosqlite connection, which can only be opened inside
+a running event loop. The graph is therefore compiled with the in-memory saver
+and `sqlite_checkpointer` swaps the SQLite one in from the app's lifespan.
+"""
+
+import contextlib
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Optional
+
+from loguru import logger
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+from settings import settings
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    InMemorySaver that forgets threads once they are idle for too long or once
+    more than `max_threads` conversations are held.
+
+    Every read or write of a thread marks it as recently used. Eviction runs on
+    writes, dropping expired threads first and then the least recently used ones.
+    """
+
+    def __init__(self, max_threads: int = 1000, ttl_seconds: float = 7200, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        # thread_id -> last access (monotonic seconds), oldest first
+        self._last_used: OrderedDict[str, float] = OrderedDict()
+
+    def _touch(self, config: RunnableConfig) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        self._last_used[thread_id] = time.monotonic()
+        self._last_used.move_to_end(thread_id)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        deadline = time.monotonic() - self.ttl_seconds
+        while self._last_used:
+            thread_id, last_used = next(iter(self._last_used.items()))
+            if thread_id == keep:
+                break
+            if last_used > deadline and len(self._last_used) <= self.max_threads:
+                break
+            logger.info(f"Checkpointer: evicting thread {thread_id}")
+            self.delete_thread(thread_id)
+
+    def get_tuple(self, config: RunnableConfig):
+        if self.storage.get(config["configurable"]["thread_id"]):
+            self._touch(config)
+        return super().get_tuple(config)
+
+    async def aget_tuple(self, config: RunnableConfig):
+        return self.get_tuple(config)
+
+    def put(self, config: RunnableConfig, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        self._touch(config)
+        self._evict(keep=config["configurable"]["thread_id"])
+        return result
+
+    async def aput(self, config: RunnableConfig, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config: RunnableConfig, writes, task_id: str, task_path: str = "") -> None:
+        super().put_writes(config, writes, task_id, task_path)
+        self._touch(config)
+
+    async def aput_writes(self, config: RunnableConfig, writes, task_id: str, task_path: str = "") -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._last_used.pop(thread_id, None)
+        super().delete_thread(thread_id)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+
+def create_checkpointer() -> BaseCheckpointSaver:
+    """Build the bounded in-memory saver the graph is compiled with."""
+    return BoundedMemorySaver(max_threads=settings.CHECKPOINT_MAX_THREADS,
+                              ttl_seconds=settings.CHECKPOINT_TTL_SECONDS)
+
+
+@contextlib.asynccontextmanager
+async def sqlite_checkpointer(graph) -> AsyncIterator[Optional[BaseCheckpointSaver]]:
+    """
+    Attach the SQLite saver to a compiled graph for the lifetime of the block.
+
+    Does nothing unless CHECKPOINT_SQLITE_PATH is set and the optional
+    `langgraph-checkpoint-sqlite` package is installed. The graph's previous
+    checkpointer is restored on exit.
+    """
+    if not settings.CHECKPOINT_SQLITE_PATH:
+        yield None
+        return
+    try:
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError:
+        logger.warning("CHECKPOINT_SQLITE_PATH is set but langgraph-checkpoint-sqlite is not installed, "
+                       "falling back to in-memory checkpoints")
+        yield None
+        return
+
+    async with AsyncSqliteSaver.from_conn_string(settings.CHECKPOINT_SQLITE_PATH) as saver:
+        logger.info(f"Checkpointer: using SQLite at {settings.CHECKPOINT_SQLITE_PATH}")
+        previous, graph.checkpointer = graph.checkpointer, saver
+        try:
+            yield saver
+        finally:
+            graph.checkpointer = previous
+
+
+async def release_thread(checkpointer: BaseCheckpointSaver, thread_id: str) -> bool:
+    """
+    Drop a conversation when its session ends. Returns whether it was dropped.
+
+    Threads stored on disk are kept so the session can be resumed later.
+    """
+    if settings.CHECKPOINT_SQLITE_PATH and not isinstance(checkpointer, InMemorySaver):
+        return False
+
+    try:
+        await checkpointer.adelete_thread(thread_id)
+        logger.info(f"Checkpointer: released thread {thread_id}")
+    except Exception as e:
+        logger.error(f"Checkpointer: failed to release thread {thread_id}: {e}")
+    return True
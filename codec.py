@@ -0,0 +1,127 @@
+"""
+Docstring for codec
+
+Opus encoding and decoding for the client audio paths.
+
+When the client negotiates `audio_codec: "opus"`, uplink messages are single
+Opus packets, which are decoded here to 16 kHz PCM for the silence gate and
+STT. Downlink TTS audio is encoded to 24 kHz Opus. Codec work runs on a small
+thread pool so the event loop never blocks on it.
+
+Requires the optional `opuslib` package (bindings to the system libopus);
+without it every session stays on raw PCM.
+"""
+
+import asyncio
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+from settings import settings
+
+_import_error = None
+try:
+    import opuslib
+except Exception as e:  # opuslib raises when libopus itself is missing, not just ImportError
+    opuslib = None
+    _import_error = e
+
+
+CODEC_PCM = "pcm"
+CODEC_OPUS = "opus"
+
+# Frame sizes the encoder steps down through to cover the end of the audio
+# without padding more than 2.5 ms of silence.
+_ENCODE_FRAME_MS = (20, 10, 5, 2.5)
+_PACKET_LENGTH = struct.Struct("<H")
+
+_executor = ThreadPoolExecutor(max_workers=settings.CODEC_WORKERS, thread_name_prefix="opus")
+
+
+def opus_available() -> bool:
+    return opuslib is not None
+
+
+def negotiate_codec(requested: str | None) -> str:
+    """The codec a session uses, given what its client asked for."""
+    if requested != CODEC_OPUS or not settings.OPUS_ENABLED:
+        return CODEC_PCM
+    if not opus_available():
+        logger.warning(f"Client asked for Opus but opuslib is unavailable ({_import_error}), using PCM")
+        return CODEC_PCM
+    return CODEC_OPUS
+
+
+class OpusDecoder:
+    """Decodes the client's uplink Opus packets to 16-bit mono PCM."""
+
+    def __init__(self, sample_rate: int = 16000):
+        self._decoder = opuslib.Decoder(sample_rate, 1)
+        # the longest Opus packet is 120 ms
+        self._max_frame_size = sample_rate * 120 // 1000
+
+    async def decode(self, packet: bytes) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, self._decoder.decode, packet, self._max_frame_size)
+
+
+class OpusEncoder:
+    """
+    Encodes 16-bit mono PCM for the downlink.
+
+    Each chunk becomes a run of 20 ms Opus packets. Each packet is prefixed
+    with its uint16 little-endian length, so one chunk still travels as one
+    WebSocket message. Audio left over at the end of a chunk is carried into
+    the next one instead of being padded, so continuous speech has no gaps.
+    Only the final chunk (or flush()) pads its tail with silence.
+    """
+
+    def __init__(self, sample_rate: int = 24000, bitrate: int = 24000):
+        self.sample_rate = sample_rate
+        self._encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_AUDIO)
+        self._encoder.bitrate = bitrate
+        self._frame_bytes = [int(sample_rate * ms / 1000) * 2 for ms in _ENCODE_FRAME_MS]
+        self._pending = b""  # less than one frame of audio, carried into the next chunk
+
+    @property
+    def pending(self) -> bool:
+        """Whether audio is carried over, waiting for the next chunk or a flush."""
+        return bool(self._pending)
+
+    def reset(self) -> None:
+        """Drop the carried audio, e.g. when the turn it belongs to was interrupted."""
+        self._pending = b""
+
+    def _encode(self, pcm: bytes, final: bool) -> bytes:
+        data = self._pending + pcm if self._pending else pcm
+        out = bytearray()
+        view = memoryview(data)
+        offset = 0
+
+        def emit(frame: bytes) -> None:
+            packet = self._encoder.encode(frame, len(frame) // 2)
+            out.extend(_PACKET_LENGTH.pack(len(packet)))
+            out.extend(packet)
+
+        # mid-stream only whole 20 ms frames go out; the end of the audio steps down
+        for frame_bytes in (self._frame_bytes if final else self._frame_bytes[:1]):
+            while len(data) - offset >= frame_bytes:
+                emit(bytes(view[offset:offset + frame_bytes]))
+                offset += frame_bytes
+
+        if final and offset < len(data):
+            smallest = self._frame_bytes[-1]
+            emit(bytes(view[offset:]) + bytes(smallest - (len(data) - offset)))
+            offset = len(data)
+        self._pending = bytes(view[offset:])
+        return bytes(out)
+
+    async def encode(self, pcm: bytes, final: bool = False) -> bytes:
+        """Packets for the carried audio and `pcm`; with `final`, nothing is carried over."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, self._encode, pcm, final)
+
+    async def flush(self) -> bytes:
+        """Packets for the carried audio, padded with silence; empty if there is none."""
+        return await self.encode(b"", final=True)
@@ -0,0 +1,165 @@
+"""
+Docstring for connection_pool
+
+Process-wide pool of pre-warmed vendor WebSocket connections.
+
+Opening a TLS WebSocket to a speech vendor costs a few hundred milliseconds.
+The pool keeps a small number of authenticated connections open per endpoint so
+new sessions can take one instantly, and replaces sockets that have closed,
+fail a ping, or have been idle for too long.
+
+Connections are handed out, never returned: once a session has used a socket
+it is closed with the session.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from typing import Optional
+
+import websockets
+from loguru import logger
+from websockets.client import WebSocketClientProtocol
+
+
+class ConnectionPool:
+    """Keeps `size` warm WebSocket connections ready for each registered endpoint."""
+
+    def __init__(
+        self,
+        name: str,
+        size: int = 2,
+        max_idle_seconds: float = 60,
+        health_interval: float = 5,
+        ping_timeout: float = 2,
+    ):
+        self.name = name
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+
+        # url -> (headers, idle connections as (ws, opened_at))
+        self._endpoints: dict[str, tuple[dict, deque[tuple[WebSocketClientProtocol, float]]]] = {}
+        self._filling: set[str] = set()
+        self._fill_tasks: set[asyncio.Task] = set()
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    async def _connect(self, url: str, headers: dict) -> WebSocketClientProtocol:
+        return await websockets.connect(url, additional_headers=headers)
+
+    def _is_usable(self, ws: WebSocketClientProtocol, opened_at: float) -> bool:
+        return ws.close_code is None and time.monotonic() - opened_at < self.max_idle_seconds
+
+    def warm(self, url: str, headers: dict) -> None:
+        """Register an endpoint and start filling it in the background."""
+        if not self.enabled:
+            return
+
+        if url not in self._endpoints:
+            self._endpoints[url] = (headers, deque())
+        self._schedule_fill(url)
+
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    def _schedule_fill(self, url: str) -> None:
+        if url in self._filling:
+            return
+        self._filling.add(url)
+        task = asyncio.create_task(self._fill(url))
+        self._fill_tasks.add(task)
+        task.add_done_callback(self._fill_done)
+
+    def _fill_done(self, task: asyncio.Task) -> None:
+        self._fill_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"{self.name} pool: fill task failed: {task.exception()!r}")
+
+    async def _fill(self, url: str) -> None:
+        headers, idle = self._endpoints[url]
+        try:
+            while len(idle) < self.size:
+                try:
+                    ws = await self._connect(url, headers)
+                except Exception as e:
+                    logger.error(f"{self.name} pool: failed to pre-connect: {e}")
+                    return
+                idle.append((ws, time.monotonic()))
+                logger.info(f"{self.name} pool: warm connection ready ({len(idle)}/{self.size})")
+        finally:
+            self._filling.discard(url)
+
+    async def acquire(self, url: str, headers: dict) -> WebSocketClientProtocol:
+        """
+        Take a warm connection for `url`, or open a new one if none is ready.
+        The pool is refilled in the background either way.
+        """
+        if not self.enabled:
+            return await self._connect(url, headers)
+
+        self.warm(url, headers)
+        _, idle = self._endpoints[url]
+        while idle:
+            ws, opened_at = idle.popleft()
+            if self._is_usable(ws, opened_at):
+                self._schedule_fill(url)
+                return ws
+            await self._discard(ws)
+
+        self._schedule_fill(url)
+        return await self._connect(url, headers)
+
+    async def _discard(self, ws: WebSocketClientProtocol) -> None:
+        with contextlib.suppress(Exception):
+            await ws.close()
+
+    async def _check(self, ws: WebSocketClientProtocol, opened_at: float) -> bool:
+        if not self._is_usable(ws, opened_at):
+            return False
+        try:
+            pong = await ws.ping()
+            await asyncio.wait_for(pong, timeout=self.ping_timeout)
+        except Exception:
+            return False
+        return True
+
+    async def _health_loop(self) -> None:
+        """Periodically drop stale or dead connections and top the pool back up."""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for url, (_, idle) in list(self._endpoints.items()):
+                stale = set()
+                for ws, opened_at in list(idle):
+                    if not await self._check(ws, opened_at):
+                        stale.add(id(ws))
+                        await self._discard(ws)
+                if stale:
+                    # connections may have been acquired or added while we were pinging
+                    remaining = [entry for entry in idle if id(entry[0]) not in stale]
+                    idle.clear()
+                    idle.extend(remaining)
+                self._schedule_fill(url)
+
+    async def close(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+
+        for task in list(self._fill_tasks):
+            task.cancel()
+        await asyncio.gather(*self._fill_tasks, return_exceptions=True)
+        self._filling.clear()
+
+        for _, idle in self._endpoints.values():
+            while idle:
+                ws, _ = idle.popleft()
+                await self._discard(ws)
+        self._endpoints.clear()
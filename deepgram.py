@@ -13,7 +13,7 @@ import asyncio
 from loguru import logger
 import contextlib
 import json
-from typing import AsyncIterator, Optional
+from typing import AsyncIterator, Callable, Optional
 from urllib.parse import urlencode
 
 import base64
@@ -21,9 +21,68 @@ import websockets
 from websockets.client import WebSocketClientProtocol
 from settings import settings
 
+from connection_pool import ConnectionPool
 from events import STTChunkEvent, STTEvent, STTOutputEvent, TTSChunkEvent, InterruptEvent
 
 
+# Process-wide pools of warm, authenticated connections shared by all sessions
+stt_pool = ConnectionPool(
+    "Deepgram STT",
+    size=settings.DEEPGRAM_POOL_SIZE,
+    max_idle_seconds=settings.DEEPGRAM_STT_POOL_MAX_IDLE_SECONDS,
+    health_interval=settings.DEEPGRAM_POOL_HEALTH_INTERVAL,
+)
+tts_pool = ConnectionPool(
+    "Deepgram TTS",
+    size=settings.DEEPGRAM_POOL_SIZE,
+    max_idle_seconds=settings.DEEPGRAM_TTS_POOL_MAX_IDLE_SECONDS,
+    health_interval=settings.DEEPGRAM_POOL_HEALTH_INTERVAL,
+)
+
+
+def _auth_headers() -> dict:
+    return {"Authorization": f"Token {settings.DEEPGRAM_API_KEY}"}
+
+
+def _stt_url(sample_rate: int) -> str:
+    params = {
+        "model": "flux-general-en",            # The model to use (nova-2 is fastest/best)
+        "encoding": "linear16",       # CRITICAL: Tells Deepgram this is raw 16-bit PCM
+        "sample_rate": sample_rate,
+        "eot_threshold": 0.9 # Must match your frontend (e.g., 16000)
+    }
+    if settings.SPECULATIVE_LLM:
+        # Ask Flux for EagerEndOfTurn events so the agent can start early
+        params["eager_eot_threshold"] = settings.SPECULATIVE_EOT_CONFIDENCE
+    return f"{settings.DEEPGRAM_BASE_URL}/v2/listen?{urlencode(params)}"
+
+
+TTS_MODEL = "aura-2-callista-en"  # Aura models are per voice
+TTS_SAMPLE_RATE = 24000
+
+
+def _tts_url() -> str:
+    params = {
+        "model":TTS_MODEL,
+        "encoding":"linear16",
+        "sample_rate":str(TTS_SAMPLE_RATE),
+    }
+    return f"{settings.DEEPGRAM_BASE_URL}/v1/speak?{urlencode(params)}"
+
+
+def warm_pools(sample_rate: int = 16000) -> None:
+    """Start pre-connecting STT and TTS sockets so the first session doesn't pay for it."""
+    if not settings.DEEPGRAM_API_KEY:
+        return
+    stt_pool.warm(_stt_url(sample_rate), _auth_headers())
+    tts_pool.warm(_tts_url(), _auth_headers())
+
+
+async def close_pools() -> None:
+    await stt_pool.close()
+    await tts_pool.close()
+
+
 class DeepgramSTT:
     """Deepgram STT client for streaming transcription."""
 
@@ -79,8 +138,12 @@ class DeepgramSTT:
                                     logger.info(f"Deepgram STT: Final Message: {message}")
                                     yield STTOutputEvent(text=transcript)
 
-                                elif turn == "update" and transcript:
-                                    yield STTChunkEvent(text=transcript)
+                                elif turn in ("Update", "update", "EagerEndOfTurn") and transcript:
+                                    yield STTChunkEvent(
+                                        text=transcript,
+                                        end_of_turn_confidence=message.get("end_of_turn_confidence", 0.0),
+                                        is_eager=turn == "EagerEndOfTurn",
+                                    )
 
                                 else:
                                     pass
@@ -103,6 +166,11 @@ class DeepgramSTT:
         ws = await self._ensure_connection()
         await ws.send(audio_data)
 
+    async def keepalive(self) -> None:
+        """Keep an open connection from timing out while no audio is flowing."""
+        if self._ws and self._ws.close_code is None:
+            await self._ws.send(json.dumps({"type": "KeepAlive"}))
+
     async def close(self) -> None:
         if self._ws and self._ws.close_code is None:
             await self._ws.close()
@@ -117,18 +185,12 @@ class DeepgramSTT:
         if self._ws and self._ws.close_code is None:
             return self._ws
 
-        # Create a new connection
-        params = {
-            "model": "flux-general-en",            # The model to use (nova-2 is fastest/best)
-            "encoding": "linear16",       # CRITICAL: Tells Deepgram this is raw 16-bit PCM
-            "sample_rate": self.sample_rate,
-            "eot_threshold": 0.9 # Must match your frontend (e.g., 16000)
-        }
-        url = f"wss://api.deepgram.com/v2/listen?{urlencode(params)}"
+        # Take a warm connection from the pool (or open a new one)
+        url = _stt_url(self.sample_rate)
         headers = {"Authorization": f"Token {self.api_key}"}
 
         logger.info(f"Deepgram STT: Connecting to {url}")
-        self._ws = await websockets.connect(url, additional_headers=headers)
+        self._ws = await stt_pool.acquire(url, headers)
         logger.info('Deepgram STT: WebSocket connection established.')
 
         self._connection_signal.set()
@@ -145,6 +207,15 @@ class DeepgramTTS:
         self._ws: Optional[WebSocketClientProtocol] = None
         self._connection_signal = asyncio.Event()
         self._close_signal = asyncio.Event()
+        # agent turn whose text was last sent; stamped onto the audio it produces
+        self.turn_id = 0
+        # set by clear() until Deepgram confirms, so in-flight audio is dropped
+        self._discarding = False
+        # what the audio sounds like, for caching it
+        self.voice = self.model = TTS_MODEL
+        self.sample_rate = TTS_SAMPLE_RATE
+        # called when all audio for the last flushed text has been received
+        self.on_flushed: Optional[Callable[[], None]] = None
 
     async def receive_events(self) -> AsyncIterator[bytes]:
         while not self._close_signal.is_set():
@@ -168,13 +239,18 @@ class DeepgramTTS:
             try:
                 async for raw_message in self._ws:
                     if isinstance(raw_message, bytes):
-                        yield TTSChunkEvent(audio_data=raw_message)
+                        if not self._discarding:
+                            yield TTSChunkEvent(audio_data=raw_message, turn_id=self.turn_id)
 
                     elif isinstance(raw_message, str):
                         try:
 
                             meta = json.loads(raw_message)
                             logger.info(f"Deeggram audio metadata {meta}")
+                            if meta.get("type") == "Cleared":
+                                self._discarding = False
+                            elif meta.get("type") == "Flushed" and self.on_flushed and not self._discarding:
+                                self.on_flushed()
                             if "error" in meta:
                                 logger.info(f"Deepgram TTS Error: {meta['error']}")
 
@@ -200,8 +276,11 @@ class DeepgramTTS:
         """
         Clears the internal buffer of text that has not yet been spoken.
         Useful for implementation of barge-in (interruption).
+        Audio still in flight from before the clear is dropped until Deepgram
+        acknowledges it with a Cleared message.
         """
         ws = await self._ensure_connection()
+        self._discarding = True
         await ws.send(json.dumps({"type": "Clear"}))
 
     async def close(self) -> None:
@@ -218,15 +297,9 @@ class DeepgramTTS:
         if self._ws and self._ws.close_code is None:
             return self._ws
         
-        params = {
-            "model":"aura-2-callista-en",
-            "encoding":"linear16",
-            "sample_rate":"24000",
-        }
-
-        url = f"wss://api.deepgram.com/v1/speak?{urlencode(params)}"
+        url = _tts_url()
         headers = {"Authorization": f"Token {self.api_key}"}
-        self._ws = await websockets.connect(uri=url, additional_headers=headers)
+        self._ws = await tts_pool.acquire(url, headers)
 
         self._connection_signal.set()
         return self._ws
@@ -1,6 +1,6 @@
 import asyncio
 
-from typing import AsyncIterator, Optional
+from typing import AsyncIterator, Callable, Optional
 import contextlib
 import json
 from urllib.parse import urlencode
@@ -27,6 +27,14 @@ class ElevenLabsTTS:
         self._ws: Optional[WebSocketClientProtocol] = None
         self._connection_signal = asyncio.Event()
         self._close_signal = asyncio.Event()
+        # agent turn whose text was last sent; stamped onto the audio it produces
+        self.turn_id = 0
+        # what the audio sounds like, for caching it
+        self.voice = voice_id
+        self.model = "eleven_multilingual_v2"
+        self.sample_rate = 24000
+        # called when all audio for the last flushed text has been received
+        self.on_flushed: Optional[Callable[[], None]] = None
 
         self.api_key = settings.ELEVENLABS_API_KEY
         if not self.api_key:
@@ -57,7 +65,8 @@ class ElevenLabsTTS:
                         if isinstance(raw_message, bytes):
                             yield TTSChunkEvent(
                                 audio_data=raw_message,
-                                is_final=True
+                                is_final=True,
+                                turn_id=self.turn_id
                             )
 
                         else:
@@ -65,7 +74,10 @@ class ElevenLabsTTS:
                             if "audio" in message and message["audio"]:
                                 yield TTSChunkEvent(
                                     audio_data=base64.b64decode(message["audio"]),
+                                    turn_id=self.turn_id,
                                 )
+                            if message.get("isFinal") and self.on_flushed:
+                                self.on_flushed()
 
                 except websockets.exceptions.ConnectionClosed:
                     logger.info("ElevenLabs: Websocket connection closed.")
@@ -80,12 +92,25 @@ class ElevenLabsTTS:
 
         await ws.send(json.dumps(payload))
 
+    async def flush(self) -> None:
+        # every send_text already asks ElevenLabs to flush
+        pass
+
+    async def clear(self) -> None:
+        """
+        ElevenLabs has no clear message: drop the socket, and with it any audio
+        still in flight, and reconnect on the next send.
+        """
+        if self._ws and self._ws.close_code is None:
+            await self._ws.close()
+        self._ws = None
+
     async def close(self):
         if self._ws and self._ws.close_code is None:
             await self._ws.close()
 
         self._ws = None
-        self._close_signal.is_set()
+        self._close_signal.set()
     
     async def _ensure_connection(self) -> WebSocketClientProtocol:
         if self._close_signal.is_set():
@@ -95,11 +120,11 @@ class ElevenLabsTTS:
             return self._ws
 
         params = {
-            "model":"eleven_multilingual_v2",
-            "output_format": "pcm_24000",
+            "model":self.model,
+            "output_format": f"pcm_{self.sample_rate}",
         }
 
-        url = (f"wss://api.elevenlabs.io/v1/text-to-speech/{self.voice_id}/stream-input?"
+        url = (f"{settings.ELEVENLABS_BASE_URL}/v1/text-to-speech/{self.voice_id}/stream-input?"
                 f"model_id={params['model']}&"
                 f"output_format={params['output_format']}")
 
@@ -5,55 +5,67 @@ Voice Agent Event Types
 
 This module defines typed dataclasses for all events that flow through the voice
 agent pipeline, including STT events, TTS events, and ASR events.
+
+Events are slotted and frozen: they are allocated for every audio chunk, so
+they carry no per-instance __dict__, and they are never mutated once created.
+Each event captures its own creation time twice: a wall-clock `timestamp` (ms)
+for the client, and a `monotonic_ns` reading for computing latencies between
+events on the server.
 """
 
 
 import base64
-import dataclasses
+import struct
 import time
-from dataclasses import dataclass
-from typing import Literal, Union
+from dataclasses import dataclass, field
+from typing import Callable, ClassVar, Literal, Optional, Union
 
 def _now_ms() -> int:
     "returns current unix timestamp in milliseconds"
     return int(time.time() * 1000)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class UserSpeechEvent:
     """Event representing user speech input"""
     audio_data: bytes # raw PCM audio data
-    type: Literal['user_speech'] = 'user_speech'  
-    timestamp: int = _now_ms()  # event timestamp in ms
+    type: ClassVar[Literal['user_speech']] = 'user_speech'
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class STTChunkEvent:
     """Event representing a partial STT transcription"""
     text: str  # partial transcription text
-    type: Literal['stt_chunk'] = 'stt_chunk'
+    type: ClassVar[Literal['stt_chunk']] = 'stt_chunk'
     is_final: bool = False  # whether this is a final chunk
-    timestamp: int = _now_ms()  # event timestamp in ms
+    end_of_turn_confidence: float = 0.0  # STT's confidence that the speaker has finished
+    is_eager: bool = False  # STT flagged this as an early end-of-turn candidate
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class STTOutputEvent:
     """Event representing a final STT transcription"""
     text: str  # final transcription text
-    type: Literal['stt_output'] = 'stt_output'
-    timestamp: int = _now_ms()  # event timestamp in ms
+    type: ClassVar[Literal['stt_output']] = 'stt_output'
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
 
 
 STTEvent = Union[STTChunkEvent, STTOutputEvent]
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentTriggerEvent:
     """Event indicating the agent has started its response generation"""
     text: str
-    type: Literal['agent_trigger'] = 'agent_trigger'
-    timestamp: int = _now_ms()  # event timestamp in ms
+    type: ClassVar[Literal['agent_trigger']] = 'agent_trigger'
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentChunkEvent:
     """
     Event emitted during agent response generation for streaming text chunks.
@@ -65,19 +77,23 @@ class AgentChunkEvent:
     """
 
     text: str  # text chunk generated by the agent
-    type: Literal['agent_chunk'] = 'agent_chunk'
-    timestamp: int = _now_ms()  # event timestamp in ms
+    type: ClassVar[Literal['agent_chunk']] = 'agent_chunk'
+    turn_id: int = 0  # agent turn this text belongs to
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentEndEvent:
     """Event indicating the agent has completed its response generation"""
     text: str  # optional final text (can be empty)
-    type: Literal['agent_end'] = 'agent_end'
-    timestamp: int = _now_ms()  # event timestamp in ms
+    type: ClassVar[Literal['agent_end']] = 'agent_end'
+    turn_id: int = 0  # agent turn this reply belongs to
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ToolCallEvent:
     """
     Event representing a tool call made by the agent.
@@ -85,10 +101,11 @@ class ToolCallEvent:
     id: str  # unique ID for the tool call
     tool_name: str  # name of the tool being called
     arguments: dict  # arguments passed to the tool
-    type: Literal['tool_call'] = 'tool_call'
-    timestamp: int = _now_ms()  # event timestamp in ms
+    type: ClassVar[Literal['tool_call']] = 'tool_call'
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ToolReturnEvent:
     """
     Event representing the return value from a tool call.
@@ -97,95 +114,151 @@ class ToolReturnEvent:
     id: str  # unique ID for the tool call
     tool_name: str  # name of the tool
     return_value: str  # return value from the tool
-    type: Literal['tool_return'] = 'tool_return'
-    timestamp: int = _now_ms()  # event timestamp in ms
+    type: ClassVar[Literal['tool_return']] = 'tool_return'
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
 
 
 # union of all agent events
 AgentEvent = Union[AgentTriggerEvent, AgentChunkEvent, AgentEndEvent, ToolCallEvent, ToolReturnEvent]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TTSChunkEvent:
     """Event representing a chunk of TTS audio data"""
     audio_data: bytes  # raw PCM audio data
-    type: Literal['tts_chunk'] = 'tts_chunk'
+    type: ClassVar[Literal['tts_chunk']] = 'tts_chunk'
     is_final: bool = False  # whether this is the final chunk
-    timestamp: int = _now_ms()  # event timestamp in ms
+    turn_id: int = 0  # agent turn this audio belongs to
+    is_filler: bool = False  # pre-synthesized filler played while the reply is generated
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
 
+@dataclass(slots=True, frozen=True)
 class InterruptEvent:
     """Event representing an interrupt"""
-    type: Literal['interrupt'] = 'interrupt'
-    timestamp: int = _now_ms()  # event timestamp in ms
-
-
-VoiceAgentEvent = Union[UserSpeechEvent, STTEvent, AgentEvent, TTSChunkEvent, InterruptEvent]
-
-def event_to_dict(event: VoiceAgentEvent) -> dict:
-    """Convert a VoiceAgentEvent to a JSON-serializable dict"""
-    if isinstance(event, UserSpeechEvent):
-        return {
-            "type": event.type,
-            "audio_data": base64.b64encode(event.audio_data).decode('utf-8'),
-            "timestamp": event.timestamp
-        }
-    elif isinstance(event, STTChunkEvent):
-        return {
-            "type": event.type,
-            "text": event.text,
-            "is_final": event.is_final,
-            "timestamp": event.timestamp
-        }
-    elif isinstance(event, STTOutputEvent):
-        return {
-            "type": event.type,
-            "text": event.text,
-            "timestamp": event.timestamp
-        }
-    elif isinstance(event, AgentTriggerEvent):
-        return {
-            "type": event.type,
-            "text": event.text,
-            "timestamp": event.timestamp
-        }
-    elif isinstance(event, AgentChunkEvent):
-        return {
-            "type": event.type,
-            "text": event.text,
-            "timestamp": event.timestamp
-        }
-    elif isinstance(event, AgentEndEvent):
-        return {
-            "type": event.type,
-            "text": event.text,
-            "timestamp": event.timestamp
-        }
-    elif isinstance(event, ToolCallEvent):
-        return {
-            "type": event.type,
-            "id": event.id,
-            "tool_name": event.tool_name,
-            "arguments": event.arguments,
-            "timestamp": event.timestamp
-        }
-    elif isinstance(event, ToolReturnEvent):
-        return {
-            "type": event.type,
-            "id": event.id,
-            "tool_name": event.tool_name,
-            "return_value": event.return_value,
-            "timestamp": event.timestamp
-        }
-    elif isinstance(event, TTSChunkEvent):
-        return {
-            "type": event.type,
-            "audio_data": base64.b64encode(event.audio_data).decode('ascii'),
-            "timestamp": event.timestamp
-        }
-    elif isinstance(event, InterruptEvent):
-        return {
-            "type": event.type,
-            "timestamp": event.timestamp
-        }
-    else:
-        raise ValueError(f"Unknown event type: {type(event)}")
\ No newline at end of file
+    type: ClassVar[Literal['interrupt']] = 'interrupt'
+    turn_id: int = 0  # agent turn being interrupted (stamped by the agent stage)
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
+
+
+@dataclass(slots=True, frozen=True)
+class AudioFlushEvent:
+    """Event telling the client to drop any agent audio it has buffered for a turn"""
+    turn_id: int  # agent turn whose audio must be discarded
+    type: ClassVar[Literal['audio_flush']] = 'audio_flush'
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
+
+
+@dataclass(slots=True, frozen=True)
+class TurnMetricsEvent:
+    """Event carrying the stage latencies of a finished conversational turn"""
+    turn_id: int  # sequential turn number within the session
+    stages_ms: dict  # stage name -> latency in ms
+    type: ClassVar[Literal['turn_metrics']] = 'turn_metrics'
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
+
+
+@dataclass(slots=True, frozen=True)
+class SessionEvent:
+    """Event telling the client which session it is in, so it can reconnect to it"""
+    session_id: str
+    resume_token: str  # secret the client presents to reattach after a dropped socket
+    resumed: bool = False  # whether an existing session was picked up
+    audio_codec: str = "pcm"  # negotiated codec for binary audio in both directions
+    type: ClassVar[Literal['session']] = 'session'
+    timestamp: int = field(default_factory=_now_ms)  # event timestamp in ms
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)  # creation time for latency maths
+
+
+VoiceAgentEvent = Union[UserSpeechEvent, STTEvent, AgentEvent, TTSChunkEvent, InterruptEvent, AudioFlushEvent, TurnMetricsEvent, SessionEvent]
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii')
+
+
+# Event class -> payload fields serialized between "type" and "timestamp",
+# each with an optional encoder for values that are not JSON-native.
+_EVENT_FIELDS: dict[type, tuple[tuple[str, Optional[Callable]], ...]] = {
+    UserSpeechEvent: (("audio_data", _b64),),
+    STTChunkEvent: (("text", None), ("is_final", None)),
+    STTOutputEvent: (("text", None),),
+    AgentTriggerEvent: (("text", None),),
+    AgentChunkEvent: (("text", None), ("turn_id", None)),
+    AgentEndEvent: (("text", None), ("turn_id", None)),
+    ToolCallEvent: (("id", None), ("tool_name", None), ("arguments", None)),
+    ToolReturnEvent: (("id", None), ("tool_name", None), ("return_value", None)),
+    TTSChunkEvent: (("audio_data", _b64), ("turn_id", None)),
+    InterruptEvent: (),
+    AudioFlushEvent: (("turn_id", None),),
+    TurnMetricsEvent: (("turn_id", None), ("stages_ms", None)),
+    SessionEvent: (("session_id", None), ("resume_token", None), ("resumed", None), ("audio_codec", None)),
+}
+
+
+def event_to_dict(event: VoiceAgentEvent, seq: Optional[int] = None) -> dict:
+    """
+    Convert a VoiceAgentEvent to a JSON-serializable dict.
+
+    `seq` is the per-session sequence number assigned when the event is sent.
+    """
+    try:
+        fields = _EVENT_FIELDS[type(event)]
+    except KeyError:
+        raise ValueError(f"Unknown event type: {type(event)}")
+
+    data = {"type": event.type}
+    for name, encode in fields:
+        value = getattr(event, name)
+        data[name] = encode(value) if encode else value
+    data["timestamp"] = event.timestamp
+    if seq is not None:
+        data["seq"] = seq
+    return data
+
+
+# Binary audio framing
+#
+# When the client negotiates ``audio_transport: "binary"`` in its init message,
+# TTS audio is sent as raw binary WebSocket messages instead of base64-in-JSON.
+# Each frame is a fixed 16-byte little-endian header followed by the PCM payload:
+#
+#   offset 0  uint8   frame type (see FRAME_TYPES)
+#   offset 1  uint8   flags (bit 0: is_final, bit 1: Opus payload)
+#   offset 2  uint16  agent turn id, modulo 2**16 (also keeps the payload 2-byte aligned)
+#   offset 4  uint32  per-session sequence number
+#   offset 8  uint64  event timestamp in ms
+#
+# An Opus payload (see codec.py) is a run of packets, each prefixed with its
+# uint16 little-endian length. Control events keep flowing as JSON text messages.
+
+FRAME_HEADER = struct.Struct("<BBHIQ")
+
+FRAME_TYPES = {
+    "tts_chunk": 1,
+}
+
+FRAME_FLAG_FINAL = 0x01
+FRAME_FLAG_OPUS = 0x02
+
+
+def event_to_frame(event: TTSChunkEvent, seq: int, payload: Optional[bytes] = None, flags: int = 0) -> bytes:
+    """
+    Convert an audio event to a binary WebSocket frame (header + raw PCM).
+
+    `payload` replaces the PCM when the audio has been encoded, with `flags`
+    saying how.
+    """
+    try:
+        frame_type = FRAME_TYPES[event.type]
+    except KeyError:
+        raise ValueError(f"Event type has no binary framing: {type(event)}")
+
+    if event.is_final:
+        flags |= FRAME_FLAG_FINAL
+    header = FRAME_HEADER.pack(frame_type, flags, event.turn_id & 0xFFFF, seq & 0xFFFFFFFF, event.timestamp)
+    return header + (event.audio_data if payload is None else payload)
@@ -0,0 +1,101 @@
+"""
+Docstring for fillers
+
+Bank of pre-synthesized filler phrases ("Okay, let me think about that").
+
+When a reply is slow to start, the TTS stage plays one of these so the
+candidate does not sit through dead air. The phrases are synthesized once per
+process on the default TTS provider when the app starts. With FILLER_DIR set,
+they are read from (and on first synthesis written to) one raw PCM file per
+phrase. These files use the same content keys as the TTS cache.
+"""
+
+import asyncio
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from providers import provider_chain, synthesize, tts_voice
+from settings import settings
+from tts_cache import phrase_key
+
+
+@dataclass(frozen=True)
+class Filler:
+    """One filler phrase as spoken by one TTS provider."""
+    text: str
+    provider: str
+    sample_rate: int
+    audio: bytes
+
+
+class FillerBank:
+    """Filler audio per (TTS provider, sample rate), handed out in rotation."""
+
+    def __init__(self, phrases: list[str], directory: Optional[str] = None):
+        self.phrases = list(phrases)
+        self.directory = Path(directory) if directory else None
+        self._fillers: dict[tuple[str, int], list[Filler]] = {}
+        self._picks = 0
+
+    def pick(self, provider: str, sample_rate: int) -> Optional[Filler]:
+        """The next filler that matches the session's voice, if any is ready."""
+        fillers = self._fillers.get((provider, sample_rate))
+        if not fillers:
+            return None
+        self._picks += 1
+        return fillers[self._picks % len(fillers)]
+
+    def _path(self, provider: str, text: str) -> Path:
+        return self.directory / f"{phrase_key(provider, *tts_voice(provider), text)}.pcm"
+
+    def _write(self, path: Path, audio: bytes) -> None:
+        # write-then-rename so concurrent workers never read a partial file
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(tmp, path)
+
+    async def _load(self, provider: str, text: str) -> Optional[Filler]:
+        if not self.directory:
+            return None
+        path = self._path(provider, text)
+        if not path.exists():
+            return None
+        audio = await asyncio.to_thread(path.read_bytes)
+        return Filler(text, provider, tts_voice(provider)[2], audio) if audio else None
+
+    async def _synthesize(self, text: str, chain: list[str]) -> Filler:
+        provider, sample_rate, audio = await synthesize(text, chain, settings.TTS_SYNTHESIS_TIMEOUT_SECONDS)
+        if self.directory and audio:
+            await asyncio.to_thread(self._write, self._path(provider, text), audio)
+        return Filler(text, provider, sample_rate, audio)
+
+    async def _prepare(self, text: str, chain: list[str]) -> Optional[Filler]:
+        try:
+            return await self._load(chain[0], text) or await self._synthesize(text, chain)
+        except Exception as e:
+            logger.error(f"Filler bank: failed to prepare '{text}': {e!r}")
+            return None
+
+    async def warm(self, provider: Optional[str] = None) -> None:
+        """Load or synthesize every phrase on the given (or default) TTS provider, concurrently."""
+        chain = provider_chain("tts", provider)
+        if not chain:
+            return
+        ready = 0
+        for filler in await asyncio.gather(*(self._prepare(text, chain) for text in self.phrases)):
+            if filler and filler.audio:
+                self._fillers.setdefault((filler.provider, filler.sample_rate), []).append(filler)
+                ready += 1
+        logger.info(f"Filler bank: {ready} of {len(self.phrases)} phrases ready")
+
+
+filler_bank: Optional[FillerBank] = (
+    FillerBank(settings.FILLER_PHRASES, settings.FILLER_DIR) if settings.FILLER_ENABLED else None
+)
@@ -0,0 +1,102 @@
+"""
+Docstring for greeting
+
+Precomputed opening line of agent-first interviews.
+
+With AGENT_TRIGGER on, the agent speaks first. Instead of running the LLM and
+then TTS after the pipeline is up, the opening reply is generated and
+synthesized in the background as soon as the session inputs are known. This
+overlaps with the session store write, the client handshake and the vendor
+connects. The pipeline then plays the prepared audio the moment it starts.
+
+Openings are cached by (job description, resume, duration, TTS provider).
+With temperature 0 the same inputs would produce the same line anyway.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Optional
+
+from langchain.messages import HumanMessage
+from loguru import logger
+
+from agent import opening_reply
+from phases import phase_schedule
+from assets import ContentStore, content_id
+from providers import provider_chain, synthesize
+from settings import settings
+
+
+# Text of the human message that asks the agent to open the interview
+OPENING_TRIGGER = "START"
+
+
+@dataclass(frozen=True)
+class Greeting:
+    """An opening reply and, when synthesis succeeded, its audio."""
+    text: str
+    provider: Optional[str] = None  # TTS provider that rendered `audio`
+    sample_rate: int = 0
+    audio: bytes = b""
+
+
+_cache: ContentStore[Greeting] = ContentStore(settings.GREETING_CACHE_SIZE)
+
+# key -> greeting in progress, so concurrent sessions with the same inputs share one
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def greeting_key(job_description: str, resume: str, duration: int, time_left: int,
+                 tts_provider: Optional[str]) -> str:
+    raw = "\x1f".join((job_description, resume, str(duration), str(time_left), tts_provider or ""))
+    return content_id(raw.encode("utf-8"))
+
+
+async def _prepare(job_description: str, resume: str, duration: int, time_left: int,
+                   tts_provider: Optional[str]) -> Greeting:
+    reply = await opening_reply({
+        "messages": [HumanMessage(content=OPENING_TRIGGER)],
+        "job_description": job_description,
+        "resume": resume,
+        "duration": duration,
+        "time_left": time_left,
+        "phase": phase_schedule(duration).phase(time_left),
+        "summary": "",
+    })
+    text = reply.text
+    try:
+        provider, sample_rate, audio = await synthesize(
+            text, provider_chain("tts", tts_provider), settings.TTS_SYNTHESIS_TIMEOUT_SECONDS,
+        )
+    except Exception as e:
+        # the text alone still saves the LLM round trip; TTS then runs live
+        logger.error(f"Failed to synthesize the opening line: {e!r}")
+        return Greeting(text=text)
+    return Greeting(text=text, provider=provider, sample_rate=sample_rate, audio=audio)
+
+
+async def prepare_greeting(job_description: str, resume: str, duration: int, time_left: int,
+                           tts_provider: Optional[str] = None) -> Greeting:
+    """Return the opening for these session inputs, generating it if it is not cached."""
+    key = greeting_key(job_description, resume, duration, time_left, tts_provider)
+
+    cached = _cache.get(key)
+    if cached is not None:
+        logger.info(f"Greeting cache hit {key[:12]}")
+        return cached
+
+    if key in _inflight:
+        return await asyncio.shield(_inflight[key])
+
+    future = asyncio.ensure_future(_prepare(job_description, resume, duration, time_left, tts_provider))
+    _inflight[key] = future
+    try:
+        greeting = await asyncio.shield(future)
+    finally:
+        _inflight.pop(key, None)
+
+    # only fully rendered openings are reused; a failed synthesis is retried next time
+    if greeting.audio:
+        _cache.put(key, greeting)
+    logger.info(f"Prepared opening line {key[:12]} ({len(greeting.audio)} bytes of audio)")
+    return greeting
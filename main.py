@@ -1,46 +1,75 @@
 import asyncio
 import contextlib
+import dataclasses
 import json
 import base64
-import os
-import tempfile
-import io
-from langchain_community.document_loaders import PyMuPDFLoader
+import re
+import secrets
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import AsyncIterator
+from typing import AsyncIterator, Iterable, Iterator, Optional
 from uuid import uuid4
 from loguru import logger
 
 import uvicorn
 from dotenv import load_dotenv
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from Database.mongo import MongoDBConnector
 from fastapi.middleware.cors import CORSMiddleware
 from langchain.agents import create_agent
-from langchain.messages import AIMessage, HumanMessage, ToolMessage
+from langchain.messages import AIMessage, HumanMessage, RemoveMessage, ToolMessage
 from langchain_core.runnables import RunnableGenerator
-from langgraph.checkpoint.memory import InMemorySaver
-from agent import agent
-from utils import merge_async_iters
+from agent import RESPOND_NODE, agent, compact_history
+from checkpointer import release_thread, sqlite_checkpointer
+from session_store import WORKER_ID, SessionRecord, session_store
+from resume import get_resume_text, load_resume_text, resume_hash
+from assets import get_job_description, store_job_description
+from metrics import TurnTracer, queue_observer, render_prometheus, stt_audio_bytes
+from utils import BoundedQueue, merge_async_iters, split_speakable
 from settings import settings
 
 
-from deepgram import DeepgramSTT, DeepgramTTS
-from elevenlabs_tts import ElevenLabsTTS
+from deepgram import close_pools, warm_pools
+from providers import FailoverSTT, FailoverTTS, provider_chain
+from tts_cache import iter_frames, tts_cache
+from fillers import filler_bank
+from vad import PCMFramer, SilenceGate
+from codec import CODEC_OPUS, CODEC_PCM, OpusDecoder, OpusEncoder, negotiate_codec
+from greeting import OPENING_TRIGGER, Greeting, prepare_greeting
+from phases import SessionClock
 
 from events import (
     AgentTriggerEvent,
     AgentChunkEvent,
     AgentEndEvent,
+    AudioFlushEvent,
     ToolCallEvent,
     ToolReturnEvent,
     VoiceAgentEvent,
     InterruptEvent,
+    SessionEvent,
+    TTSChunkEvent,
+    FRAME_FLAG_OPUS,
     event_to_dict,
+    event_to_frame,
     )
     
-app = FastAPI()
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pre-connect vendor sockets so the agent's opening line skips the cold connect
+    warm_pools()
+    filler_task = asyncio.create_task(filler_bank.warm()) if filler_bank else None
+    async with sqlite_checkpointer(agent):
+        yield
+    if filler_task:
+        filler_task.cancel()
+    await close_pools()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -72,38 +101,213 @@ async def submit_feedback(payload: FeedbackPayload):
         logger.error(f"Failed to log feedback: {e}")
         raise HTTPException(status_code=500, detail="Failed to save feedback.")
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-turn stage latency histograms in Prometheus text format."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+class SessionAssetsPayload(BaseModel):
+    job_description: str = ""
+    resume_base64: str = ""
+
+@app.post("/assets")
+async def upload_assets(payload: SessionAssetsPayload):
+    """
+    Upload the job description and resume once, ahead of the WebSocket.
+    Returns content-addressed IDs the /ws init message can reference instead
+    of carrying the full payloads.
+    """
+    result = {}
+    if payload.job_description:
+        result["job_description_id"] = store_job_description(payload.job_description)
+        # the WebSocket may land on another worker
+        await session_store.put_asset(result["job_description_id"], payload.job_description)
+
+    if payload.resume_base64:
+        try:
+            pdf_bytes = base64.b64decode(payload.resume_base64)
+            resume_text = await load_resume_text(pdf_bytes)
+        except Exception as e:
+            logger.error(f"Failed to read uploaded resume PDF: {e}")
+            raise HTTPException(status_code=400, detail="Failed to read resume PDF.")
+        result["resume_id"] = resume_hash(pdf_bytes)
+        await session_store.put_asset(result["resume_id"], resume_text)
+
+    return result
+
+def _normalize_transcript(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace for transcript comparison."""
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+@dataclass
+class SpeculativeTurn:
+    """An agent run started on a partial transcript, held until EndOfTurn confirms it."""
+    text: str  # partial transcript the run was started on
+    turn_id: int
+    message_ids: list[str] = field(default_factory=lambda: [str(uuid4())])  # human message first, then AI replies
+    held: list = field(default_factory=list)  # output withheld until the turn is committed
+    committed: bool = False
+    task: Optional[asyncio.Task] = None
+
+    def matches(self, final_text: str) -> bool:
+        return _normalize_transcript(self.text) == _normalize_transcript(final_text)
+
+
 class VoicePipeline:
-    def __init__(self, job_description: str, resume: str, duration: int, time_left: int):
+    def __init__(self, job_description: str, resume: str, duration: int, elapsed: float = 0.0,
+                 stt_provider: Optional[str] = None, tts_provider: Optional[str] = None,
+                 session_id: Optional[str] = None, thread_id: Optional[str] = None,
+                 resume_token: Optional[str] = None):
         # Keeps track of whether this specific session has triggered the agent yet.
         # This prevents global state mutations that affect concurrent users.
         self.has_triggered = False
         self.job_description = job_description
         self.resume = resume
-        self.duration = duration
-        self.time_left = time_left
+        # interview time is kept here rather than taken from client time updates
+        self.clock = SessionClock(duration, elapsed)
+        self.session_id = session_id or str(uuid4())  # key of this session in the session store
+        self.thread_id = thread_id or str(uuid4())  # unique ID for this conversation thread
+        self.resume_token = resume_token or secrets.token_urlsafe(24)  # lets the client reattach
+        self.generation = 0  # claim on the session record this pipeline writes with
+        self.tracer = TurnTracer()  # per-turn stage timings
+        self.turn_id = 0  # current agent turn
+        self.interrupted_turn = 0  # latest agent turn silenced by a barge-in
+        self.speaking_until = 0.0  # monotonic time the client finishes playing the audio sent so far
+        # drops silence between candidate turns before it reaches the STT provider
+        self.silence_gate = SilenceGate(
+            frame_ms=settings.VAD_FRAME_MS,
+            threshold_dbfs=settings.VAD_THRESHOLD_DBFS,
+            noise_margin_db=settings.VAD_NOISE_MARGIN_DB,
+            hangover_ms=settings.VAD_HANGOVER_MS,
+            preroll_ms=settings.VAD_PREROLL_MS,
+        ) if settings.VAD_ENABLED else None
+        self.uplink_codec = CODEC_PCM  # how the attached client encodes its microphone audio
+        # opening line generated while the session is set up (new agent-first sessions only)
+        self.greeting: Optional[asyncio.Task] = None
+        # (turn, greeting) whose prepared audio the TTS stage should play instead of synthesizing
+        self.prepared_opening: Optional[tuple[int, Greeting]] = None
+        # requested speech providers; None uses the configured defaults
+        self.stt_provider = stt_provider
+        self.tts_provider = tts_provider
+
+    @property
+    def duration(self) -> int:
+        return self.clock.duration
+
+    @property
+    def time_left(self) -> int:
+        return self.clock.time_left
+
+    @classmethod
+    def from_record(cls, record: SessionRecord) -> "VoicePipeline":
+        """Rebuild a session saved by another connection, possibly on another worker."""
+        # the interview clock kept running while the session was saved
+        parked = max(0.0, time.time() - record.updated_at)
+        pipeline = cls(
+            record.job_description,
+            resume=record.resume,
+            duration=record.duration,
+            elapsed=record.duration - record.time_left + parked,
+            stt_provider=record.stt_provider,
+            tts_provider=record.tts_provider,
+            session_id=record.session_id,
+            thread_id=record.thread_id,
+            resume_token=record.resume_token,
+        )
+        pipeline.has_triggered = record.has_triggered
+        pipeline.turn_id = record.turn_id
+        pipeline.interrupted_turn = record.turn_id
+        pipeline.generation = record.generation
+        return pipeline
+
+    def to_record(self) -> SessionRecord:
+        return SessionRecord(
+            session_id=self.session_id,
+            thread_id=self.thread_id,
+            resume_token=self.resume_token,
+            job_description=self.job_description,
+            resume=self.resume,
+            duration=self.duration,
+            time_left=self.time_left,
+            stt_provider=self.stt_provider,
+            tts_provider=self.tts_provider,
+            has_triggered=self.has_triggered,
+            turn_id=self.turn_id,
+            owner=WORKER_ID,
+            generation=self.generation,
+        )
+
+    async def aclose(self) -> None:
+        """Release per-session resources once the client has gone away."""
+        if self.greeting:
+            self.greeting.cancel()
+        # A newer connection owns the conversation now; leave its state alone
+        if not await session_store.save(self.to_record()):
+            logger.info(f"Session {self.session_id} was taken over, not releasing it")
+            return
+        # A conversation that is kept can be resumed, so keep its session too
+        if await release_thread(agent.checkpointer, self.thread_id):
+            await session_store.delete(self.session_id, self.generation)
 
     async def _stt_stream(
             self,
             audio_stream: AsyncIterator[bytes],
         ) -> AsyncIterator[VoiceAgentEvent]:
 
-        stt = DeepgramSTT()
+        stt = FailoverSTT(provider_chain("stt", self.stt_provider))
         print("STT stream started")
 
         async def send_audio():
             """
             Background task that pumps audio chunks to Deepgram 
             """
-            chunk_count = 0
+            gate = self.silence_gate
+            # browser chunks come in arbitrary sizes; send the STT fixed-duration frames
+            framer = PCMFramer(settings.STT_FRAME_MS, sample_rate=stt.sample_rate)
+            decoder: Optional[OpusDecoder] = None
+            last_sent = time.monotonic()
+
+            async def send_frame(frame, final: bool = False) -> None:
+                """Send one frame through the gate; `final` when no audio follows it for now."""
+                nonlocal last_sent
+                if gate:
+                    # the pre-roll goes out with a speech onset, so what is gated is
+                    # whatever the gate drops for good, not what this frame lacks
+                    dropped = gate.stats.bytes_dropped
+                    frame = gate.process(frame)
+                    if final:
+                        frame += gate.flush()
+                    stt_audio_bytes.inc(len(frame), outcome="sent")
+                    stt_audio_bytes.inc(gate.stats.bytes_dropped - dropped, outcome="gated")
+                    if not frame:
+                        # silence: only keep the connection alive
+                        if time.monotonic() - last_sent >= settings.STT_KEEPALIVE_SECONDS:
+                            await stt.keepalive()
+                            last_sent = time.monotonic()
+                        return
+                await stt.send_audio(frame)
+                last_sent = time.monotonic()
 
             try:
                 # Stream each audio chunk to deepgram as it arrives
                 async for audio_chunk in audio_stream:
                     if isinstance(audio_chunk, bytes):
-                        await stt.send_audio(audio_chunk)
-                    elif isinstance(audio_chunk, str):
-                        # Handle the text signal
-                        pass
+                        if self.uplink_codec == CODEC_OPUS:
+                            # one Opus packet per message, decoded off the event loop
+                            decoder = decoder or OpusDecoder(stt.sample_rate)
+                            audio_chunk = await decoder.decode(audio_chunk)
+                        for frame in framer.push(audio_chunk):
+                            await send_frame(frame)
+                    elif audio_chunk == STT_FLUSH:
+                        # the audio paused: send the end of the utterance instead of holding it
+                        if (tail := framer.flush()) is not None:
+                            await send_frame(tail, final=True)
+                    elif audio_chunk == STT_KEEPALIVE:
+                        # no audio for a while (e.g. the client is reconnecting)
+                        await stt.keepalive()
+                if (tail := framer.flush()) is not None:
+                    await send_frame(tail, final=True)
             finally:
                 await asyncio.sleep(0.2)  # wait for any final events
                 await stt.close()
@@ -115,13 +319,23 @@ class VoicePipeline:
 
         try:
             if settings.AGENT_TRIGGER and not self.has_triggered:
-                yield AgentTriggerEvent(text="START")
+                yield AgentTriggerEvent(text=OPENING_TRIGGER)
                 self.has_triggered = True
 
             async for event in stt.receive_events():
+                if self.silence_gate:
+                    # forward everything while the candidate holds the turn
+                    if event.type == "interrupt":
+                        self.silence_gate.in_turn = True
+                    elif event.type == "stt_output":
+                        self.silence_gate.in_turn = False
                 yield event
         
         finally:
+            if self.silence_gate:
+                stats = self.silence_gate.stats
+                logger.info(f"STT silence gate: saved {stats.bytes_saved} of {stats.bytes_in} bytes "
+                            f"({stats.saved_ratio:.0%})")
 
             with contextlib.suppress(asyncio.CancelledError):
                 send_task.cancel()
@@ -137,41 +351,217 @@ class VoicePipeline:
     ) -> AsyncIterator[VoiceAgentEvent]:
         '''
         Processes STT events through the agent and yields VoiceAgentEvents
+
+        Each agent turn runs as a background task so upstream events (notably
+        barge-in interrupts) keep flowing while the LLM is generating. An
+        interrupt cancels the running turn, which stops token generation.
+
+        With SPECULATIVE_LLM enabled, a turn is started early on a partial
+        transcript once the STT's end-of-turn confidence is high. Its output is
+        held back until EndOfTurn: if the final transcript matches, the held
+        output is released; otherwise the run is cancelled, its messages are
+        removed from the checkpointed history, and a normal turn starts.
+
+        Long histories are summarized in the background after a turn ends; the
+        resulting update is sent along with the next turn's input, so no reply
+        waits on the summary.
         '''
+        agent_events: asyncio.Queue = asyncio.Queue()
+        done = object()
+        agent_task: Optional[asyncio.Task] = None
+        speculation: Optional[SpeculativeTurn] = None
+        compaction: Optional[asyncio.Task] = None
+        config = {"configurable": {"thread_id": self.thread_id}}
 
-        thread_id = str(uuid4())  # unique ID for this conversation thread
-        async for event in event_stream:
-            yield event
+        def emit(event: VoiceAgentEvent, turn: Optional[SpeculativeTurn] = None) -> None:
+            if turn is not None and not turn.committed:
+                turn.held.append(event)
+            else:
+                agent_events.put_nowait(event)
+
+        async def compact() -> dict:
+            state = await agent.aget_state(config)
+            return await compact_history(state.values)
+
+        def take_compaction() -> dict:
+            """The finished background compaction's state update, if there is one."""
+            nonlocal compaction
+            if compaction is None or not compaction.done():
+                return {}
+            task, compaction = compaction, None
+            if task.cancelled():
+                return {}
+            if task.exception() is not None:
+                logger.error(f"History compaction failed: {task.exception()!r}")
+                return {}
+            return task.result()
 
-            
-            if event.type == "stt_output" or event.type == "agent_trigger":
-                buffer = []
+        async def run_turn(text: str, turn_id: int, turn: Optional[SpeculativeTurn] = None,
+                           agent_speaking: bool = False) -> None:
+            nonlocal compaction
+            buffer = []
+            human = HumanMessage(content=text)
+            if turn is not None:
+                human.id = turn.message_ids[0]
+            inputs = {"messages": [human],
+                      "job_description": self.job_description,
+                      "resume": self.resume,
+                      "duration": self.duration,
+                      "time_left": self.time_left,
+                      "phase": self.clock.phase,
+                      "agent_speaking": agent_speaking}
+            if update := take_compaction():
+                inputs["messages"] = update["messages"] + inputs["messages"]
+                inputs["summary"] = update["summary"]
+            try:
                 stream = agent.astream(
-                    {"messages": [HumanMessage(content=event.text)],
-                     "job_description": self.job_description,
-                     "resume": self.resume,
-                     "duration": self.duration,
-                     "time_left": self.time_left},
-                    {"configurable": {"thread_id": thread_id}},
+                    inputs,
+                    config,
                     stream_mode="messages",
                     flush=True
                 )
 
-
                 async for message, metadata in stream:
                     # logger.info(f"Agent Message: {message}")
-                    try:
-                        if isinstance(message, AIMessage):
+                    if isinstance(message, AIMessage) and message.content:
+                        if turn is not None and message.id and message.id not in turn.message_ids:
+                            turn.message_ids.append(message.id)
+                        emit(AgentChunkEvent(text=message.content, turn_id=turn_id), turn)
+                        buffer.append(message.content)
+
+                if compaction is None:
+                    # summarize older turns while the reply is being spoken
+                    compaction = asyncio.create_task(compact())
 
-                            yield AgentChunkEvent(
-                                text=message.content
-                            )
-                            buffer.append(message.content)
-                    except IndexError:
-                        logger.error(f"IndexError: {message.content}")
+            except Exception as e:
+                logger.error(f"Agent turn {turn_id} failed: {e}")
 
-                if buffer:
-                    yield AgentEndEvent(text="".join(buffer))
+            if buffer:
+                emit(AgentEndEvent(text="".join(buffer), turn_id=turn_id), turn)
+
+        async def run_greeting(turn_id: int) -> None:
+            """Speak the opening prepared during setup; generate it live if that failed."""
+            task, self.greeting = self.greeting, None
+            try:
+                greeting = await task
+                # record the exchange as if the graph had produced it
+                await agent.aupdate_state(
+                    config,
+                    {"messages": [HumanMessage(content=OPENING_TRIGGER), AIMessage(content=greeting.text)],
+                     "job_description": self.job_description,
+                     "resume": self.resume,
+                     "duration": self.duration,
+                     "time_left": self.time_left,
+                     "phase": self.clock.phase,
+                     "replied_phase": self.clock.phase},
+                    as_node=RESPOND_NODE,
+                )
+            except Exception as e:
+                logger.error(f"Prepared opening line unavailable ({e!r}), generating it live")
+                await run_turn(OPENING_TRIGGER, turn_id)
+                return
+
+            self.prepared_opening = (turn_id, greeting)
+            emit(AgentChunkEvent(text=greeting.text, turn_id=turn_id))
+            emit(AgentEndEvent(text=greeting.text, turn_id=turn_id))
+
+        async def cancel_turn() -> None:
+            nonlocal agent_task
+            if agent_task and not agent_task.done():
+                agent_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await agent_task
+                logger.info(f"Cancelled agent turn {self.turn_id}")
+            agent_task = None
+
+        async def discard_speculation() -> None:
+            """Cancel the speculative run and roll its messages out of the history."""
+            nonlocal speculation
+            turn, speculation = speculation, None
+            if turn is None:
+                return
+            if not turn.task.done():
+                turn.task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await turn.task
+            try:
+                state = await agent.aget_state(config)
+                stored = {m.id for m in state.values.get("messages", [])}
+                removals = [RemoveMessage(id=i) for i in turn.message_ids if i in stored]
+                if removals:
+                    await agent.aupdate_state(config, {"messages": removals})
+            except Exception as e:
+                logger.error(f"Failed to roll back speculative turn {turn.turn_id}: {e}")
+            logger.info(f"Discarded speculative turn {turn.turn_id} on '{turn.text}'")
+
+        def commit_speculation() -> None:
+            """Promote the speculative run to the live turn and release its output."""
+            nonlocal agent_task, speculation
+            turn, speculation = speculation, None
+            self.turn_id = turn.turn_id
+            agent_task = turn.task
+            turn.committed = True
+            for event in turn.held:
+                # restamp so latency is measured from when the output was released
+                agent_events.put_nowait(dataclasses.replace(
+                    event, timestamp=int(time.time() * 1000), monotonic_ns=time.monotonic_ns()
+                ))
+            turn.held.clear()
+            logger.info(f"Committed speculative turn {turn.turn_id}")
+
+        async def upstream():
+            nonlocal agent_task, speculation
+            # whether the candidate's current turn started over the agent's voice
+            agent_speaking = False
+            try:
+                async for event in event_stream:
+                    if event.type == "interrupt":
+                        agent_speaking = time.monotonic() < self.speaking_until
+                        # BARGE-IN: stop generating the reply that is being talked over,
+                        # and tell the TTS stage which turn to silence.
+                        await cancel_turn()
+                        await discard_speculation()
+                        event = dataclasses.replace(event, turn_id=self.turn_id)
+
+                    yield event
+
+                    if (event.type == "stt_chunk" and settings.SPECULATIVE_LLM
+                            and speculation is None
+                            and (agent_task is None or agent_task.done())
+                            and (event.is_eager or event.end_of_turn_confidence >= settings.SPECULATIVE_EOT_CONFIDENCE)):
+                        # Start on the partial transcript; its output stays held until EndOfTurn
+                        turn = SpeculativeTurn(text=event.text, turn_id=self.turn_id + 1)
+                        turn.task = asyncio.create_task(run_turn(event.text, turn.turn_id, turn, agent_speaking))
+                        speculation = turn
+                        logger.info(f"Speculative turn {turn.turn_id} started on '{event.text}'")
+
+                    elif event.type == "stt_output" or event.type == "agent_trigger":
+                        if speculation and event.type == "stt_output" and speculation.matches(event.text):
+                            await cancel_turn()
+                            commit_speculation()
+                            continue
+
+                        await discard_speculation()
+                        await cancel_turn()
+                        self.turn_id += 1
+                        if event.type == "agent_trigger" and self.greeting:
+                            agent_task = asyncio.create_task(run_greeting(self.turn_id))
+                        else:
+                            agent_task = asyncio.create_task(run_turn(event.text, self.turn_id,
+                                                                      agent_speaking=agent_speaking))
+            finally:
+                await cancel_turn()
+                await discard_speculation()
+                if compaction is not None:
+                    compaction.cancel()
+                agent_events.put_nowait(done)
+
+        async def agent_output():
+            while (event := await agent_events.get()) is not done:
+                yield event
+
+        async for event in merge_async_iters(upstream(), agent_output()):
+            yield event
 
 
     async def _tts_stream(
@@ -179,24 +569,168 @@ class VoicePipeline:
             event_stream: AsyncIterator[VoiceAgentEvent]
     ) -> AsyncIterator[VoiceAgentEvent]:
         
-        tts = DeepgramTTS()
+        tts = FailoverTTS(provider_chain("tts", self.tts_provider))
 
-        async def process_upstream():
+        # Bound buffered audio so a slow client pushes back on the vendor socket
+        # instead of growing server memory. Control events never wait for space,
+        # and a newer partial transcript replaces a queued older one.
+        queue = BoundedQueue(
+            maxsize=settings.TTS_QUEUE_HIGH_WATER,
+            bypass=lambda event: event.type != "tts_chunk",
+            coalesce_key=lambda event: "stt_chunk" if event.type == "stt_chunk" else None,
+            observer=queue_observer("tts"),
+        )
+
+        def is_stale(event: VoiceAgentEvent) -> bool:
+            """Agent text or audio belonging to a turn that was barged in on."""
+            return (event.type in ("agent_chunk", "agent_end", "tts_chunk")
+                    and event.turn_id <= self.interrupted_turn)
+
+        # latest turn that has sent text to the TTS vendor
+        vendor_turn = 0
+        # turn whose audio was synthesized ahead of time (the opening line)
+        prepared_turn = 0
+        # when a filler is due for the current turn, until its reply starts
+        filler_due: Optional[float] = None
+
+        # Upstream events, read as soon as they arrive rather than when
+        # process_upstream gets to them: it may be blocked on a full queue
+        inbox: asyncio.Queue[Optional[VoiceAgentEvent]] = asyncio.Queue()
 
+        async def read_upstream() -> None:
             try:
                 async for event in event_stream:
+                    if event.type == "interrupt" and (not settings.AGENT_TRIGGER or self.has_triggered):
+                        # Mark the turn stale and drop its queued audio right away. This
+                        # frees a put blocked on the full queue, and local audio loops
+                        # stop at their next frame.
+                        self.interrupted_turn = max(self.interrupted_turn, event.turn_id)
+                        await queue.purge(is_stale)
+                    inbox.put_nowait(event)
+            finally:
+                inbox.put_nowait(None)
+
+        def fresh(chunks: Iterable[TTSChunkEvent]) -> Iterator[TTSChunkEvent]:
+            """Locally produced audio, cut off as soon as its turn is barged in on."""
+            for chunk in chunks:
+                if is_stale(chunk):
+                    return
+                yield chunk
+
+        def filler_chunks() -> Iterator[TTSChunkEvent]:
+            """A filler for the turn being generated, in the session's voice."""
+            turn_id = self.turn_id
+            if turn_id <= self.interrupted_turn:
+                return
+            filler = filler_bank.pick(tts.name, tts.sample_rate)
+            if filler is None:
+                return
+            logger.info(f"Turn {turn_id}: reply is slow to start, playing filler '{filler.text}'")
+            frame_bytes = tts.sample_rate * 2 * settings.TTS_CACHE_FRAME_MS // 1000
+            for frame in iter_frames(memoryview(filler.audio), frame_bytes):
+                yield TTSChunkEvent(audio_data=frame, turn_id=turn_id, is_filler=True)
+
+        async def speak(text: str, turn_id: int) -> AsyncIterator[TTSChunkEvent]:
+            """
+            Speak one phrase. Until a turn has sent anything to the vendor, its
+            phrases can be served from the TTS cache without reordering audio.
+            """
+            nonlocal vendor_turn
+            if tts_cache and vendor_turn != turn_id and tts_cache.cacheable(text):
+                audio = tts_cache.get(tts.cache_key(text))
+                if audio is not None:
+                    frame_bytes = tts.sample_rate * 2 * settings.TTS_CACHE_FRAME_MS // 1000
+                    for chunk in fresh(TTSChunkEvent(audio_data=frame, turn_id=turn_id)
+                                       for frame in iter_frames(audio, frame_bytes)):
+                        yield chunk
+                    return
+
+            vendor_turn = turn_id
+            await tts.send_text(text)
+            await tts.flush()
+
+        async def process_upstream():
+            nonlocal prepared_turn, filler_due
+            # Agent text that has streamed in but not reached a speakable boundary yet
+            pending_text = ""
+            reader = asyncio.create_task(read_upstream())
+
+            try:
+                while True:
+                    timeout = None if filler_due is None else max(0.0, filler_due - time.monotonic())
+                    try:
+                        event = await asyncio.wait_for(inbox.get(), timeout)
+                    except asyncio.TimeoutError:
+                        if inbox.empty():
+                            # Fillers go through this generator too, so the reply's audio is always queued after them
+                            filler_due = None
+                            for chunk in fresh(filler_chunks()):
+                                yield chunk
+                            continue
+                        # the reply (or a barge-in) arrived just as the filler fell due: it wins
+                        event = inbox.get_nowait()
+                    if event is None:
+                        await reader  # surface a failure of the agent stage
+                        break
+
+                    if is_stale(event):
+                        continue
+
+                    if event.type == "stt_output" and filler_bank:
+                        filler_due = time.monotonic() + settings.FILLER_DELAY_MS / 1000
+                    elif event.type in ("agent_chunk", "interrupt"):
+                        filler_due = None
+
                     yield event
-                    if event.type == "agent_end":
-                        await tts.send_text(event.text)
-                        await tts.flush()
+                    if event.type in ("agent_chunk", "agent_end") and event.turn_id == prepared_turn:
+                        # already spoken from the prepared audio
+                        continue
+
+                    if (event.type == "agent_chunk" and self.prepared_opening
+                            and self.prepared_opening[0] == event.turn_id):
+                        greeting = self.prepared_opening[1]
+                        self.prepared_opening = None
+                        if (greeting.audio and greeting.provider == tts.name
+                                and greeting.sample_rate == tts.sample_rate):
+                            prepared_turn = event.turn_id
+                            frame_bytes = tts.sample_rate * 2 * settings.TTS_CACHE_FRAME_MS // 1000
+                            for chunk in fresh(TTSChunkEvent(audio_data=frame, turn_id=event.turn_id)
+                                               for frame in iter_frames(memoryview(greeting.audio), frame_bytes)):
+                                yield chunk
+                            continue
+
+                    if event.type == "agent_chunk":
+                        # Start speaking as soon as a sentence/clause is complete
+                        tts.turn_id = event.turn_id
+                        pending_text += event.text
+                        speakable, pending_text = split_speakable(
+                            pending_text, settings.TTS_MIN_CLAUSE_CHARS
+                        )
+                        if speakable.strip():
+                            async for chunk in speak(speakable, event.turn_id):
+                                yield chunk
+
+                    elif event.type == "agent_end":
+                        # Speak whatever is left of the reply
+                        if pending_text.strip():
+                            async for chunk in speak(pending_text, event.turn_id):
+                                yield chunk
+                        pending_text = ""
 
                     elif event.type == "interrupt":
                         # BARGE-IN: User is speaking, so we shut up.
                         # 1. Tell Deepgram to stop producing audio.
                         
                         # 2. Throw away any text we were about to speak.
+                        # 3. Purge audio already queued for the client and tell it
+                        #    to drop whatever it has buffered.
+                        pending_text = ""
                         if not settings.AGENT_TRIGGER or self.has_triggered:
+                            self.interrupted_turn = max(self.interrupted_turn, event.turn_id)
                             await tts.clear()
+                            purged = await queue.purge(is_stale)
+                            logger.info(f"Barge-in on turn {event.turn_id}: purged {purged} queued events")
+                            yield AudioFlushEvent(turn_id=event.turn_id)
 
                     else:
                         pass
@@ -205,98 +739,434 @@ class VoicePipeline:
                 logger.error(f"Error while processing text: {e}")
                 raise
             finally:
+                if not reader.done():
+                    reader.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await reader
                 await asyncio.sleep(0.2)
                 await tts.close()
 
         
 
         try:
-            async for events in merge_async_iters(process_upstream(), tts.receive_events()):
+            async for events in merge_async_iters(process_upstream(), tts.receive_events(), queue=queue):
+                # audio that was blocked on a full queue during a barge-in
+                if is_stale(events):
+                    continue
                 yield events
+                if events.type == "tts_chunk":
+                    # the client plays audio back to back from when it arrives
+                    seconds = len(events.audio_data) / (2 * tts.sample_rate)
+                    self.speaking_until = max(time.monotonic(), self.speaking_until) + seconds
+                elif events.type == "audio_flush":
+                    self.speaking_until = 0.0
+                turn_metrics = self.tracer.observe(events)
+                if turn_metrics and settings.EMIT_TURN_METRICS:
+                    yield turn_metrics
 
         finally:
+            self.tracer.finish()
+            logger.info(f"TTS queue stats: {queue.stats}")
+            if tts_cache:
+                logger.info(f"TTS cache: {tts_cache.hits} hits, {tts_cache.misses} misses")
             await tts.close()
 
     def get_runnable(self):
         return (RunnableGenerator(self._stt_stream) | RunnableGenerator(self._agent_stream) | RunnableGenerator(self._tts_stream))
 
+# Text signals in the audio stream: the audio paused, so send any partial frame;
+# no audio for a while, so keep the STT socket alive
+STT_FLUSH = "flush"
+STT_KEEPALIVE = "keepalive"
+
+# Events the client must not miss across a reconnect; replayed until acknowledged
+REPLAYED_EVENTS = frozenset({"agent_chunk", "agent_end", "tts_chunk", "audio_flush"})
+
+
+def _replay_size(event: VoiceAgentEvent) -> int:
+    """Approximate memory held by a buffered event: its audio or text, plus overhead."""
+    if isinstance(event, TTSChunkEvent):
+        return len(event.audio_data) + 64
+    return len(getattr(event, "text", "")) + 64
+
+
+class LiveSession:
+    """
+    A running VoicePipeline that outlives its WebSocket.
+
+    When the socket drops, the pipeline and its vendor sockets are parked for
+    SESSION_GRACE_SECONDS while agent output keeps being buffered. A client that
+    reconnects with the session's resume token is reattached, and every agent
+    event after the last sequence number it saw is replayed.
+    """
+
+    def __init__(self, pipeline: VoicePipeline):
+        self.pipeline = pipeline
+        self.websocket: Optional[WebSocket] = None
+        self.binary_audio = False
+        self.encoder: Optional[OpusEncoder] = None  # set when the client negotiated Opus
+        self._encoded_turn = 0  # turn of the audio the encoder carries over
+        self._encoder_flush: Optional[asyncio.Task] = None
+        self.seq = 0  # per-session sequence number shared by JSON and binary messages
+        self.acked = -1  # highest sequence number the client has confirmed
+        self._replay: deque[tuple[int, VoiceAgentEvent]] = deque()
+        self._replay_bytes = 0  # payload size of the events in _replay
+        self._audio: asyncio.Queue = asyncio.Queue()
+        self._send_lock = asyncio.Lock()
+        self._grace_task: Optional[asyncio.Task] = None
+        self._save_task: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self._finished = False
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def _audio_stream(self) -> AsyncIterator[bytes]:
+        hold = settings.STT_FRAME_MAX_HOLD_MS / 1000
+        timeout, signal = hold, STT_FLUSH
+        while True:
+            try:
+                chunk = await asyncio.wait_for(self._audio.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                yield signal
+                # one flush per pause, then keepalives
+                timeout = max(0.0, settings.STT_KEEPALIVE_SECONDS - (hold if signal == STT_FLUSH else 0))
+                signal = STT_KEEPALIVE
+                continue
+            if chunk is None:
+                return
+            timeout, signal = hold, STT_FLUSH
+            yield chunk
+
+    async def _run(self) -> None:
+        try:
+            async for event in self.pipeline.get_runnable().atransform(self._audio_stream()):
+                await self._send(event)
+                if event.type == "agent_end":
+                    self.save()
+        except Exception as e:
+            logger.error(f"Session {self.pipeline.session_id} failed: {e}")
+        finally:
+            self._finished = True
+            if live_sessions.get(self.pipeline.session_id) is self:
+                live_sessions.pop(self.pipeline.session_id)
+            if self._grace_task:
+                self._grace_task.cancel()
+            if self._encoder_flush:
+                self._encoder_flush.cancel()
+            await self.pipeline.aclose()
+            if self.websocket is not None:
+                with contextlib.suppress(Exception):
+                    await self.websocket.close()
+
+    async def _send_to(self, websocket: WebSocket, event: VoiceAgentEvent, seq: int) -> None:
+        if self.encoder and isinstance(event, TTSChunkEvent):
+            if event.turn_id != self._encoded_turn:
+                # the end of the previous turn was flushed when its audio paused
+                self.encoder.reset()
+                self._encoded_turn = event.turn_id
+            payload = await self.encoder.encode(bytes(event.audio_data), final=event.is_final)
+            await websocket.send_bytes(event_to_frame(event, seq, payload=payload, flags=FRAME_FLAG_OPUS))
+            self._schedule_encoder_flush()
+        elif self.encoder and event.type == "audio_flush":
+            # barge-in: the carried audio must not be played either
+            self.encoder.reset()
+            await websocket.send_json(event_to_dict(event, seq))
+        elif self.binary_audio and isinstance(event, TTSChunkEvent):
+            await websocket.send_bytes(event_to_frame(event, seq))
+        else:
+            await websocket.send_json(event_to_dict(event, seq))
+
+    def _schedule_encoder_flush(self) -> None:
+        """Send the audio the encoder carries over once the TTS audio pauses."""
+        if self._encoder_flush:
+            self._encoder_flush.cancel()
+            self._encoder_flush = None
+        if self.encoder and self.encoder.pending:
+            self._encoder_flush = asyncio.create_task(self._flush_encoder())
+
+    async def _flush_encoder(self) -> None:
+        await asyncio.sleep(settings.OPUS_TAIL_FLUSH_MS / 1000)
+        async with self._send_lock:
+            if self.websocket is None or not self.encoder or not self.encoder.pending:
+                return
+            payload = await self.encoder.flush()
+            seq = self.seq
+            self.seq += 1
+            event = TTSChunkEvent(audio_data=b"", turn_id=self._encoded_turn)
+            try:
+                await self.websocket.send_bytes(event_to_frame(event, seq, payload=payload, flags=FRAME_FLAG_OPUS))
+            except Exception as e:
+                logger.info(f"Session {self.pipeline.session_id}: send failed ({e}), parking")
+                self.detach(self.websocket)
+
+    async def _send(self, event: VoiceAgentEvent) -> None:
+        async with self._send_lock:
+            seq = self.seq
+            self.seq += 1
+            if event.type in REPLAYED_EVENTS:
+                self._keep_for_replay(seq, event)
+            if self.websocket is None:
+                return
+            try:
+                await self._send_to(self.websocket, event, seq)
+            except Exception as e:
+                logger.info(f"Session {self.pipeline.session_id}: send failed ({e}), parking")
+                self.detach(self.websocket)
+
+    def _keep_for_replay(self, seq: int, event: VoiceAgentEvent) -> None:
+        """Buffer an event until it is acknowledged, dropping the oldest past SESSION_REPLAY_MAX_KB."""
+        self._replay.append((seq, event))
+        self._replay_bytes += _replay_size(event)
+        budget = settings.SESSION_REPLAY_MAX_KB * 1024
+        while self._replay_bytes > budget and len(self._replay) > 1:
+            _, dropped = self._replay.popleft()
+            self._replay_bytes -= _replay_size(dropped)
+
+    async def attach(self, websocket: WebSocket, binary_audio: bool, audio_codec: str, resumed: bool,
+                     last_seq: Optional[int] = None) -> None:
+        """Make `websocket` the session's client and replay what it has not seen."""
+        async with self._send_lock:
+            previous, self.websocket, self.binary_audio = self.websocket, websocket, binary_audio
+            # the codec is per socket: a reconnecting client may negotiate differently
+            self.pipeline.uplink_codec = audio_codec
+            self.encoder = OpusEncoder(bitrate=settings.OPUS_BITRATE) if audio_codec == CODEC_OPUS else None
+            if self._grace_task:
+                self._grace_task.cancel()
+                self._grace_task = None
+            if previous is not None and previous is not websocket:
+                # a half-dead socket from before the reconnect
+                with contextlib.suppress(Exception):
+                    await previous.close()
+
+            pipeline = self.pipeline
+            await websocket.send_json(event_to_dict(
+                SessionEvent(pipeline.session_id, pipeline.resume_token, resumed=resumed, audio_codec=audio_codec),
+                self.seq))
+            self.seq += 1
+
+            seen = last_seq if last_seq is not None else self.acked
+            missed = [(seq, event) for seq, event in self._replay if seq > seen]
+            for seq, event in missed:
+                await self._send_to(websocket, event, seq)
+            if missed:
+                logger.info(f"Session {pipeline.session_id}: replayed {len(missed)} events")
+
+    def detach(self, websocket: WebSocket) -> None:
+        """Park the session after its socket went away, unless it was already replaced."""
+        if self._finished or self.websocket is not websocket:
+            return
+        self.websocket = None
+        logger.info(f"Session {self.pipeline.session_id} parked for {settings.SESSION_GRACE_SECONDS}s")
+        self._grace_task = asyncio.create_task(self._expire())
+        # the client may come back on another worker, which resumes from the record
+        self.save()
+
+    def save(self) -> None:
+        """Write the session's progress to the store in the background."""
+        if not self._save_task or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save())
+
+    async def _save(self) -> None:
+        try:
+            saved = await session_store.save(self.pipeline.to_record())
+        except Exception as e:
+            logger.error(f"Session {self.pipeline.session_id}: failed to save its record: {e}")
+            return
+        if not saved:
+            # claimed by a newer connection, here or on another worker
+            logger.info(f"Session {self.pipeline.session_id} was taken over, ending this copy")
+            self.end()
+
+    async def _expire(self) -> None:
+        await asyncio.sleep(settings.SESSION_GRACE_SECONDS)
+        logger.info(f"Session {self.pipeline.session_id} not resumed, closing")
+        self.end()
+
+    def end(self) -> None:
+        """Stop the pipeline; it tears down once the audio stream ends."""
+        self._audio.put_nowait(None)
+
+    def ack(self, seq: int) -> None:
+        self.acked = max(self.acked, seq)
+        while self._replay and self._replay[0][0] <= self.acked:
+            _, event = self._replay.popleft()
+            self._replay_bytes -= _replay_size(event)
+
+    def feed(self, message: dict) -> bool:
+        """Handle one client message; returns False once the client ends the session."""
+        if message.get("bytes"):
+            self._audio.put_nowait(message["bytes"])
+        elif message.get("text"):
+            # time_update messages from older clients are ignored: the session clock keeps time
+            data = json.loads(message["text"])
+            if data.get("type") == "ack":
+                self.ack(data.get("seq", -1))
+            elif data.get("type") == "end":
+                self.end()
+                return False
+        return True
+
+
+# session_id -> session running on this worker (attached or parked)
+live_sessions: dict[str, LiveSession] = {}
+
+
+def _can_resume(token: Optional[str], expected: str) -> bool:
+    return bool(token) and secrets.compare_digest(token, expected)
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     logger.info("✅ WebSocket client connected")
     await websocket.accept()
     logger.info("🤝 WebSocket accepted")
 
-    async def websocket_audio_stream() -> AsyncIterator[bytes]:
-        while True:
+    data = await websocket.receive_json()
+    logger.info(f"Received data keys: {list(data.keys())}")
+
+    # Audio transport negotiation: the client opts into binary audio frames,
+    # the server honours it only when enabled. Control events always stay JSON.
+    binary_audio = settings.BINARY_AUDIO_FRAMES and data.get("audio_transport") == "binary"
+    # Opus needs binary frames; the client must hold its audio until the session event confirms it
+    audio_codec = negotiate_codec(data.get("audio_codec")) if binary_audio else CODEC_PCM
+    logger.info(f"Audio transport: {'binary' if binary_audio else 'json'}, codec: {audio_codec}")
+
+    # A known session_id resumes that session. Claiming its record fences off any
+    # other pipeline still holding it, here or on another worker: their writes are
+    # refused from now on and they end.
+    record = await session_store.get(data["session_id"]) if data.get("session_id") else None
+    if record and _can_resume(data.get("resume_token"), record.resume_token):
+        if record.owner and record.owner != WORKER_ID:
+            logger.info(f"Taking session {record.session_id} over from worker {record.owner}")
+        record = await session_store.claim(record.session_id, WORKER_ID)
+    else:
+        record = None
+
+    live = live_sessions.get(record.session_id) if record else None
+    if live and record.generation == live.pipeline.generation + 1:
+        # Reconnect within the grace period: the pipeline is still running here,
+        # and no other worker held the session in between
+        live.pipeline.generation = record.generation
+        logger.info(f"Reattaching session {live.pipeline.session_id}")
+        await live.attach(websocket, binary_audio, audio_codec, resumed=True, last_seq=data.get("last_seq"))
+    else:
+        if live:
+            # superseded while parked; its state is older than the record's
+            live.end()
+
+        if record:
+            voice_pipeline = VoicePipeline.from_record(record)
+            logger.info(f"Resuming session {record.session_id} (thread {record.thread_id})")
+        elif data.get("session_id"):
+            # a resume carries no interview inputs: the client has to start over with a fresh init
+            logger.warning(f"Unknown or expired session_id {data['session_id']}, refusing the resume")
+            await websocket.close(code=1008, reason="Unknown or expired session")
+            return
+        else:
             try:
-                message = await websocket.receive()
-                if message.get("type") == "websocket.disconnect":
-                    logger.info("Client disconnected gracefully")
-                    break
-                if "bytes" in message and message.get("bytes"):
-                    yield message["bytes"]
-                elif "text" in message and message.get("text"):
-                    data = json.loads(message["text"])
-                    if data.get("type") == "time_update":
-                        voice_pipeline.duration = data.get("duration", voice_pipeline.duration)
-                        voice_pipeline.time_left = data.get("time_left", voice_pipeline.time_left)
-            except WebSocketDisconnect:
-                # This is expected! It means the user clicked "End Session"
-                logger.info("Client disconnected gracefully")
-                break  # Break the loop to stop processing
-            except RuntimeError as e:
-                # Catch specific RuntimeErrors, although we've avoided it now
-                logger.error(f"RuntimeError receiving audio: {e}")
-                break
-            except Exception as e:
-                logger.error(f"Unexpected error receiving audio: {e}")
+                voice_pipeline = await _new_pipeline(data)
+            except LookupError as e:
+                # an interview without its inputs is worse than no interview
+                logger.error(f"Refusing session: {e}")
+                await websocket.close(code=1008, reason=str(e))
+                return
+            await session_store.put(voice_pipeline.to_record())
+
+        live = LiveSession(voice_pipeline)
+        live_sessions[voice_pipeline.session_id] = live
+        await live.attach(websocket, binary_audio, audio_codec, resumed=record is not None)
+        live.start()
+
+    ended = False
+    try:
+        while not ended:
+            message = await websocket.receive()
+            if message.get("type") == "websocket.disconnect":
+                logger.info("Client disconnected")
                 break
+            ended = not live.feed(message)
+    except WebSocketDisconnect:
+        logger.info("Client disconnected")
+    except Exception as e:
+        logger.error(f"Unexpected error receiving audio: {e}")
+    finally:
+        if ended:
+            logger.info(f"Session {live.pipeline.session_id} ended by the client")
+        else:
+            live.detach(websocket)
 
-    data = await websocket.receive_json()
-    logger.info(f"Received data keys: {list(data.keys())}")
-    
+
+async def _get_asset(local: Optional[str], kind: str, asset_id: str) -> str:
+    """An uploaded asset from this worker's cache or the shared store."""
+    content = local if local is not None else await session_store.get_asset(asset_id)
+    if content is None:
+        raise LookupError(f"Unknown {kind} {asset_id}: upload it again")
+    return content
+
+
+async def _new_pipeline(data: dict) -> VoicePipeline:
+    """
+    Build a fresh session from an init message.
+
+    Raises LookupError when the message references an uploaded asset that
+    neither this worker nor the shared session store knows.
+    """
     resume_text = "N/A"
     
-    try:
-        if "resume_base64" in data and data["resume_base64"]:
-            pdf_bytes = base64.b64decode(data["resume_base64"])
-            
-            # PyMuPDFLoader expects a physical file path, not a streaming byte object.
-            # We save it to a temporary system file, read it, and then delete it.
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                tmp_file.write(pdf_bytes)
-                tmp_file_path = tmp_file.name
+    if data.get("resume_id"):
+        # Uploaded and parsed ahead of time via /assets
+        resume_id = data["resume_id"]
+        resume_text = await _get_asset(get_resume_text(resume_id), "resume_id", resume_id)
 
-            try:
-                loader = PyMuPDFLoader(tmp_file_path)
-                docs = loader.load()
-                resume_text = "\n".join(docs[i].page_content for i in range(len(docs)))
-                logger.info("Successfully extracted resume text securely.")
-            finally:
-                # Always clean up the temporary file
-                os.unlink(tmp_file_path)
+    elif "resume_base64" in data and data["resume_base64"]:
+        try:
+            pdf_bytes = base64.b64decode(data["resume_base64"])
+            # Parsed in memory on a worker process and cached by content hash
+            resume_text = await load_resume_text(pdf_bytes)
+            logger.info("Successfully extracted resume text securely.")
+        except Exception as e:
+            logger.error(f"Failed to read resume PDF: {e}")
+            resume_text = "N/A"
 
-    except Exception as e:
-        logger.error(f"Failed to read resume PDF: {e}")
-        resume_text = "N/A"
+    job_description = data.get("job_description", "")
+    if not job_description and data.get("job_description_id"):
+        job_description_id = data["job_description_id"]
+        job_description = await _get_asset(get_job_description(job_description_id),
+                                           "job_description_id", job_description_id)
 
-    voice_pipeline = VoicePipeline(
-        data.get("job_description", ""), 
+    # the client's time_left only sets where the clock starts (e.g. after a page reload)
+    duration = data.get("duration", 0)
+    time_left = data.get("time_left", 0)
+    pipeline = VoicePipeline(
+        job_description, 
         resume=resume_text,
-        duration=data.get("duration", 0), 
-        time_left=data.get("time_left", 0)
+        duration=duration,
+        elapsed=duration - time_left if 0 < time_left <= duration else 0.0,
+        stt_provider=data.get("stt_provider"),
+        tts_provider=data.get("tts_provider"),
     )
-    
-    output_stream = voice_pipeline.get_runnable().atransform(websocket_audio_stream())
-
-    try:
-        async for event in output_stream:
-            await websocket.send_json(event_to_dict(event))
-    finally:
-        pass
+    if settings.AGENT_TRIGGER and settings.GREETING_PRECOMPUTE:
+        # Runs while the session is stored, the client handshake completes and
+        # the vendor sockets connect, instead of after the pipeline starts
+        pipeline.greeting = asyncio.create_task(prepare_greeting(
+            job_description, resume_text, pipeline.duration, pipeline.time_left, pipeline.tts_provider,
+        ))
+    return pipeline
 
 if __name__ == "__main__":
-    uvicorn.run("main:app",
-                host="0.0.0.0",
-                port=8000,
-                reload=settings.is_development)
\ No newline at end of file
+    if settings.WORKERS > 1:
+        # Sessions must be resumable on any worker, so their state has to live outside the process
+        if not settings.SESSION_STORE_PATH or not settings.CHECKPOINT_SQLITE_PATH:
+            logger.error("WORKERS > 1 needs SESSION_STORE_PATH and CHECKPOINT_SQLITE_PATH: without them a "
+                         "session may land on a worker that does not know its assets or conversation")
+            raise SystemExit(1)
+        uvicorn.run("main:app",
+                    host=settings.HOST,
+                    port=settings.PORT,
+                    workers=settings.WORKERS)
+    else:
+        uvicorn.run("main:app",
+                    host=settings.HOST,
+                    port=settings.PORT,
+                    reload=settings.is_development)
\ No newline at end of file
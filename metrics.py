@@ -0,0 +1,200 @@
+"""
+Docstring for metrics
+
+Latency metrics for the voice pipeline.
+
+Provides a minimal Prometheus-compatible histogram registry (rendered by the
+/metrics endpoint) and a per-session TurnTracer that turns the event stream
+into stage timings for each conversational turn.
+"""
+
+import bisect
+from typing import Optional
+
+from events import TurnMetricsEvent, VoiceAgentEvent
+
+
+DEFAULT_BUCKETS = (0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative histogram with optional labels, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, sum, count)
+        self._series: dict[tuple[str, ...], list] = {}
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def _labels(self, key: tuple[str, ...], **extra: str) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra.items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{self._labels(key, le=repr(bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{self._labels(key, le='+Inf')} {count}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {total}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with optional labels, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError(f"{self.name} can only increase, got {amount}")
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            labels = ",".join(f'{name}="{v}"' for name, v in zip(self.labelnames, key))
+            lines.append(f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}")
+        return lines
+
+
+REGISTRY: list = []
+
+
+def render_prometheus() -> str:
+    """Render every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+turn_stage_seconds = Histogram(
+    "voice_turn_stage_seconds",
+    "Latency of each voice pipeline stage within a conversational turn.",
+    labelnames=("stage",),
+)
+
+queue_wait_seconds = Histogram(
+    "pipeline_queue_wait_seconds",
+    "Time events spend in a pipeline queue before being consumed.",
+    labelnames=("queue",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+queue_depth = Histogram(
+    "pipeline_queue_depth",
+    "Pipeline queue depth observed each time an event is consumed.",
+    labelnames=("queue",),
+    buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+
+stt_audio_bytes = Counter(
+    "stt_audio_bytes_total",
+    "Candidate audio bytes received, by whether they were sent to STT or gated as silence.",
+    labelnames=("outcome",),
+)
+
+
+def queue_observer(name: str):
+    """Observer for utils.BoundedQueue that records wait time and depth under `name`."""
+    def observe(wait: float, depth: int) -> None:
+        queue_wait_seconds.observe(wait, queue=name)
+        queue_depth.observe(depth, queue=name)
+    return observe
+
+# Stage name -> (start mark, end mark)
+TURN_STAGES = {
+    "llm_first_token": ("stt_end", "first_token"),
+    "llm_complete": ("stt_end", "agent_end"),
+    "tts_first_byte": ("first_token", "first_audio"),
+    "first_audio": ("stt_end", "first_audio"),
+    "filler_audio": ("stt_end", "filler_audio"),
+    "tts_stream": ("first_audio", "last_audio"),
+}
+
+
+class TurnTracer:
+    """
+    Records stage timings for each turn of one session.
+
+    A turn starts at STT end-of-turn (or the agent trigger) and collects the
+    first LLM token, the end of the agent reply and the first/last TTS byte.
+    It is finalized when the next turn starts, on barge-in, or when the
+    session closes, since only then is the last TTS byte known.
+    """
+
+    def __init__(self):
+        self.turn_id = 0
+        self._marks: dict[str, float] = {}
+
+    def observe(self, event: VoiceAgentEvent) -> Optional[TurnMetricsEvent]:
+        """Record `event`; returns the metrics of a turn that just finished, if any."""
+        # stage timings use the event's own creation time, not when it reached us
+        now = event.monotonic_ns / 1e9
+
+        if event.type in ("stt_output", "agent_trigger"):
+            finished = self.finish()
+            self.turn_id += 1
+            self._marks = {"stt_end": now}
+            return finished
+
+        if event.type == "interrupt":
+            return self.finish()
+
+        if not self._marks:
+            return None
+
+        if event.type == "agent_chunk":
+            self._marks.setdefault("first_token", now)
+        elif event.type == "agent_end":
+            self._marks.setdefault("agent_end", now)
+        elif event.type == "tts_chunk" and event.is_filler:
+            # fillers are timed on their own so they do not mask reply latency
+            self._marks.setdefault("filler_audio", now)
+        elif event.type == "tts_chunk":
+            self._marks.setdefault("first_audio", now)
+            self._marks["last_audio"] = now
+
+        return None
+
+    def finish(self) -> Optional[TurnMetricsEvent]:
+        """Close the current turn, record its histograms and return its metrics."""
+        if not self._marks:
+            return None
+
+        stages = {}
+        for stage, (start, end) in TURN_STAGES.items():
+            if start in self._marks and end in self._marks:
+                seconds = self._marks[end] - self._marks[start]
+                turn_stage_seconds.observe(seconds, stage=stage)
+                stages[stage] = round(seconds * 1000, 1)
+
+        self._marks = {}
+        return TurnMetricsEvent(turn_id=self.turn_id, stages_ms=stages)
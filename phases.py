@@ -0,0 +1,72 @@
+"""
+Docstring for phases
+
+Interview timing owned by the server.
+
+Each session keeps its own clock, so the interview phase no longer depends on
+when the client's time updates arrive. Phase boundaries depend only on the
+interview duration. They are computed once per duration and reused by every
+turn:
+
+- introduction: the first 10% of the interview
+- technical: until one minute is left
+- closing: the last minute
+"""
+
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+INTRODUCTION = "introduction"
+TECHNICAL = "technical"
+CLOSING = "closing"
+
+CLOSING_SECONDS = 60  # time left when the interview moves to closing
+INTRODUCTION_SHARE = 0.1  # share of the interview spent on the introduction
+
+
+@dataclass(frozen=True)
+class PhaseSchedule:
+    """Phase boundaries of one interview, as seconds left on the clock."""
+    duration: int
+    technical_at: float
+    closing_at: float
+
+    def phase(self, time_left: float) -> str:
+        if time_left <= self.closing_at:
+            return CLOSING
+        if time_left <= self.technical_at:
+            return TECHNICAL
+        return INTRODUCTION
+
+
+@lru_cache(maxsize=256)
+def phase_schedule(duration: int) -> PhaseSchedule:
+    return PhaseSchedule(
+        duration=duration,
+        technical_at=(1 - INTRODUCTION_SHARE) * duration,
+        closing_at=CLOSING_SECONDS,
+    )
+
+
+class SessionClock:
+    """Time into an interview, measured on the server's monotonic clock."""
+
+    def __init__(self, duration: int, elapsed: float = 0.0):
+        self.duration = duration
+        self.schedule = phase_schedule(duration)
+        self._elapsed = elapsed  # seconds already used before this clock started
+        self._started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed + time.monotonic() - self._started
+
+    @property
+    def time_left(self) -> int:
+        return max(0, round(self.duration - self.elapsed))
+
+    @property
+    def phase(self) -> str:
+        return self.schedule.phase(self.time_left)
@@ -0,0 +1,425 @@
+"""
+Docstring for providers
+
+Speech provider registry with health tracking and automatic failover.
+
+Each session picks its STT and TTS backends by name, from the init message or
+settings, and gets a chain of fallbacks behind them. Connect time and TTS
+first-byte latency are recorded per provider for the whole process. A provider
+that errors or breaches its latency threshold is put on a cooldown, so new
+sessions start on the next healthy provider. A live session's FailoverSTT or
+FailoverTTS moves to the next provider in its chain. For TTS, the text of the
+current turn is replayed on the new provider.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from loguru import logger
+
+from deepgram import DeepgramSTT, DeepgramTTS
+from elevenlabs_tts import ElevenLabsTTS
+from events import STTEvent, TTSChunkEvent
+from metrics import Histogram
+from settings import settings
+from tts_cache import phrase_key, tts_cache
+
+
+# Provider name -> client class. Clients raise ValueError when they are not
+# configured (e.g. a missing API key) and are then skipped.
+STT_PROVIDERS: dict[str, Callable] = {
+    "deepgram": DeepgramSTT,
+}
+TTS_PROVIDERS: dict[str, Callable] = {
+    "deepgram": DeepgramTTS,
+    "elevenlabs": ElevenLabsTTS,
+}
+
+provider_latency_seconds = Histogram(
+    "speech_provider_latency_seconds",
+    "Connect and first-byte latency of speech providers.",
+    labelnames=("kind", "provider", "phase"),
+)
+
+
+@dataclass
+class ProviderHealth:
+    """Process-wide health of one provider."""
+    failures: int = 0
+    unhealthy_until: float = 0.0  # monotonic time the cooldown ends
+    connect_ewma: Optional[float] = None  # seconds
+    first_byte_ewma: Optional[float] = None  # seconds
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+
+_health: dict[tuple[str, str], ProviderHealth] = {}
+
+# queued to make a consumer waiting for events re-read its timeout
+_WAKE = object()
+
+
+def provider_health(kind: str, name: str) -> ProviderHealth:
+    return _health.setdefault((kind, name), ProviderHealth())
+
+
+def record_latency(kind: str, name: str, phase: str, seconds: float) -> None:
+    provider_latency_seconds.observe(seconds, kind=kind, provider=name, phase=phase)
+    health = provider_health(kind, name)
+    attr = f"{phase}_ewma"
+    previous = getattr(health, attr)
+    setattr(health, attr, seconds if previous is None else 0.8 * previous + 0.2 * seconds)
+
+
+def mark_unhealthy(kind: str, name: str, reason: str) -> None:
+    health = provider_health(kind, name)
+    health.failures += 1
+    health.unhealthy_until = time.monotonic() + settings.PROVIDER_COOLDOWN_SECONDS
+    logger.warning(f"{kind.upper()} provider '{name}' marked unhealthy: {reason}")
+
+
+def provider_chain(kind: str, preferred: Optional[str] = None) -> list[str]:
+    """
+    Ordered provider names for a new session: the requested provider, the
+    configured primary, then the configured fallbacks. Healthy providers come
+    first, and otherwise the configured order is kept.
+    """
+    if kind == "stt":
+        registry, primary, fallbacks = STT_PROVIDERS, settings.STT_PROVIDER, settings.STT_FALLBACK_PROVIDERS
+    else:
+        registry, primary, fallbacks = TTS_PROVIDERS, settings.TTS_PROVIDER, settings.TTS_FALLBACK_PROVIDERS
+
+    if preferred and preferred not in registry:
+        logger.warning(f"Unknown {kind.upper()} provider '{preferred}', using '{primary}'")
+
+    names: list[str] = []
+    for name in (preferred, primary, *fallbacks):
+        if name and name in registry and name not in names:
+            names.append(name)
+    return sorted(names, key=lambda name: not provider_health(kind, name).healthy)
+
+
+class _FailoverClient:
+    """
+    Routes calls to the active provider in a chain and forwards its events.
+
+    A call that raises, or whose first use (which opens the connection) takes
+    longer than PROVIDER_CONNECT_TIMEOUT_MS, marks the provider unhealthy and
+    moves the session to the next one.
+    """
+
+    kind: str
+    registry: dict[str, Callable]
+
+    def __init__(self, chain: list[str]):
+        self._chain = list(chain)
+        # size 1 so a slow consumer still pushes back on the provider socket
+        self._events: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._forwarders: set[asyncio.Task] = set()
+        self._closed = False
+        self._connected = False
+        self.name: Optional[str] = None
+        self.client = None
+        if not self._activate_next():
+            raise ValueError(f"No configured {self.kind.upper()} provider in {chain}")
+
+    def _activate_next(self) -> bool:
+        while self._chain:
+            name = self._chain.pop(0)
+            try:
+                client = self.registry[name]()
+            except ValueError as e:
+                logger.warning(f"Skipping {self.kind.upper()} provider '{name}': {e}")
+                continue
+
+            previous = self.client
+            self.name, self.client, self._connected = name, client, False
+            forwarder = asyncio.create_task(self._forward(client))
+            self._forwarders.add(forwarder)
+            forwarder.add_done_callback(self._forwarders.discard)
+            if previous is not None:
+                asyncio.create_task(previous.close())
+            logger.info(f"{self.kind.upper()} provider: {name}")
+            return True
+        return False
+
+    async def _forward(self, client) -> None:
+        try:
+            async for event in client.receive_events():
+                self._observe(client, event)
+                await self._events.put((client, event))
+        except Exception as e:
+            logger.error(f"{self.kind.upper()} provider stream failed: {e}")
+        await self._events.put((client, None))
+
+    def _observe(self, client, event) -> None:
+        """Sees every provider event in order, before it is queued for the consumer."""
+
+    async def _failover(self, reason: str) -> bool:
+        """Mark the active provider unhealthy and switch to the next one, if any."""
+        mark_unhealthy(self.kind, self.name, reason)
+        if self._closed or not self._activate_next():
+            return False
+        return True
+
+    async def _resume(self) -> bool:
+        """Restore session state on a new provider; False if the pending call is already covered."""
+        return True
+
+    async def _safe_resume(self) -> None:
+        """_resume() from the receive side, where a failure must not end the stream."""
+        try:
+            await self._resume()
+        except Exception as e:
+            logger.error(f"{self.kind.upper()} provider '{self.name}' failed to resume: {e}")
+
+    async def _call(self, operation: Callable[[object], Awaitable[None]]) -> None:
+        while True:
+            connecting = not self._connected
+            timeout = settings.PROVIDER_CONNECT_TIMEOUT_MS / 1000 if connecting else None
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(operation(self.client), timeout=timeout)
+            except Exception as e:
+                reason = "connect timed out" if isinstance(e, asyncio.TimeoutError) else f"{type(e).__name__}: {e}"
+                if not await self._failover(reason):
+                    raise
+                if not await self._resume():
+                    return
+                continue
+
+            if connecting:
+                self._connected = True
+                record_latency(self.kind, self.name, "connect", time.monotonic() - started)
+            return
+
+    def _wake(self) -> None:
+        """Make a consumer blocked in _next_event re-read its timeout."""
+        if self._events.empty():
+            self._events.put_nowait((self.client, _WAKE))
+
+    async def _next_event(self, timeout: Callable[[], Optional[float]] = lambda: None):
+        """
+        The next event of the active provider; None once the session is closed.
+        `timeout` gives the seconds left to wait, and is re-read after each _wake().
+        """
+        while True:
+            client, event = await asyncio.wait_for(self._events.get(), timeout=timeout())
+            if client is not self.client or event is _WAKE:
+                # leftovers from a provider we already moved away from, or a wake-up
+                continue
+            if event is not None:
+                return event
+            if self._closed or not await self._failover("stream ended unexpectedly"):
+                return None
+            await self._safe_resume()
+
+    async def close(self) -> None:
+        self._closed = True
+        for forwarder in list(self._forwarders):
+            forwarder.cancel()
+        await self.client.close()
+        # wake the consumer even if a forwarder was blocked on a full queue
+        while not self._events.empty():
+            self._events.get_nowait()
+        self._events.put_nowait((self.client, None))
+
+
+class FailoverSTT(_FailoverClient):
+    """Streaming STT over a provider chain."""
+
+    kind = "stt"
+    registry = STT_PROVIDERS
+
+    @property
+    def sample_rate(self) -> int:
+        return self.client.sample_rate
+
+    async def receive_events(self) -> AsyncIterator[STTEvent]:
+        while (event := await self._next_event()) is not None:
+            yield event
+
+    async def send_audio(self, audio_data: bytes) -> None:
+        await self._call(lambda client: client.send_audio(audio_data))
+
+    async def keepalive(self) -> None:
+        await self.client.keepalive()
+
+
+class FailoverTTS(_FailoverClient):
+    """
+    Streaming TTS over a provider chain.
+
+    The first audio of each agent turn must arrive within
+    TTS_FIRST_BYTE_TIMEOUT_MS of its first flush. Otherwise the next provider
+    takes over and the turn's text is spoken again from the start.
+
+    The audio of each flushed phrase is recorded into the TTS cache, and
+    handed to `on_flushed`, once the provider reports the flush complete.
+    """
+
+    kind = "tts"
+    registry = TTS_PROVIDERS
+
+    def __init__(self, chain: list[str]):
+        self._turn_id = 0
+        self._turn_text: list[str] = []  # text of the current turn, for replay
+        self._flushed = False
+        self._heard = False  # first audio of the current turn has arrived
+        self._flush_started: Optional[float] = None
+        self._phrase: list[str] = []  # text sent since the last flush
+        self._recording_keys: deque[Optional[str]] = deque()  # cache key per pending flush
+        self._recording = bytearray()
+        # called with the audio of each flushed phrase once the provider has sent all of it
+        self.on_flushed: Optional[Callable[[bytes], None]] = None
+        super().__init__(chain)
+
+    @property
+    def turn_id(self) -> int:
+        return self._turn_id
+
+    @turn_id.setter
+    def turn_id(self, turn_id: int) -> None:
+        if turn_id != self._turn_id:
+            self._turn_text, self._flushed, self._heard, self._flush_started = [], False, False, None
+        self._turn_id = turn_id
+        self.client.turn_id = turn_id
+
+    def _activate_next(self) -> bool:
+        if not super()._activate_next():
+            return False
+        client = self.client
+        client.turn_id = self._turn_id
+        client.on_flushed = lambda: self._phrase_done(client)
+        self._recording_keys.clear()
+        self._recording.clear()
+        return True
+
+    @property
+    def sample_rate(self) -> int:
+        return self.client.sample_rate
+
+    def cache_key(self, text: str) -> str:
+        """TTS cache key of `text` spoken by the active provider."""
+        client = self.client
+        return phrase_key(self.name, client.voice, client.model, client.sample_rate, text)
+
+    def _observe(self, client, event) -> None:
+        if client is self.client and self._recording_keys:
+            self._recording.extend(event.audio_data)
+
+    def _phrase_done(self, client) -> None:
+        if client is not self.client or not self._recording_keys:
+            return
+        key = self._recording_keys.popleft()
+        audio = bytes(self._recording)
+        self._recording.clear()
+        if key and tts_cache:
+            tts_cache.put(key, audio)
+        if self.on_flushed:
+            self.on_flushed(audio)
+
+    async def _resume(self) -> bool:
+        if self._heard or not self._turn_text:
+            return True
+        # nothing of this turn has been heard yet: say all of it on the new provider
+        self._flush_started = None
+        text = "".join(self._turn_text)
+        await self._call(lambda client: client.send_text(text))
+        if self._flushed:
+            await self.flush()
+        return False
+
+    def _first_byte_timeout(self) -> Optional[float]:
+        if self._flush_started is None:
+            return None
+        deadline = self._flush_started + settings.TTS_FIRST_BYTE_TIMEOUT_MS / 1000
+        return max(0.0, deadline - time.monotonic())
+
+    async def receive_events(self) -> AsyncIterator[TTSChunkEvent]:
+        while True:
+            try:
+                event = await self._next_event(self._first_byte_timeout)
+            except asyncio.TimeoutError:
+                self._flush_started = None
+                if await self._failover("no audio before the first-byte timeout"):
+                    await self._safe_resume()
+                continue
+
+            if event is None:
+                return
+            if self._flush_started is not None:
+                record_latency(self.kind, self.name, "first_byte", time.monotonic() - self._flush_started)
+                self._flush_started = None
+            if event.turn_id == self._turn_id:
+                self._heard = True
+            yield event
+
+    async def send_text(self, text_output: str) -> None:
+        if not self._heard:
+            self._turn_text.append(text_output)
+        self._phrase.append(text_output)
+        await self._call(lambda client: client.send_text(text_output))
+
+    async def flush(self) -> None:
+        phrase, self._phrase = "".join(self._phrase), []
+        cacheable = tts_cache is not None and tts_cache.cacheable(phrase)
+        self._recording_keys.append(self.cache_key(phrase) if cacheable else None)
+        if not self._heard:
+            self._flushed = True
+            if self._flush_started is None:
+                self._flush_started = time.monotonic()
+                # the receiver may be waiting without a deadline
+                self._wake()
+        await self._call(lambda client: client.flush())
+
+    async def clear(self) -> None:
+        # barge-in: nothing of this turn will be replayed
+        self._turn_text, self._heard, self._flush_started = [], True, None
+        self._phrase = []
+        self._recording_keys.clear()
+        self._recording.clear()
+        await self.client.clear()
+
+
+def tts_voice(name: str) -> tuple[str, str, int]:
+    """(voice, model, sample rate) of a TTS provider, read without connecting to it."""
+    client = TTS_PROVIDERS[name]()
+    return client.voice, client.model, client.sample_rate
+
+
+async def synthesize(text: str, chain: list[str], timeout: float) -> tuple[str, int, bytes]:
+    """
+    Speak `text` once on a throwaway TTS client, outside any session.
+
+    Returns the provider that spoke it, its sample rate and all of the audio.
+    """
+    tts = FailoverTTS(chain)
+    done: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def flushed(audio: bytes) -> None:
+        if not done.done():
+            done.set_result(audio)
+
+    tts.on_flushed = flushed
+
+    async def drain():
+        # keeps the provider socket read (and the first-byte timeout armed)
+        async for _ in tts.receive_events():
+            pass
+
+    drainer = asyncio.create_task(drain())
+    try:
+        tts.turn_id = 1
+        await tts.send_text(text)
+        await tts.flush()
+        audio = await asyncio.wait_for(done, timeout=timeout)
+        return tts.name, tts.sample_rate, audio
+    finally:
+        drainer.cancel()
+        await tts.close()
@@ -0,0 +1,80 @@
+"""
+Docstring for resume
+
+Resume PDF text extraction.
+
+Parsing runs in a worker process pool so a large PDF never blocks the event
+loop that serves every other live session. Results are cached by content hash,
+so a resume reused across practice sessions is parsed once.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from loguru import logger
+
+from assets import ContentStore, content_id
+from settings import settings
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+# sha256 of the PDF -> extracted text
+_cache: ContentStore[str] = ContentStore(settings.RESUME_CACHE_SIZE)
+
+# sha256 -> parse in progress, so concurrent sessions share one parse
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def extract_pdf_text(pdf_bytes: bytes) -> str:
+    """Extract the text of every page of an in-memory PDF."""
+    import pymupdf
+
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return "\n".join(page.get_text() for page in doc)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.RESUME_PARSER_WORKERS)
+    return _executor
+
+
+def resume_hash(pdf_bytes: bytes) -> str:
+    """Content hash used as the cache key (and upload ID) for a resume."""
+    return content_id(pdf_bytes)
+
+
+def get_resume_text(resume_id: str) -> Optional[str]:
+    """Return the text of a previously parsed resume, if it is still cached."""
+    return _cache.get(resume_id)
+
+
+async def load_resume_text(pdf_bytes: bytes) -> str:
+    """
+    Return the text of a resume PDF, parsing it off the event loop if it has
+    not been seen before.
+    """
+    key = resume_hash(pdf_bytes)
+
+    cached = _cache.get(key)
+    if cached is not None:
+        logger.info(f"Resume cache hit {key[:12]}")
+        return cached
+
+    if key in _inflight:
+        return await asyncio.shield(_inflight[key])
+
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_get_executor(), extract_pdf_text, pdf_bytes)
+    _inflight[key] = future
+    try:
+        text = await asyncio.shield(future)
+    finally:
+        _inflight.pop(key, None)
+
+    _cache.put(key, text)
+    logger.info(f"Parsed resume {key[:12]} ({len(pdf_bytes)} bytes)")
+    return text
@@ -0,0 +1,276 @@
+"""
+Docstring for session_store
+
+Externalized interview session state.
+
+A session record holds everything needed to rebuild a VoicePipeline on any
+worker: the conversation thread ID, the interview inputs and the progress
+flags. The conversation itself lives in the checkpointer (see checkpointer.py),
+so resuming on another worker also needs a shared checkpointer such as
+CHECKPOINT_SQLITE_PATH.
+
+- LocalSessionStore: in-process, for a single worker.
+- SQLiteSessionStore: a SQLite file shared by every worker on a host, also
+  handy in tests.
+
+Only one connection holds a session at a time. Resuming a session claims its
+record, which bumps the record's generation; writes made with an older
+generation are refused. A pipeline still parked on another worker (or on this
+one) thereby learns it was superseded, stops, and leaves the record alone.
+
+Uploaded assets (job descriptions, parsed resume text) are cached per process
+by assets.py and resume.py. The SQLite store also keeps a copy by asset ID,
+so a session can reference an upload that another worker received.
+"""
+
+import abc
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from loguru import logger
+
+from settings import settings
+
+
+# identifies this worker process as the owner of the sessions it claims
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class SessionRecord:
+    """Everything needed to resume an interview session on any worker."""
+    session_id: str
+    thread_id: str
+    resume_token: str = ""  # secret required to resume the session
+    job_description: str = ""
+    resume: str = "N/A"
+    duration: int = 0
+    time_left: int = 0
+    stt_provider: Optional[str] = None
+    tts_provider: Optional[str] = None
+    has_triggered: bool = False  # the opening line has already been spoken
+    turn_id: int = 0
+    owner: str = ""  # worker that last claimed the session
+    generation: int = 0  # bumped by every claim; writes with an older one are refused
+    updated_at: float = field(default_factory=time.time)  # unix seconds
+
+
+class SessionStore(abc.ABC):
+    """Interface of session stores. Records expire after `ttl_seconds` without an update."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+
+    @abc.abstractmethod
+    async def get(self, session_id: str) -> Optional[SessionRecord]:
+        ...
+
+    @abc.abstractmethod
+    async def put(self, record: SessionRecord) -> None:
+        """Write a record unconditionally, e.g. for a new session."""
+
+    @abc.abstractmethod
+    async def claim(self, session_id: str, owner: str) -> Optional[SessionRecord]:
+        """Take a session over for `owner`, bumping its generation. None if it is unknown or expired."""
+
+    @abc.abstractmethod
+    async def save(self, record: SessionRecord) -> bool:
+        """Write a record unless the session was claimed since `record` was read."""
+
+    @abc.abstractmethod
+    async def delete(self, session_id: str, generation: Optional[int] = None) -> None:
+        """Remove a session; with `generation`, only if it was not claimed since."""
+
+    @abc.abstractmethod
+    async def put_asset(self, asset_id: str, content: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def get_asset(self, asset_id: str) -> Optional[str]:
+        ...
+
+    def _expired(self, record: SessionRecord) -> bool:
+        return time.time() - record.updated_at > self.ttl_seconds
+
+
+class LocalSessionStore(SessionStore):
+    """In-process store, bounded like the in-memory checkpointer."""
+
+    def __init__(self, ttl_seconds: float, max_sessions: int = 1000):
+        super().__init__(ttl_seconds)
+        self.max_sessions = max_sessions
+        self._records: OrderedDict[str, SessionRecord] = OrderedDict()
+
+    async def get(self, session_id: str) -> Optional[SessionRecord]:
+        record = self._records.get(session_id)
+        if record is None or self._expired(record):
+            self._records.pop(session_id, None)
+            return None
+        return SessionRecord(**asdict(record))
+
+    async def put(self, record: SessionRecord) -> None:
+        record.updated_at = time.time()
+        self._records[record.session_id] = SessionRecord(**asdict(record))
+        self._records.move_to_end(record.session_id)
+        while len(self._records) > self.max_sessions:
+            self._records.popitem(last=False)
+
+    async def claim(self, session_id: str, owner: str) -> Optional[SessionRecord]:
+        record = await self.get(session_id)
+        if record is None:
+            return None
+        record.owner = owner
+        record.generation += 1
+        await self.put(record)
+        return record
+
+    async def save(self, record: SessionRecord) -> bool:
+        stored = await self.get(record.session_id)
+        if stored is None or stored.generation != record.generation:
+            return False
+        await self.put(record)
+        return True
+
+    async def delete(self, session_id: str, generation: Optional[int] = None) -> None:
+        record = self._records.get(session_id)
+        if record is not None and (generation is None or record.generation == generation):
+            del self._records[session_id]
+
+    async def put_asset(self, asset_id: str, content: str) -> None:
+        # assets.py and resume.py already hold this worker's uploads
+        pass
+
+    async def get_asset(self, asset_id: str) -> Optional[str]:
+        return None
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Store backed by a SQLite file, safe to share between worker processes.
+
+    Each call opens its own connection on a worker thread so the event loop
+    never blocks on disk.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        super().__init__(ttl_seconds)
+        self.path = path
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, record TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS assets ("
+                "asset_id TEXT PRIMARY KEY, content TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _get(self, session_id: str) -> Optional[SessionRecord]:
+        with self._connect() as db:
+            return self._read(db, session_id)
+
+    def _put(self, record: SessionRecord) -> None:
+        with self._connect() as db:
+            self._write(db, record)
+            db.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_seconds,))
+
+    def _read(self, db: sqlite3.Connection, session_id: str) -> Optional[SessionRecord]:
+        row = db.execute("SELECT record FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        record = SessionRecord(**json.loads(row[0]))
+        return None if self._expired(record) else record
+
+    def _write(self, db: sqlite3.Connection, record: SessionRecord) -> None:
+        record.updated_at = time.time()
+        db.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, record, updated_at) VALUES (?, ?, ?)",
+            (record.session_id, json.dumps(asdict(record)), record.updated_at),
+        )
+
+    def _claim(self, session_id: str, owner: str) -> Optional[SessionRecord]:
+        with self._connect() as db:
+            # read and bump under the write lock so two workers cannot both claim one generation
+            db.execute("BEGIN IMMEDIATE")
+            record = self._read(db, session_id)
+            if record is None:
+                return None
+            record.owner = owner
+            record.generation += 1
+            self._write(db, record)
+        return record
+
+    def _save(self, record: SessionRecord) -> bool:
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            stored = self._read(db, record.session_id)
+            if stored is None or stored.generation != record.generation:
+                return False
+            self._write(db, record)
+        return True
+
+    def _delete(self, session_id: str, generation: Optional[int] = None) -> None:
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            stored = self._read(db, session_id)
+            if stored is None or generation is None or stored.generation == generation:
+                db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def _put_asset(self, asset_id: str, content: str) -> None:
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO assets (asset_id, content, updated_at) VALUES (?, ?, ?)",
+                (asset_id, content, time.time()),
+            )
+            db.execute("DELETE FROM assets WHERE updated_at < ?", (time.time() - self.ttl_seconds,))
+
+    def _get_asset(self, asset_id: str) -> Optional[str]:
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT content FROM assets WHERE asset_id = ? AND updated_at >= ?",
+                (asset_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return row[0] if row else None
+
+    async def get(self, session_id: str) -> Optional[SessionRecord]:
+        return await asyncio.to_thread(self._get, session_id)
+
+    async def put(self, record: SessionRecord) -> None:
+        await asyncio.to_thread(self._put, record)
+
+    async def claim(self, session_id: str, owner: str) -> Optional[SessionRecord]:
+        return await asyncio.to_thread(self._claim, session_id, owner)
+
+    async def save(self, record: SessionRecord) -> bool:
+        return await asyncio.to_thread(self._save, record)
+
+    async def delete(self, session_id: str, generation: Optional[int] = None) -> None:
+        await asyncio.to_thread(self._delete, session_id, generation)
+
+    async def put_asset(self, asset_id: str, content: str) -> None:
+        await asyncio.to_thread(self._put_asset, asset_id, content)
+
+    async def get_asset(self, asset_id: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get_asset, asset_id)
+
+
+def create_session_store() -> SessionStore:
+    """Build the session store configured in settings."""
+    if settings.SESSION_STORE_PATH:
+        logger.info(f"Session store: using SQLite at {settings.SESSION_STORE_PATH}")
+        return SQLiteSessionStore(settings.SESSION_STORE_PATH, settings.SESSION_TTL_SECONDS)
+    return LocalSessionStore(settings.SESSION_TTL_SECONDS, max_sessions=settings.CHECKPOINT_MAX_THREADS)
+
+
+session_store = create_session_store()
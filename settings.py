@@ -14,18 +14,103 @@ class Settings(BaseSettings):
     )
 
     AGENT_TRIGGER: bool = Field(default=True, description="Agent First communication")
+    GREETING_PRECOMPUTE: bool = Field(default=True, description="Generate and synthesize the opening line while the session is being set up")
+    GREETING_CACHE_SIZE: int = Field(default=64, description="Opening lines kept per job description and resume")
+
+
+    BINARY_AUDIO_FRAMES: bool = Field(default=True, description="Allow clients to negotiate binary WebSocket frames for TTS audio")
+    OPUS_ENABLED: bool = Field(default=True, description="Allow clients with binary audio to negotiate Opus in both directions (requires opuslib)")
+    OPUS_BITRATE: int = Field(default=24000, description="Bitrate of Opus-encoded TTS audio sent to clients")
+    OPUS_TAIL_FLUSH_MS: int = Field(default=60, description="Pause in TTS audio after which the Opus encoder pads and sends the partial frame it carries over")
+    CODEC_WORKERS: int = Field(default=2, description="Threads used for Opus encoding/decoding")
+
+
+    EMIT_TURN_METRICS: bool = Field(default=False, description="Send per-turn stage latencies to the client as turn_metrics events")
 
 
     ENVIRONMENT: str = Field(default="development", description="Environment to run the application in")
 
+    # SPEECH PROVIDERS
+    STT_PROVIDER: str = Field(default="deepgram", description="Default STT provider (see providers.STT_PROVIDERS)")
+    STT_FALLBACK_PROVIDERS: list[str] = Field(default=[], description="STT providers to fail over to, in order")
+    TTS_PROVIDER: str = Field(default="deepgram", description="Default TTS provider (see providers.TTS_PROVIDERS)")
+    TTS_FALLBACK_PROVIDERS: list[str] = Field(default=["elevenlabs"], description="TTS providers to fail over to, in order")
+    PROVIDER_CONNECT_TIMEOUT_MS: float = Field(default=1500, description="Connect time above which a provider is abandoned for the next one")
+    TTS_FIRST_BYTE_TIMEOUT_MS: float = Field(default=1500, description="Wait for a turn's first audio before failing over to the next TTS provider")
+    PROVIDER_COOLDOWN_SECONDS: float = Field(default=60, description="How long a failed provider is skipped by new sessions")
+
     # SPEECH-TO-TEXT SETTINGS
     DEEPGRAM_API_KEY: Optional[str] = Field(default=None, description="Deepgram API key for STT service")
+    SPECULATIVE_LLM: bool = Field(default=False, description="Start the agent on a high-confidence partial transcript before end of turn")
+    SPECULATIVE_EOT_CONFIDENCE: float = Field(default=0.7, description="End-of-turn confidence at which a speculative agent run starts")
+    STT_FRAME_MS: int = Field(default=100, ge=20, le=100, description="Duration of the fixed frames candidate audio is re-chunked into before STT; keep it a divisor or multiple of the client's 100 ms chunks")
+    STT_FRAME_MAX_HOLD_MS: int = Field(default=250, description="How long a partial frame waits for more candidate audio before it is sent as is; keep it well above the client's chunk interval")
+    VAD_ENABLED: bool = Field(default=True, description="Drop silent audio between candidate turns instead of streaming it to STT")
+    VAD_FRAME_MS: int = Field(default=20, description="Frame length the silence gate classifies")
+    VAD_THRESHOLD_DBFS: float = Field(default=-50, description="Frames quieter than this are never speech")
+    VAD_NOISE_MARGIN_DB: float = Field(default=10, description="How far above the adaptive noise floor a frame must be to count as speech")
+    VAD_HANGOVER_MS: int = Field(default=600, description="Audio still sent after speech stops")
+    VAD_PREROLL_MS: int = Field(default=200, description="Audio sent from before a speech onset so it is not clipped")
+    STT_KEEPALIVE_SECONDS: float = Field(default=5, description="Send the STT provider a keepalive after this long without audio")
+    DEEPGRAM_BASE_URL: str = Field(default="wss://api.deepgram.com", description="Deepgram WebSocket base URL (override to point at a local mock)")
+    DEEPGRAM_POOL_SIZE: int = Field(default=2, description="Warm Deepgram connections kept per endpoint (0 disables pooling)")
+    DEEPGRAM_STT_POOL_MAX_IDLE_SECONDS: float = Field(default=8, description="Replace pooled STT sockets before Deepgram's idle timeout closes them")
+    DEEPGRAM_TTS_POOL_MAX_IDLE_SECONDS: float = Field(default=60, description="Replace pooled TTS sockets after this long unused")
+    DEEPGRAM_POOL_HEALTH_INTERVAL: float = Field(default=5, description="Seconds between health checks of pooled connections")
+
+
+    # TEXT-TO-SPEECH SETTINGS
+    TTS_QUEUE_HIGH_WATER: int = Field(default=64, description="Audio chunks buffered per session before the TTS stage stops reading from the vendor (0 = unbounded)")
+    TTS_MIN_CLAUSE_CHARS: int = Field(default=40, description="Minimum buffered characters before TTS starts on a clause boundary instead of a sentence boundary")
+    TTS_CACHE_ENABLED: bool = Field(default=True, description="Reuse synthesized audio for phrases that were spoken before")
+    TTS_CACHE_MEMORY_ITEMS: int = Field(default=256, description="Phrases kept in the in-process TTS cache")
+    TTS_CACHE_DIR: Optional[str] = Field(default=None, description="Directory for the shared on-disk TTS cache (memory-mapped on read)")
+    TTS_CACHE_MAX_CHARS: int = Field(default=200, description="Longest phrase that is cached")
+    TTS_CACHE_MIN_OCCURRENCES: int = Field(default=2, ge=1, description="Times a phrase is synthesized before its audio is cached, so one-off personalized lines are not stored")
+    TTS_CACHE_DIR_MAX_MB: float = Field(default=256, description="Size of the on-disk TTS cache above which the least recently used files are deleted")
+    TTS_CACHE_FRAME_MS: int = Field(default=100, description="Audio per message when serving cached phrases")
+    TTS_SYNTHESIS_TIMEOUT_SECONDS: float = Field(default=15.0, description="Longest wait for audio synthesized ahead of time (opening line, fillers)")
+
+    # FILLERS: short acknowledgements played while a slow reply is generated
+    FILLER_ENABLED: bool = Field(default=False, description="Play a pre-synthesized filler when the reply is slow to start")
+    FILLER_DELAY_MS: int = Field(default=1200, description="Time after the candidate's end of turn without agent output before a filler plays")
+    FILLER_PHRASES: list[str] = Field(
+        default=["Okay, let me think about that.", "Hmm, good question.", "Right, give me a second.", "Alright, let me see."],
+        description="Filler phrases, synthesized once at startup",
+    )
+    FILLER_DIR: Optional[str] = Field(default=None, description="Directory of filler PCM files, reused across restarts and written on first synthesis")
 
 
     # LLM SETTINGS FOR AGENT
     OPENAI_API_KEY: Optional[str] = Field(default=None, description="OpenAI API key for LLM access")
     GEMINI_API_KEY: Optional[str] = Field(default=None, description="Gemini API key for LLM access")
     LLM_MODEL_NAME: str = Field(default="gpt-4.1", description="LLM model name to use")
+    LLM_FAST_MODEL_NAME: Optional[str] = Field(default=None, description="Low-latency model for acknowledgements and clarification requests, e.g. gpt-4.1-nano (unset uses LLM_MODEL_NAME for every turn)")
+    LLM_FAST_TURN_MAX_WORDS: int = Field(default=8, description="Longest candidate turn that can be routed to the fast model")
+    HISTORY_TOKEN_BUDGET: int = Field(default=4000, description="Approximate history size in tokens above which older turns are summarized")
+    HISTORY_TOKEN_LOW_WATER: int = Field(default=2000, description="Approximate history size in tokens that a compaction reduces the history to")
+    HISTORY_KEEP_TURNS: int = Field(default=6, ge=1, description="Number of most recent exchanges always sent to the model verbatim")
+    HISTORY_SUMMARY_MAX_WORDS: int = Field(default=250, description="Target length of the rolling summary of older turns")
+
+    # RESUME PARSING
+    RESUME_PARSER_WORKERS: int = Field(default=2, description="Worker processes used to extract resume PDF text")
+    RESUME_CACHE_SIZE: int = Field(default=128, description="Number of parsed resumes cached by content hash")
+
+    ASSET_CACHE_SIZE: int = Field(default=512, description="Number of uploaded job descriptions kept for reference by ID")
+
+    # CONVERSATION CHECKPOINTS
+    CHECKPOINT_MAX_THREADS: int = Field(default=1000, description="Maximum number of conversations kept in memory before LRU eviction")
+    CHECKPOINT_TTL_SECONDS: float = Field(default=7200, description="Idle time after which an in-memory conversation is evicted")
+    CHECKPOINT_SQLITE_PATH: Optional[str] = Field(default=None, description="SQLite file for resumable conversations (requires langgraph-checkpoint-sqlite)")
+
+    # SESSIONS & SCALE-OUT
+    SESSION_STORE_PATH: Optional[str] = Field(default=None, description="SQLite file for session records and uploaded assets shared by all workers (in-process when unset)")
+    SESSION_GRACE_SECONDS: float = Field(default=30, description="How long a session's pipeline stays parked after its socket drops, waiting for a reconnect")
+    SESSION_REPLAY_MAX_KB: int = Field(default=1024, description="Unacknowledged agent text and audio kept for replay on reconnect, oldest dropped first (1 MB is about 20 s of 24 kHz audio)")
+    SESSION_TTL_SECONDS: float = Field(default=7200, description="Idle time after which a session can no longer be resumed")
+    HOST: str = Field(default="0.0.0.0", description="Address the server binds to")
+    PORT: int = Field(default=8000, description="Port the server listens on")
+    WORKERS: int = Field(default=1, description="Worker processes to run; more than one needs shared session and checkpoint stores")
 
     # MongoDB Database
     DATABASE_HOST: str = Field(default="mongodb://localhost:27017", description="MongoDB connection string")
@@ -36,6 +121,7 @@ class Settings(BaseSettings):
 
     # ELEVENLABS SETTINGS
     ELEVENLABS_API_KEY: Optional[str] = Field(default=None, description="ElevenLabs API key for TTS service")
+    ELEVENLABS_BASE_URL: str = Field(default="wss://api.elevenlabs.io", description="ElevenLabs WebSocket base URL (override to point at a local mock)")
 
 
     @property
@@ -0,0 +1,12 @@
+"""
+Shared test setup.
+
+Settings are read when app modules are imported, so the environment has to be
+in place first. A placeholder API key lets the agent module build its chat
+models without talking to anyone; tests never call them.
+"""
+
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ENVIRONMENT", "test")
@@ -0,0 +1,102 @@
+import asyncio
+
+from utils import BoundedQueue, merge_async_iters
+
+
+def test_put_blocks_at_high_water_mark():
+    async def run():
+        queue = BoundedQueue(maxsize=2)
+        await queue.put(1)
+        await queue.put(2)
+        blocked = asyncio.create_task(queue.put(3))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        assert await queue.get() == 1
+        await asyncio.wait_for(blocked, 1)
+        assert queue.qsize() == 2
+
+    asyncio.run(run())
+
+
+def test_bypass_and_force_skip_the_bound():
+    async def run():
+        queue = BoundedQueue(maxsize=1, bypass=lambda item: item == "control")
+        await queue.put("audio")
+        await asyncio.wait_for(queue.put("control"), 1)
+        await asyncio.wait_for(queue.put("more audio", force=True), 1)
+        assert [await queue.get() for _ in range(3)] == ["audio", "control", "more audio"]
+
+    asyncio.run(run())
+
+
+def test_coalesce_replaces_queued_item_in_place():
+    async def run():
+        queue = BoundedQueue(coalesce_key=lambda item: "partial" if item.startswith("partial") else None)
+        for item in ("partial 1", "audio", "partial 2"):
+            await queue.put(item)
+        assert [await queue.get() for _ in range(2)] == ["partial 2", "audio"]
+        assert queue.stats.coalesced == 1
+
+        # once dequeued, the key no longer coalesces
+        await queue.put("partial 3")
+        assert await queue.get() == "partial 3"
+
+    asyncio.run(run())
+
+
+def test_purge_wakes_blocked_producer():
+    async def run():
+        queue = BoundedQueue(maxsize=2)
+        await queue.put("stale")
+        await queue.put("stale")
+        blocked = asyncio.create_task(queue.put("fresh"))
+        await asyncio.sleep(0.01)
+
+        assert await queue.purge(lambda item: item == "stale") == 2
+        await asyncio.wait_for(blocked, 1)
+        assert await queue.get() == "fresh"
+
+    asyncio.run(run())
+
+
+def test_stats_and_observer():
+    observed = []
+
+    async def run():
+        queue = BoundedQueue(observer=lambda wait, depth: observed.append(depth))
+        for item in range(3):
+            await queue.put(item)
+        for _ in range(3):
+            await queue.get()
+        return queue.stats
+
+    stats = asyncio.run(run())
+    assert (stats.enqueued, stats.max_depth) == (3, 3)
+    assert observed == [2, 1, 0]
+
+
+def test_merge_drains_all_iterators_without_touching_the_queue_policy():
+    async def numbers():
+        for i in range(5):
+            yield i
+
+    async def letters():
+        for c in "abc":
+            yield c
+
+    def bypass(item):
+        return isinstance(item, str)
+
+    def coalesce_key(item):
+        return None
+
+    async def run():
+        queue = BoundedQueue(maxsize=1, bypass=bypass, coalesce_key=coalesce_key)
+        items = [item async for item in merge_async_iters(numbers(), letters(), queue=queue)]
+        assert queue.bypass is bypass and queue.coalesce_key is coalesce_key
+        return items
+
+    items = asyncio.run(run())
+    assert sorted(i for i in items if isinstance(i, int)) == [0, 1, 2, 3, 4]
+    assert [i for i in items if isinstance(i, str)] == ["a", "b", "c"]
@@ -0,0 +1,47 @@
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from agent import agent
+from checkpointer import BoundedMemorySaver, release_thread, sqlite_checkpointer
+from settings import settings
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_import_with_sqlite_path_set(tmp_path):
+    # the SQLite connection must not be opened at import, outside any event loop
+    env = dict(os.environ, CHECKPOINT_SQLITE_PATH=str(tmp_path / "checkpoints.db"))
+    result = subprocess.run([sys.executable, "-c", "import agent"], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_sqlite_checkpointer_attaches_inside_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CHECKPOINT_SQLITE_PATH", str(tmp_path / "checkpoints.db"))
+
+    async def run():
+        async with sqlite_checkpointer(agent) as saver:
+            assert isinstance(saver, AsyncSqliteSaver)
+            assert agent.checkpointer is saver
+            # threads on disk are kept for resumption
+            assert not await release_thread(agent.checkpointer, "thread")
+        assert isinstance(agent.checkpointer, BoundedMemorySaver)
+
+    asyncio.run(run())
+
+
+def test_sqlite_checkpointer_is_a_no_op_without_path(monkeypatch):
+    monkeypatch.setattr(settings, "CHECKPOINT_SQLITE_PATH", None)
+    before = agent.checkpointer
+
+    async def run():
+        async with sqlite_checkpointer(agent) as saver:
+            assert saver is None
+            assert agent.checkpointer is before
+
+    asyncio.run(run())
@@ -0,0 +1,62 @@
+import pytest
+from langchain.messages import AIMessage, HumanMessage
+
+import agent
+from agent import FAST_TIER, FULL_TIER, classify_turn, route_turn
+from phases import TECHNICAL
+
+
+@pytest.mark.parametrize("text", [
+    "Could you repeat the question?",
+    "Sorry, I didn't catch that.",
+    "What do you mean?",
+    "Can you hear me?",
+])
+def test_clarification_requests_use_the_fast_tier(text):
+    assert classify_turn(text) == FAST_TIER
+    assert classify_turn(text, agent_speaking=True) == FAST_TIER
+
+
+@pytest.mark.parametrize("text", ["Mm-hmm.", "Uh-huh", "Okay, got it.", "I see", "hmm"])
+def test_backchannels_over_the_agent_use_the_fast_tier(text):
+    assert classify_turn(text, agent_speaking=True) == FAST_TIER
+
+
+@pytest.mark.parametrize("text", ["Mm-hmm.", "Okay.", "Got it."])
+def test_backchannels_after_the_agent_finished_are_answers(text):
+    assert classify_turn(text) == FULL_TIER
+
+
+@pytest.mark.parametrize("text", ["Yes.", "No", "Sure.", "Right.", "Yeah, I'm ready."])
+def test_short_answers_use_the_full_tier(text):
+    assert classify_turn(text) == FULL_TIER
+    assert classify_turn(text, agent_speaking=True) == FULL_TIER
+
+
+def test_long_and_empty_turns_use_the_full_tier():
+    assert classify_turn("") == FULL_TIER
+    assert classify_turn("can you repeat that because the line dropped for a second there") == FULL_TIER
+
+
+def _state(text: str, **overrides) -> dict:
+    state = {
+        "messages": [AIMessage(content="Tell me about caching."), HumanMessage(content=text)],
+        "job_description": "", "resume": "N/A", "duration": 600, "time_left": 300,
+        "phase": TECHNICAL, "replied_phase": TECHNICAL, "summary": "", "agent_speaking": False,
+    }
+    state.update(overrides)
+    return state
+
+
+def test_route_turn_needs_a_fast_model(monkeypatch):
+    monkeypatch.setattr(agent, "fast_model", None)
+    assert route_turn(_state("Could you repeat that?")) == "respond"
+
+
+def test_route_turn_uses_the_fast_model_within_a_phase(monkeypatch):
+    monkeypatch.setattr(agent, "fast_model", object())
+    assert route_turn(_state("Could you repeat that?")) == "acknowledge"
+    assert route_turn(_state("Mm-hmm", agent_speaking=True)) == "acknowledge"
+    assert route_turn(_state("Mm-hmm")) == "respond"
+    # the first reply of a phase follows its transition directive
+    assert route_turn(_state("Could you repeat that?", replied_phase="introduction")) == "respond"
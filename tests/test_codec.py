@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+import codec
+import main
+from codec import OpusDecoder, OpusEncoder, opus_available
+from events import FRAME_HEADER, TTSChunkEvent
+from settings import settings
+
+SAMPLE_RATE = 24000
+
+
+def ms(duration: float) -> int:
+    """Bytes of 16-bit mono PCM at SAMPLE_RATE."""
+    return int(SAMPLE_RATE * duration / 1000) * 2
+
+
+class PassthroughOpus:
+    """Stands in for opuslib: a "packet" is the PCM frame itself."""
+    APPLICATION_AUDIO = 2049
+
+    class Encoder:
+        def __init__(self, sample_rate, channels, application):
+            self.sample_rate = sample_rate
+            self.bitrate = None
+
+        def encode(self, pcm: bytes, frame_size: int) -> bytes:
+            # Opus only takes 2.5, 5, 10, 20, 40 or 60 ms frames
+            assert frame_size in [int(self.sample_rate * d / 1000) for d in (2.5, 5, 10, 20, 40, 60)]
+            assert len(pcm) == frame_size * 2
+            return pcm
+
+    class Decoder:
+        def __init__(self, sample_rate, channels):
+            pass
+
+        def decode(self, packet: bytes, frame_size: int) -> bytes:
+            return packet
+
+
+def packets(payload: bytes) -> list[bytes]:
+    """Split an encoded chunk into its length-prefixed packets."""
+    out, offset = [], 0
+    while offset < len(payload):
+        (length,) = codec._PACKET_LENGTH.unpack_from(payload, offset)
+        offset += codec._PACKET_LENGTH.size
+        out.append(payload[offset:offset + length])
+        offset += length
+    return out
+
+
+def speech(size: int) -> bytes:
+    return bytes((i * 7 + 3) % 256 for i in range(size))
+
+
+@pytest.fixture
+def passthrough(monkeypatch):
+    monkeypatch.setattr(codec, "opuslib", PassthroughOpus)
+
+
+def test_chunk_tails_are_carried_not_padded(passthrough):
+    audio = speech(ms(130))
+    chunks = [audio[:ms(30)], audio[ms(30):ms(55)], audio[ms(55):ms(100)], audio[ms(100):]]
+    encoder = OpusEncoder(SAMPLE_RATE)
+
+    async def run():
+        encoded = [await encoder.encode(chunk) for chunk in chunks[:-1]]
+        encoded.append(await encoder.encode(chunks[-1], final=True))
+        return encoded
+
+    encoded = asyncio.run(run())
+
+    frames = [packet for payload in encoded for packet in packets(payload)]
+    # continuous 20 ms frames, then the final 10 ms stepped down to without padding
+    assert [len(frame) for frame in frames] == [ms(20)] * 6 + [ms(10)]
+    assert b"".join(frames) == audio
+    assert not encoder.pending
+
+
+def test_flush_pads_only_the_carried_tail(passthrough):
+    encoder = OpusEncoder(SAMPLE_RATE)
+    audio = speech(ms(21))
+
+    async def run():
+        return await encoder.encode(audio), encoder.pending, await encoder.flush(), await encoder.flush()
+
+    head, pending, tail, nothing = asyncio.run(run())
+
+    assert packets(head) == [audio[:ms(20)]]
+    assert pending
+    assert packets(tail) == [audio[ms(20):] + bytes(ms(2.5) - ms(1))]
+    assert nothing == b""
+
+
+def test_reset_drops_the_carried_audio(passthrough):
+    encoder = OpusEncoder(SAMPLE_RATE)
+
+    async def run():
+        await encoder.encode(speech(ms(25)))
+        encoder.reset()
+        return await encoder.encode(speech(ms(20)))
+
+    assert packets(asyncio.run(run())) == [speech(ms(20))]
+
+
+@pytest.mark.skipif(not opus_available(), reason="opuslib or libopus is not installed")
+def test_split_audio_round_trips_through_libopus():
+    audio = speech(ms(250))
+    sizes = [ms(33), ms(47), ms(18), ms(70), ms(82)]
+    encoder = OpusEncoder(SAMPLE_RATE)
+    decoder = OpusDecoder(SAMPLE_RATE)
+
+    async def run():
+        decoded, offset = bytearray(), 0
+        for i, size in enumerate(sizes):
+            payload = await encoder.encode(audio[offset:offset + size], final=i == len(sizes) - 1)
+            offset += size
+            for packet in packets(payload):
+                decoded.extend(await decoder.decode(packet))
+        return bytes(decoded)
+
+    assert len(asyncio.run(run())) == len(audio)
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames: list[bytes] = []
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.frames.append(data)
+
+    async def send_json(self, data) -> None:
+        pass
+
+
+def test_session_sends_the_carried_tail_when_audio_pauses(passthrough, monkeypatch):
+    monkeypatch.setattr(settings, "OPUS_TAIL_FLUSH_MS", 20)
+    live = main.LiveSession(main.VoicePipeline("", resume="N/A", duration=600))
+    websocket = FakeWebSocket()
+    live.websocket = websocket
+    live.encoder = OpusEncoder(SAMPLE_RATE)
+    audio = speech(ms(45))
+
+    async def run():
+        await live._send(TTSChunkEvent(audio_data=audio[:ms(30)], turn_id=1))
+        await live._send(TTSChunkEvent(audio_data=audio[ms(30):], turn_id=1))
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+    header = FRAME_HEADER.size
+    sent = [packets(frame[header:]) for frame in websocket.frames]
+    assert [[len(packet) for packet in message] for message in sent] == [[ms(20)], [ms(20)], [ms(5)]]
+    assert b"".join(packet for message in sent for packet in message) == audio
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from langchain.messages import AIMessage, HumanMessage, RemoveMessage
+from langgraph.graph import add_messages
+
+import agent
+from agent import compact_history
+from settings import settings
+
+
+class FakeSummaryModel:
+    def __init__(self):
+        self.prompts = []
+
+    async def ainvoke(self, messages, config=None):
+        self.prompts.append(messages[0].text)
+        return AIMessage(content="Candidate covered their background.")
+
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    fake = FakeSummaryModel()
+    monkeypatch.setattr(agent, "model", fake)
+    monkeypatch.setattr(settings, "HISTORY_KEEP_TURNS", 2)
+    monkeypatch.setattr(settings, "HISTORY_TOKEN_BUDGET", 1000)
+    monkeypatch.setattr(settings, "HISTORY_TOKEN_LOW_WATER", 500)
+    return fake
+
+
+def history(exchanges: int, words: int = 40) -> list:
+    messages = []
+    for i in range(exchanges):
+        messages.append(HumanMessage(content=f"answer {i} " + "word " * words, id=f"h{i}"))
+        messages.append(AIMessage(content=f"question {i} " + "word " * words, id=f"a{i}"))
+    return messages
+
+
+def test_history_within_budget_is_left_alone(summarizer):
+    update = asyncio.run(compact_history({"messages": history(4)}))
+
+    assert update == {}
+    assert summarizer.prompts == []
+
+
+def test_short_history_is_never_folded(summarizer):
+    # over the budget, but nothing older than the kept exchanges
+    update = asyncio.run(compact_history({"messages": history(2, words=2000)}))
+
+    assert update == {}
+
+
+def test_compaction_folds_down_to_the_low_water_mark(summarizer):
+    messages = history(20)
+    update = asyncio.run(compact_history({"messages": messages, "summary": "Earlier notes."}))
+
+    removed = [message.id for message in update["messages"]]
+    assert all(isinstance(message, RemoveMessage) for message in update["messages"])
+    assert removed == [message.id for message in messages[:len(removed)]]
+    assert update["summary"] == "Candidate covered their background."
+    assert "Earlier notes." in summarizer.prompts[0]
+    assert "Candidate: answer 0" in summarizer.prompts[0]
+
+    kept = add_messages(messages, update["messages"])
+    assert kept[0].type == "human"
+    assert agent.count_tokens_approximately(kept) <= settings.HISTORY_TOKEN_LOW_WATER
+    # hysteresis: the next turns do not trigger another summary right away
+    assert asyncio.run(compact_history({"messages": kept + history(1)})) == {}
+
+
+def test_recent_exchanges_are_always_kept(summarizer):
+    # the last exchanges alone exceed the low-water mark
+    messages = history(6, words=300)
+    update = asyncio.run(compact_history({"messages": messages}))
+
+    kept = add_messages(messages, update["messages"])
+    assert [message.id for message in kept] == ["h4", "a4", "h5", "a5"]
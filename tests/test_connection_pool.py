@@ -0,0 +1,80 @@
+import asyncio
+
+from connection_pool import ConnectionPool
+
+
+class FakeSocket:
+    def __init__(self, pong_delay: float = 0):
+        self.close_code = None
+        self.pong_delay = pong_delay
+
+    async def ping(self):
+        await asyncio.sleep(self.pong_delay)
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+    async def close(self):
+        self.close_code = 1000
+
+
+class FakePool(ConnectionPool):
+    def __init__(self, connect_delay: float = 0, pong_delay: float = 0, **kwargs):
+        super().__init__("test", **kwargs)
+        self.connect_delay = connect_delay
+        self.pong_delay = pong_delay
+        self.opened = []
+
+    async def _connect(self, url, headers):
+        await asyncio.sleep(self.connect_delay)
+        ws = FakeSocket(self.pong_delay)
+        self.opened.append(ws)
+        return ws
+
+
+def test_fills_each_endpoint_to_size():
+    async def scenario():
+        pool = FakePool(size=2)
+        pool.warm("wss://a", {})
+        await asyncio.sleep(0.01)
+        ws = await pool.acquire("wss://a", {})
+        await asyncio.sleep(0.01)
+        await pool.close()
+        return pool, ws
+
+    pool, ws = asyncio.run(scenario())
+
+    assert ws is pool.opened[0]
+    assert len(pool.opened) == 3  # two warm, one refill after the acquire
+    assert all(ws.close_code == 1000 for ws in pool.opened[1:])
+
+
+def test_close_cancels_pending_fills():
+    async def scenario():
+        pool = FakePool(connect_delay=60)
+        pool.warm("wss://a", {})
+        await asyncio.sleep(0.01)
+        await pool.close()
+        return pool
+
+    pool = asyncio.run(scenario())
+
+    assert pool._fill_tasks == set()
+    assert pool.opened == []
+
+
+def test_health_check_tolerates_endpoints_added_meanwhile():
+    async def scenario():
+        pool = FakePool(pong_delay=0.05, health_interval=0.01)
+        pool.warm("wss://a", {})
+        await asyncio.sleep(0.03)  # the health loop is now pinging wss://a
+        pool.warm("wss://b", {})
+        await asyncio.sleep(0.1)
+        health = pool._health_task
+        await pool.close()
+        return pool, health
+
+    pool, health = asyncio.run(scenario())
+
+    assert health.cancelled()
+    assert len(pool.opened) == 4
@@ -0,0 +1,64 @@
+import base64
+
+import pytest
+
+from events import (
+    FRAME_FLAG_FINAL,
+    FRAME_FLAG_OPUS,
+    FRAME_HEADER,
+    AgentChunkEvent,
+    TTSChunkEvent,
+    event_to_dict,
+    event_to_frame,
+)
+
+
+def test_frame_header_layout():
+    event = TTSChunkEvent(audio_data=b"\x01\x02\x03\x04", turn_id=3, timestamp=1234567890123)
+    frame = event_to_frame(event, seq=7)
+
+    assert FRAME_HEADER.size == 16
+    frame_type, flags, turn_id, seq, timestamp = FRAME_HEADER.unpack_from(frame)
+    assert (frame_type, flags, turn_id, seq, timestamp) == (1, 0, 3, 7, 1234567890123)
+    assert frame[FRAME_HEADER.size:] == b"\x01\x02\x03\x04"
+
+
+def test_frame_flags_and_payload():
+    event = TTSChunkEvent(audio_data=b"pcm", is_final=True)
+    frame = event_to_frame(event, seq=1, payload=b"opus", flags=FRAME_FLAG_OPUS)
+
+    _, flags, *_ = FRAME_HEADER.unpack_from(frame)
+    assert flags == FRAME_FLAG_FINAL | FRAME_FLAG_OPUS
+    assert frame[FRAME_HEADER.size:] == b"opus"
+
+
+def test_frame_accepts_memoryview_audio():
+    # cached audio is served as zero-copy slices
+    event = TTSChunkEvent(audio_data=memoryview(b"abcdef")[2:4])
+    assert event_to_frame(event, seq=0)[FRAME_HEADER.size:] == b"cd"
+
+
+def test_frame_sequence_wraps_to_uint32():
+    frame = event_to_frame(TTSChunkEvent(audio_data=b""), seq=2**32 + 5)
+    assert FRAME_HEADER.unpack_from(frame)[3] == 5
+
+
+def test_frame_turn_id_wraps_to_uint16():
+    frame = event_to_frame(TTSChunkEvent(audio_data=b"", turn_id=2**16 + 2), seq=0)
+    assert FRAME_HEADER.unpack_from(frame)[2] == 2
+
+
+def test_frame_rejects_control_events():
+    with pytest.raises(ValueError):
+        event_to_frame(AgentChunkEvent(text="hi"), seq=0)
+
+
+def test_json_audio_is_base64():
+    data = event_to_dict(TTSChunkEvent(audio_data=b"\x00\xff", turn_id=2, timestamp=5), seq=3)
+    assert data == {"type": "tts_chunk", "audio_data": base64.b64encode(b"\x00\xff").decode(),
+                    "turn_id": 2, "timestamp": 5, "seq": 3}
+
+
+def test_agent_text_carries_turn_id():
+    data = event_to_dict(AgentChunkEvent(text="Hi", turn_id=4, timestamp=5))
+    assert data == {"type": "agent_chunk", "text": "Hi", "turn_id": 4, "timestamp": 5}
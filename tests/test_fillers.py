@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+import fillers
+from fillers import FillerBank
+
+
+def test_warm_synthesizes_phrases_concurrently(monkeypatch):
+    async def synthesize(text, chain, timeout):
+        await asyncio.sleep(0.1)
+        return chain[0], 16000, text.encode()
+
+    monkeypatch.setattr(fillers, "provider_chain", lambda kind, provider=None: ["fake"])
+    monkeypatch.setattr(fillers, "synthesize", synthesize)
+    bank = FillerBank(["One.", "Two.", "Three.", "Four.", "Five."])
+
+    started = time.monotonic()
+    asyncio.run(bank.warm())
+    assert time.monotonic() - started < 0.3
+
+    picked = {bank.pick("fake", 16000).text for _ in range(5)}
+    assert picked == set(bank.phrases)
+    assert bank.pick("fake", 24000) is None
+
+
+def test_warm_skips_phrases_that_fail(monkeypatch):
+    async def synthesize(text, chain, timeout):
+        if text == "Bad.":
+            raise RuntimeError("vendor down")
+        return chain[0], 16000, text.encode()
+
+    monkeypatch.setattr(fillers, "provider_chain", lambda kind, provider=None: ["fake"])
+    monkeypatch.setattr(fillers, "synthesize", synthesize)
+    bank = FillerBank(["Good.", "Bad."])
+    asyncio.run(bank.warm())
+    assert {bank.pick("fake", 16000).text for _ in range(2)} == {"Good."}
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import main
+from events import TTSChunkEvent
+from session_store import LocalSessionStore
+from settings import settings
+
+
+def test_audio_stream_flushes_once_per_pause_then_keeps_alive(monkeypatch):
+    monkeypatch.setattr(settings, "STT_FRAME_MAX_HOLD_MS", 20)
+    monkeypatch.setattr(settings, "STT_KEEPALIVE_SECONDS", 0.1)
+    live = main.LiveSession(main.VoicePipeline("", resume="N/A", duration=600))
+
+    async def run():
+        received = []
+        stream = live._audio_stream()
+        live._audio.put_nowait(b"pcm")
+        received.append(await anext(stream))
+        received.append(await anext(stream))  # the pause starts
+        received.append(await anext(stream))
+        live._audio.put_nowait(b"more")
+        received.append(await anext(stream))
+        received.append(await anext(stream))  # a new pause flushes again
+        live.end()
+        received.extend([item async for item in stream])
+        return received
+
+    assert asyncio.run(asyncio.wait_for(run(), 2)) == [
+        b"pcm", main.STT_FLUSH, main.STT_KEEPALIVE, b"more", main.STT_FLUSH,
+    ]
+
+
+def test_replay_buffer_is_bounded_by_size(monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_REPLAY_MAX_KB", 4)
+    live = main.LiveSession(main.VoicePipeline("", resume="N/A", duration=600))
+
+    async def run():
+        # parked: nothing is sent, everything is buffered
+        for turn_id in range(10):
+            await live._send(TTSChunkEvent(audio_data=bytes(1000), turn_id=turn_id))
+
+    asyncio.run(run())
+    assert [event.turn_id for _, event in live._replay] == [7, 8, 9]
+    assert live._replay_bytes <= 4 * 1024
+
+    live.ack(8)
+    assert [seq for seq, _ in live._replay] == [9]
+    assert live._replay_bytes == 1064
+
+
+def test_resume_of_an_unknown_session_is_refused(monkeypatch):
+    monkeypatch.setattr(main, "session_store", LocalSessionStore(ttl_seconds=60))
+    client = TestClient(main.app)
+
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_json({"type": "init", "session_id": "expired", "resume_token": "token"})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+
+    assert closed.value.code == 1008
+    assert main.live_sessions == {}
+
+
+class FakeSTT:
+    """Stands in for FailoverSTT: records the size of each send."""
+    sample_rate = 16000
+
+    def __init__(self, chain):
+        self.sent: list[int] = []
+        self._closed = asyncio.Event()
+
+    async def send_audio(self, audio) -> None:
+        self.sent.append(len(audio))
+
+    async def keepalive(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        self._closed.set()
+
+    async def receive_events(self):
+        await self._closed.wait()
+        return
+        yield
+
+
+def test_client_chunks_are_sent_as_whole_frames(monkeypatch):
+    # the web client sends 100 ms of 16 kHz audio every 100 ms
+    stts = []
+    monkeypatch.setattr(main, "FailoverSTT", lambda chain: stts.append(FakeSTT(chain)) or stts[-1])
+    monkeypatch.setattr(settings, "VAD_ENABLED", False)
+    pipeline = main.VoicePipeline("", resume="N/A", duration=600)
+    pipeline.has_triggered = True
+    live = main.LiveSession(pipeline)
+
+    async def run():
+        stage = pipeline._stt_stream(live._audio_stream())
+        consumer = asyncio.create_task(asyncio.wait_for(anext(stage, None), 5))
+        for _ in range(5):
+            live._audio.put_nowait(bytes(3200))
+            await asyncio.sleep(0.1)
+        live.end()
+        await consumer
+
+    asyncio.run(run())
+    # one send per chunk, none split and no partial frame flushed between chunks
+    assert stts[0].sent == [3200] * 5
@@ -0,0 +1,57 @@
+import pytest
+
+import phases
+from phases import CLOSING, INTRODUCTION, TECHNICAL, SessionClock, phase_schedule
+
+
+@pytest.mark.parametrize("time_left, phase", [
+    (600, INTRODUCTION),
+    (541, INTRODUCTION),
+    (540, TECHNICAL),
+    (61, TECHNICAL),
+    (60, CLOSING),
+    (0, CLOSING),
+])
+def test_phase_boundaries(time_left, phase):
+    assert phase_schedule(600).phase(time_left) == phase
+
+
+def test_schedule_is_computed_once_per_duration():
+    assert phase_schedule(900) is phase_schedule(900)
+    assert phase_schedule(900) is not phase_schedule(600)
+
+
+def test_short_interviews_go_straight_to_closing():
+    assert phase_schedule(60).phase(60) == CLOSING
+
+
+class FakeMonotonic:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock_time(monkeypatch):
+    fake = FakeMonotonic()
+    monkeypatch.setattr(phases.time, "monotonic", fake)
+    return fake
+
+
+def test_clock_runs_on_server_time(clock_time):
+    clock = SessionClock(600)
+    assert (clock.time_left, clock.phase) == (600, INTRODUCTION)
+
+    clock_time.now += 120
+    assert (clock.time_left, clock.phase) == (480, TECHNICAL)
+
+    clock_time.now += 1000
+    assert (clock.time_left, clock.phase) == (0, CLOSING)
+
+
+def test_clock_resumes_from_elapsed_time(clock_time):
+    clock = SessionClock(600, elapsed=550.4)
+    assert clock.time_left == 50
+    assert clock.phase == CLOSING
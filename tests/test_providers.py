@@ -0,0 +1,244 @@
+import asyncio
+import time
+
+import pytest
+
+import providers
+from events import TTSChunkEvent
+from providers import (
+    FailoverSTT,
+    FailoverTTS,
+    mark_unhealthy,
+    provider_chain,
+    provider_health,
+    record_latency,
+    synthesize,
+)
+from settings import settings
+
+
+class FakeClient:
+    """Speech client whose failure mode is picked per test."""
+    sample_rate = 16000
+    voice = "voice"
+    model = "model"
+
+    def __init__(self, name: str, behavior: str, instances: list):
+        self.name = name
+        self.behavior = behavior  # "ok", "error", "hang" (slow to connect) or "silent"
+        self.turn_id = 0
+        self.on_flushed = None
+        self.sent: list = []
+        self.closed = False
+        self._events: asyncio.Queue = asyncio.Queue()
+        instances.append(self)
+
+    async def _use(self, item) -> None:
+        if self.behavior == "error":
+            raise ConnectionError(f"{self.name} is down")
+        if self.behavior == "hang":
+            await asyncio.sleep(10)
+        self.sent.append(item)
+
+    async def receive_events(self):
+        while (event := await self._events.get()) is not None:
+            yield event
+
+    async def close(self) -> None:
+        self.closed = True
+        self._events.put_nowait(None)
+
+
+class FakeTTSClient(FakeClient):
+    async def send_text(self, text: str) -> None:
+        await self._use(text)
+
+    async def flush(self) -> None:
+        await self._use("<flush>")
+        if self.behavior == "ok":
+            text = "".join(item for item in self.sent if item != "<flush>")
+            self._events.put_nowait(TTSChunkEvent(audio_data=text.encode(), turn_id=self.turn_id))
+            asyncio.get_running_loop().call_soon(self.on_flushed)
+
+    async def clear(self) -> None:
+        self.sent.clear()
+
+
+class FakeSTTClient(FakeClient):
+    async def send_audio(self, audio: bytes) -> None:
+        await self._use(audio)
+        self._events.put_nowait(f"{self.name} heard {len(audio)} bytes")
+
+    async def keepalive(self) -> None:
+        pass
+
+
+@pytest.fixture
+def speech(monkeypatch):
+    """Registers fake providers "a" (primary) and "b" (fallback); returns their behaviors and instances."""
+    monkeypatch.setattr(providers, "_health", {})
+    monkeypatch.setattr(providers, "tts_cache", None)
+    monkeypatch.setattr(settings, "PROVIDER_CONNECT_TIMEOUT_MS", 100)
+    monkeypatch.setattr(settings, "TTS_FIRST_BYTE_TIMEOUT_MS", 100)
+    monkeypatch.setattr(settings, "STT_PROVIDER", "a")
+    monkeypatch.setattr(settings, "STT_FALLBACK_PROVIDERS", ["b"])
+    monkeypatch.setattr(settings, "TTS_PROVIDER", "a")
+    monkeypatch.setattr(settings, "TTS_FALLBACK_PROVIDERS", ["b"])
+    behaviors = {"a": "ok", "b": "ok"}
+    instances: list[FakeClient] = []
+    for name in behaviors:
+        monkeypatch.setitem(providers.STT_PROVIDERS, name,
+                            lambda name=name: FakeSTTClient(name, behaviors[name], instances))
+        monkeypatch.setitem(providers.TTS_PROVIDERS, name,
+                            lambda name=name: FakeTTSClient(name, behaviors[name], instances))
+    return behaviors, instances
+
+
+def test_chain_puts_the_requested_provider_first(speech):
+    assert provider_chain("tts") == ["a", "b"]
+    assert provider_chain("tts", "b") == ["b", "a"]
+    assert provider_chain("tts", "unknown") == ["a", "b"]
+
+
+def test_unhealthy_provider_is_tried_last_until_it_recovers(speech):
+    mark_unhealthy("tts", "a", "test")
+
+    assert provider_health("tts", "a").failures == 1
+    assert provider_chain("tts") == ["b", "a"]
+    assert provider_chain("stt") == ["a", "b"]
+
+    # the cooldown is over
+    provider_health("tts", "a").unhealthy_until = time.monotonic() - 1
+    assert provider_chain("tts") == ["a", "b"]
+
+
+def test_latency_is_smoothed(speech):
+    record_latency("tts", "smoothed", "connect", 1.0)
+    record_latency("tts", "smoothed", "connect", 2.0)
+
+    assert provider_health("tts", "smoothed").connect_ewma == pytest.approx(1.2)
+
+
+def test_no_configured_provider_raises(speech, monkeypatch):
+    def unconfigured():
+        raise ValueError("missing API key")
+
+    monkeypatch.setitem(providers.TTS_PROVIDERS, "a", unconfigured)
+    monkeypatch.setitem(providers.TTS_PROVIDERS, "b", unconfigured)
+
+    async def scenario():
+        FailoverTTS(["a", "b"])
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
+
+
+async def speak(tts: FailoverTTS, *parts: str) -> list[TTSChunkEvent]:
+    """Send one turn of text, flush it and collect its audio."""
+    events = []
+
+    async def drain():
+        async for event in tts.receive_events():
+            events.append(event)
+
+    drainer = asyncio.create_task(drain())
+    try:
+        tts.turn_id = 1
+        for part in parts:
+            await tts.send_text(part)
+        await tts.flush()
+        await asyncio.sleep(0.3)
+    finally:
+        await tts.close()
+        await drainer
+    return events
+
+
+@pytest.mark.parametrize("failure", ["error", "hang", "silent"])
+def test_tts_replays_the_turn_on_the_next_provider(speech, failure):
+    behaviors, instances = speech
+    behaviors["a"] = failure
+
+    async def scenario():
+        tts = FailoverTTS(provider_chain("tts"))
+        return tts, await speak(tts, "Hello there. ", "How are you?")
+
+    tts, events = asyncio.run(scenario())
+
+    primary, secondary = instances
+    assert tts.name == "b"
+    assert primary.closed
+    assert "".join(secondary.sent[:-1]) == "Hello there. How are you?"
+    assert secondary.sent[-1] == "<flush>"
+    assert [event.audio_data for event in events] == [b"Hello there. How are you?"]
+    assert not provider_health("tts", "a").healthy
+    assert provider_chain("tts") == ["b", "a"]
+
+
+def test_tts_stays_on_a_healthy_primary(speech):
+    behaviors, instances = speech
+
+    async def scenario():
+        tts = FailoverTTS(provider_chain("tts"))
+        return tts, await speak(tts, "Hello there.")
+
+    tts, events = asyncio.run(scenario())
+
+    assert tts.name == "a"
+    assert len(instances) == 1
+    assert [event.audio_data for event in events] == [b"Hello there."]
+    assert provider_health("tts", "a").connect_ewma is not None
+    assert provider_health("tts", "a").first_byte_ewma is not None
+
+
+def test_tts_raises_when_every_provider_fails(speech):
+    behaviors, instances = speech
+    behaviors["a"] = behaviors["b"] = "error"
+
+    async def scenario():
+        tts = FailoverTTS(provider_chain("tts"))
+        try:
+            await tts.send_text("Hello there.")
+        finally:
+            await tts.close()
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(scenario())
+    assert not provider_health("tts", "a").healthy
+    assert not provider_health("tts", "b").healthy
+
+
+def test_stt_moves_audio_to_the_next_provider(speech):
+    behaviors, instances = speech
+    behaviors["a"] = "error"
+
+    async def scenario():
+        stt = FailoverSTT(provider_chain("stt"))
+        await stt.send_audio(b"\x00" * 320)
+        events = stt.receive_events()
+        event = await asyncio.wait_for(anext(events), 1)
+        await stt.close()
+        return stt, event
+
+    stt, event = asyncio.run(scenario())
+
+    assert stt.name == "b"
+    assert instances[1].sent == [b"\x00" * 320]
+    assert event == "b heard 320 bytes"
+
+
+def test_synthesize_returns_the_audio_of_the_provider_that_spoke(speech):
+    behaviors, _ = speech
+    behaviors["a"] = "silent"
+
+    provider, sample_rate, audio = asyncio.run(synthesize("Welcome.", ["a", "b"], timeout=1))
+
+    assert (provider, sample_rate, audio) == ("b", 16000, b"Welcome.")
+
+
+def test_synthesize_times_out_when_no_audio_arrives(speech):
+    behaviors, _ = speech
+    behaviors["a"] = behaviors["b"] = "silent"
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(synthesize("Welcome.", ["a", "b"], timeout=0.5))
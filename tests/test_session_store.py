@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import pytest
+
+import main
+from session_store import LocalSessionStore, SessionRecord, SessionStore, SQLiteSessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl_seconds=60)
+
+
+def test_records_round_trip_between_store_instances(store):
+    record = SessionRecord(session_id="s1", thread_id="t1", resume_token="secret",
+                           job_description="Backend", duration=600, time_left=300,
+                           tts_provider="elevenlabs", has_triggered=True, turn_id=4)
+    asyncio.run(store.put(record))
+
+    # another worker opens the same file
+    other = SQLiteSessionStore(store.path, ttl_seconds=60)
+    loaded = asyncio.run(other.get("s1"))
+    assert loaded == record
+    assert asyncio.run(other.get("missing")) is None
+
+
+def test_put_replaces_and_delete_removes(store):
+    asyncio.run(store.put(SessionRecord(session_id="s1", thread_id="t1", turn_id=1)))
+    asyncio.run(store.put(SessionRecord(session_id="s1", thread_id="t1", turn_id=2)))
+    assert asyncio.run(store.get("s1")).turn_id == 2
+
+    asyncio.run(store.delete("s1"))
+    assert asyncio.run(store.get("s1")) is None
+
+
+def test_records_expire(store):
+    store.ttl_seconds = 0.01
+    asyncio.run(store.put(SessionRecord(session_id="s1", thread_id="t1")))
+    time.sleep(0.02)
+    assert asyncio.run(store.get("s1")) is None
+
+
+def test_assets_are_shared_and_expire(store):
+    asyncio.run(store.put_asset("jd", "Senior backend engineer"))
+    other = SQLiteSessionStore(store.path, ttl_seconds=60)
+    assert asyncio.run(other.get_asset("jd")) == "Senior backend engineer"
+    assert asyncio.run(other.get_asset("missing")) is None
+
+    other.ttl_seconds = 0
+    time.sleep(0.01)
+    assert asyncio.run(other.get_asset("jd")) is None
+
+
+def test_stores_must_implement_the_whole_interface():
+    class ReadOnlyStore(SessionStore):
+        async def get(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        ReadOnlyStore(ttl_seconds=60)
+
+
+def test_local_store_has_no_shared_assets():
+    store = LocalSessionStore(ttl_seconds=60)
+    asyncio.run(store.put_asset("jd", "text"))
+    assert asyncio.run(store.get_asset("jd")) is None
+
+
+def test_new_session_reads_assets_uploaded_to_another_worker(store, monkeypatch):
+    monkeypatch.setattr(main, "session_store", store)
+    asyncio.run(store.put_asset("jd-id", "Senior backend engineer"))
+    asyncio.run(store.put_asset("resume-id", "Five years of Python"))
+
+    pipeline = asyncio.run(main._new_pipeline({
+        "job_description_id": "jd-id", "resume_id": "resume-id", "duration": 600, "time_left": 600,
+    }))
+    assert pipeline.job_description == "Senior backend engineer"
+    assert pipeline.resume == "Five years of Python"
+
+
+@pytest.mark.parametrize("field", ["job_description_id", "resume_id"])
+def test_new_session_refuses_unknown_assets(store, monkeypatch, field):
+    monkeypatch.setattr(main, "session_store", store)
+    with pytest.raises(LookupError, match=field):
+        asyncio.run(main._new_pipeline({field: "unknown", "duration": 600}))
+
+
+@pytest.fixture(params=["sqlite", "local"])
+def any_store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl_seconds=60)
+    return LocalSessionStore(ttl_seconds=60)
+
+
+def test_claim_fences_older_writers(any_store):
+    asyncio.run(any_store.put(SessionRecord(session_id="s1", thread_id="t1")))
+    parked = asyncio.run(any_store.get("s1"))
+
+    claimed = asyncio.run(any_store.claim("s1", "worker-b"))
+    assert (claimed.owner, claimed.generation) == ("worker-b", 1)
+    assert asyncio.run(any_store.claim("missing", "worker-b")) is None
+
+    # the copy read before the claim can neither save nor delete
+    parked.turn_id = 7
+    assert not asyncio.run(any_store.save(parked))
+    asyncio.run(any_store.delete("s1", parked.generation))
+    stored = asyncio.run(any_store.get("s1"))
+    assert (stored.owner, stored.turn_id) == ("worker-b", 0)
+
+    claimed.turn_id = 3
+    assert asyncio.run(any_store.save(claimed))
+    assert asyncio.run(any_store.get("s1")).turn_id == 3
+    asyncio.run(any_store.delete("s1", claimed.generation))
+    assert asyncio.run(any_store.get("s1")) is None
+
+
+def test_concurrent_claims_get_distinct_generations(store):
+    asyncio.run(store.put(SessionRecord(session_id="s1", thread_id="t1")))
+
+    async def run():
+        return await asyncio.gather(*(store.claim("s1", f"worker-{i}") for i in range(8)))
+
+    claims = asyncio.run(run())
+    assert sorted(record.generation for record in claims) == list(range(1, 9))
+
+
+def test_superseded_session_ends_without_overwriting(store, monkeypatch):
+    monkeypatch.setattr(main, "session_store", store)
+    pipeline = main.VoicePipeline("Backend", resume="N/A", duration=600)
+    asyncio.run(store.put(pipeline.to_record()))
+    live = main.LiveSession(pipeline)
+
+    # the client reconnected to another worker
+    asyncio.run(store.claim(pipeline.session_id, "worker-b"))
+    pipeline.turn_id = 5
+
+    async def run():
+        await live._save()
+        await pipeline.aclose()
+
+    asyncio.run(run())
+    assert live._audio.get_nowait() is None  # the pipeline was told to stop
+    stored = asyncio.run(store.get(pipeline.session_id))
+    assert (stored.owner, stored.generation, stored.turn_id) == ("worker-b", 1, 0)
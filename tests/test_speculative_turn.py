@@ -0,0 +1,154 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from langchain.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+
+import main
+from agent import RESPOND_NODE, AgentState
+from events import InterruptEvent, STTChunkEvent, STTOutputEvent
+from settings import settings
+
+
+class FakeAgent:
+    """A one-node graph that answers each candidate message after `delay` seconds."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.started: list[str] = []
+        self.finished: list[str] = []
+        builder = StateGraph(AgentState)
+        builder.add_node(RESPOND_NODE, self.respond)
+        builder.add_edge(START, RESPOND_NODE)
+        builder.add_edge(RESPOND_NODE, END)
+        self.graph = builder.compile(checkpointer=InMemorySaver())
+
+    async def respond(self, state: AgentState):
+        text = state["messages"][-1].text
+        self.started.append(text)
+        await asyncio.sleep(self.delay)
+        self.finished.append(text)
+        return {"messages": [AIMessage(content=f"Reply to {text}", id=str(uuid4()))]}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_LLM", True)
+    pipeline = main.VoicePipeline("", resume="", duration=600)
+    pipeline.has_triggered = True
+    return pipeline
+
+
+def run(pipeline, fake: FakeAgent, monkeypatch, upstream) -> tuple[list, list]:
+    """Drive the agent stage; return its output events and the checkpointed history."""
+    monkeypatch.setattr(main, "agent", fake.graph)
+
+    async def scenario():
+        events = [event async for event in pipeline._agent_stream(upstream())]
+        state = await fake.graph.aget_state({"configurable": {"thread_id": pipeline.thread_id}})
+        history = [(message.type, message.text) for message in state.values.get("messages", [])]
+        return events, history
+
+    return asyncio.run(asyncio.wait_for(scenario(), 5))
+
+
+def agent_output(events: list) -> list:
+    return [(event.type, event.text, event.turn_id) for event in events
+            if event.type in ("agent_chunk", "agent_end")]
+
+
+def test_eager_end_of_turn_starts_a_held_run(pipeline, monkeypatch):
+    fake = FakeAgent()
+
+    async def upstream():
+        yield STTChunkEvent(text="I mostly use Python", is_eager=True)
+        await asyncio.sleep(0.1)
+
+    events, history = run(pipeline, fake, monkeypatch, upstream)
+
+    assert fake.finished == ["I mostly use Python"]
+    # nothing is released without the final transcript, and the stage
+    # closing before it arrives rolls the run back
+    assert agent_output(events) == []
+    assert history == []
+
+
+def test_high_confidence_partial_starts_a_run(pipeline, monkeypatch):
+    fake = FakeAgent()
+
+    async def upstream():
+        yield STTChunkEvent(text="I mostly", end_of_turn_confidence=0.2)
+        yield STTChunkEvent(text="I mostly use Python", end_of_turn_confidence=0.9)
+        await asyncio.sleep(0.1)
+
+    run(pipeline, fake, monkeypatch, upstream)
+
+    assert fake.started == ["I mostly use Python"]
+
+
+def test_matching_final_transcript_commits_the_run(pipeline, monkeypatch):
+    fake = FakeAgent()
+
+    async def upstream():
+        yield STTChunkEvent(text="I mostly use Python", is_eager=True)
+        await asyncio.sleep(0.1)
+        yield STTOutputEvent(text="I mostly use Python.")
+        await asyncio.sleep(0.1)
+
+    events, history = run(pipeline, fake, monkeypatch, upstream)
+
+    types = [event.type for event in events]
+    # held output is released after the final transcript, without a second run
+    assert types.index("agent_chunk") > types.index("stt_output")
+    assert fake.started == ["I mostly use Python"]
+    assert agent_output(events) == [
+        ("agent_chunk", "Reply to I mostly use Python", 1),
+        ("agent_end", "Reply to I mostly use Python", 1),
+    ]
+    assert history == [("human", "I mostly use Python"), ("ai", "Reply to I mostly use Python")]
+    assert pipeline.turn_id == 1
+
+
+def test_different_final_transcript_rolls_the_run_back(pipeline, monkeypatch):
+    fake = FakeAgent()
+
+    async def upstream():
+        yield STTChunkEvent(text="I mostly use Java", is_eager=True)
+        await asyncio.sleep(0.1)
+        yield STTOutputEvent(text="I mostly use JavaScript.")
+        await asyncio.sleep(0.1)
+
+    events, history = run(pipeline, fake, monkeypatch, upstream)
+
+    assert fake.started == ["I mostly use Java", "I mostly use JavaScript."]
+    assert agent_output(events) == [
+        ("agent_chunk", "Reply to I mostly use JavaScript.", 1),
+        ("agent_end", "Reply to I mostly use JavaScript.", 1),
+    ]
+    # the speculative exchange was removed from the checkpointed history
+    assert history == [("human", "I mostly use JavaScript."), ("ai", "Reply to I mostly use JavaScript.")]
+
+
+def test_new_start_of_turn_cancels_the_run(pipeline, monkeypatch):
+    fake = FakeAgent(delay=0.2)
+
+    async def upstream():
+        yield STTChunkEvent(text="I mostly use Go", is_eager=True)
+        await asyncio.sleep(0.05)
+        # the candidate keeps talking
+        yield InterruptEvent()
+        await asyncio.sleep(0.3)
+        yield STTOutputEvent(text="I mostly use Go and Rust.")
+        await asyncio.sleep(0.3)
+
+    events, history = run(pipeline, fake, monkeypatch, upstream)
+
+    assert fake.started == ["I mostly use Go", "I mostly use Go and Rust."]
+    assert fake.finished == ["I mostly use Go and Rust."]
+    assert agent_output(events) == [
+        ("agent_chunk", "Reply to I mostly use Go and Rust.", 1),
+        ("agent_end", "Reply to I mostly use Go and Rust.", 1),
+    ]
+    assert history == [("human", "I mostly use Go and Rust."), ("ai", "Reply to I mostly use Go and Rust.")]
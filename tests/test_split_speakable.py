@@ -0,0 +1,33 @@
+from utils import split_speakable
+
+
+def test_splits_after_last_sentence_boundary():
+    assert split_speakable("Hello there. How are you? I am") == ("Hello there. How are you? ", "I am")
+
+
+def test_waits_for_whitespace_after_punctuation():
+    # "3." could still become "3.5", so nothing is spoken yet
+    assert split_speakable("It took 3.") == ("", "It took 3.")
+
+
+def test_keeps_closing_quotes_with_the_sentence():
+    assert split_speakable('He said "yes." Then') == ('He said "yes." ', "Then")
+
+
+def test_short_clause_keeps_buffering():
+    assert split_speakable("Well, I", min_clause_chars=40) == ("", "Well, I")
+
+
+def test_long_text_splits_on_last_clause_past_the_minimum():
+    text = "When you designed the ingestion layer, which queue did you pick, and why"
+    speakable, rest = split_speakable(text, min_clause_chars=40)
+    assert speakable == "When you designed the ingestion layer, which queue did you pick, "
+    assert rest == "and why"
+
+
+def test_sentence_boundary_wins_over_clause():
+    assert split_speakable("Great. So, tell me", min_clause_chars=1) == ("Great. ", "So, tell me")
+
+
+def test_empty_text():
+    assert split_speakable("") == ("", "")
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import time
+
+from tts_cache import TTSCache, iter_frames, phrase_key
+
+
+def test_phrase_key_normalizes_whitespace_only():
+    key = phrase_key("deepgram", "aura", "v2", 24000, "Hello  there.\n")
+    assert key == phrase_key("deepgram", "aura", "v2", 24000, " Hello there.")
+    assert key != phrase_key("deepgram", "aura", "v2", 24000, "hello there.")
+    assert key != phrase_key("deepgram", "aura", "v2", 24000, "Hello there")
+    assert key != phrase_key("deepgram", "other", "v2", 24000, "Hello there.")
+    assert key != phrase_key("deepgram", "aura", "v2", 16000, "Hello there.")
+
+
+def test_cacheable_bounds():
+    cache = TTSCache(memory_items=4, max_chars=10)
+    assert cache.cacheable("Thanks.")
+    assert cache.cacheable("  ten chars   ")
+    assert not cache.cacheable("   ")
+    assert not cache.cacheable("eleven char")
+
+
+def test_memory_tier_counts_hits_and_misses():
+    cache = TTSCache(memory_items=2, min_occurrences=1)
+    assert cache.get("a") is None
+    cache.put("a", b"pcm")
+    cache.put("empty", b"")
+
+    assert bytes(cache.get("a")) == b"pcm"
+    assert cache.get("empty") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = TTSCache(memory_items=2, min_occurrences=1)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    cache.get("a")
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+async def write(cache: TTSCache, directory, **phrases: bytes) -> None:
+    """Put each phrase and wait for its file to appear."""
+    for key, audio in phrases.items():
+        cache.put(key, audio)
+        for _ in range(100):
+            if (directory / f"{key}.pcm").exists():
+                break
+            await asyncio.sleep(0.01)
+
+
+def test_only_recurring_phrases_are_stored():
+    cache = TTSCache(memory_items=2, min_occurrences=2)
+    cache.put("greeting", b"hello")
+    cache.put("personalized", b"hi jane")
+    assert cache.get("greeting") is None
+
+    cache.put("greeting", b"hello")
+    assert bytes(cache.get("greeting")) == b"hello"
+    assert cache.get("personalized") is None
+
+
+def test_disk_tier_is_shared_and_memory_mapped(tmp_path):
+    audio = bytes(range(256)) * 4
+
+    asyncio.run(write(TTSCache(memory_items=2, directory=str(tmp_path), min_occurrences=1), tmp_path,
+                      phrase=audio))
+    assert not list(tmp_path.glob("*.tmp"))
+
+    # another process (or a restart) starts with an empty memory tier
+    cache = TTSCache(memory_items=2, directory=str(tmp_path))
+    view = cache.get("phrase")
+    assert isinstance(view, memoryview) and bytes(view) == audio
+    assert cache.get("missing") is None
+
+
+def test_disk_tier_evicts_least_recently_used_files(tmp_path):
+    cache = TTSCache(memory_items=4, directory=str(tmp_path), min_occurrences=1, max_disk_bytes=250)
+    asyncio.run(write(cache, tmp_path, a=bytes(100), b=bytes(100)))
+    os.utime(tmp_path / "a.pcm", (1, 1))
+    os.utime(tmp_path / "b.pcm", (2, 2))
+    # reading a file from another process marks it used
+    TTSCache(memory_items=4, directory=str(tmp_path)).get("a")
+
+    asyncio.run(write(cache, tmp_path, c=bytes(100)))
+    for _ in range(100):
+        if not (tmp_path / "b.pcm").exists():
+            break
+        time.sleep(0.01)  # eviction follows the write on the executor
+
+    assert sorted(path.name for path in tmp_path.glob("*.pcm")) == ["a.pcm", "c.pcm"]
+
+
+def test_evicted_maps_are_closed(tmp_path):
+    for key in ("a", "b"):
+        (tmp_path / f"{key}.pcm").write_bytes(b"pcm")
+    cache = TTSCache(memory_items=1, directory=str(tmp_path))
+
+    view = cache.get("a")
+    mapped = view.obj
+    view.release()
+    # a map still exported to a reader is left for it to release
+    held = cache.get("b")
+    assert mapped.closed
+    cache.get("a")
+    assert not held.obj.closed
+    assert bytes(held) == b"pcm"
+
+
+def test_disk_tier_ignores_empty_files(tmp_path):
+    (tmp_path / "empty.pcm").write_bytes(b"")
+    assert TTSCache(memory_items=2, directory=str(tmp_path)).get("empty") is None
+
+
+def test_iter_frames_slices_without_copying():
+    audio = memoryview(bytes(10))
+    frames = list(iter_frames(audio, 4))
+    assert [len(frame) for frame in frames] == [4, 4, 2]
+    assert all(frame.obj is audio.obj for frame in frames)
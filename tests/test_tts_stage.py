@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+import main
+from events import AgentChunkEvent, AgentEndEvent, InterruptEvent, STTOutputEvent
+from fillers import Filler
+from greeting import Greeting
+from settings import settings
+
+SAMPLE_RATE = 16000
+
+
+class FakeTTS:
+    """Stands in for FailoverTTS: records what it is asked to do, produces no audio."""
+    name = "fake"
+    sample_rate = SAMPLE_RATE
+
+    def __init__(self, chain):
+        self.turn_id = 0
+        self.sent: list[str] = []
+        self.cleared = 0
+        self._closed = asyncio.Event()
+
+    def cache_key(self, text: str) -> str:
+        return text
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(text)
+
+    async def flush(self) -> None:
+        pass
+
+    async def clear(self) -> None:
+        self.cleared += 1
+
+    async def close(self) -> None:
+        self._closed.set()
+
+    async def receive_events(self):
+        await self._closed.wait()
+        return
+        yield
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(main, "FailoverTTS", FakeTTS)
+    monkeypatch.setattr(main, "filler_bank", None)
+    pipeline = main.VoicePipeline("", resume="", duration=600)
+    pipeline.has_triggered = True
+    return pipeline
+
+
+def test_barge_in_overtakes_prepared_audio_on_a_full_queue(pipeline):
+    # 10 s of prepared greeting is 100 frames, well over the queue's high-water mark
+    greeting = Greeting(text="Hello", provider="fake", sample_rate=SAMPLE_RATE, audio=bytes(SAMPLE_RATE * 2 * 10))
+    pipeline.prepared_opening = (1, greeting)
+
+    async def upstream():
+        yield AgentChunkEvent(text="Hello", turn_id=1)
+        await asyncio.sleep(0.05)  # the client reads nothing meanwhile, so the queue fills up
+        yield InterruptEvent(turn_id=1)
+        await asyncio.sleep(0.05)
+
+    async def run():
+        events = []
+        stream = pipeline._tts_stream(upstream())
+        events.append(await anext(stream))
+        await asyncio.sleep(0.1)
+        async for event in stream:
+            events.append(event)
+        return [event.type for event in events]
+
+    types = asyncio.run(asyncio.wait_for(run(), 5))
+    assert "audio_flush" in types
+    # audio already queued for the client is purged; nothing of the turn follows the flush
+    assert types.count("tts_chunk") < 10
+    assert "tts_chunk" not in types[types.index("audio_flush"):]
+
+
+class FakeFillerBank:
+    def pick(self, provider: str, sample_rate: int) -> Filler:
+        return Filler("Let me think.", provider, sample_rate, bytes(sample_rate * 2 // 2))
+
+
+@pytest.fixture
+def filler_pipeline(pipeline, monkeypatch):
+    monkeypatch.setattr(main, "filler_bank", FakeFillerBank())
+    monkeypatch.setattr(main, "tts_cache", None)
+    monkeypatch.setattr(settings, "FILLER_DELAY_MS", 50)
+    pipeline.turn_id = 1  # the agent stage opened the turn on the transcript
+    return pipeline
+
+
+def _run_turn(pipeline, *events_after_transcript) -> list:
+    async def upstream():
+        yield STTOutputEvent(text="I built a cache.")
+        for event in events_after_transcript:
+            await asyncio.sleep(0.01)
+            yield event
+        await asyncio.sleep(0.15)  # well past the filler delay
+
+    async def run():
+        return [event async for event in pipeline._tts_stream(upstream())]
+
+    return asyncio.run(asyncio.wait_for(run(), 5))
+
+
+def test_filler_plays_when_the_reply_is_slow(filler_pipeline):
+    events = _run_turn(filler_pipeline)
+    fillers = [event for event in events if event.type == "tts_chunk" and event.is_filler]
+    assert fillers and all(event.turn_id == 1 for event in fillers)
+
+
+def test_filler_is_skipped_once_the_reply_started(filler_pipeline):
+    events = _run_turn(filler_pipeline, AgentChunkEvent(text="Nice", turn_id=1),
+                       AgentEndEvent(text="Nice", turn_id=1))
+    assert not any(event.type == "tts_chunk" and event.is_filler for event in events)
+
+
+def test_filler_is_skipped_after_a_barge_in(filler_pipeline):
+    events = _run_turn(filler_pipeline, InterruptEvent(turn_id=1))
+    assert not any(event.type == "tts_chunk" for event in events)
+    assert "audio_flush" in [event.type for event in events]
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from vad import PCMFramer, SilenceGate
+
+SAMPLE_RATE = 16000
+FRAME_BYTES = SAMPLE_RATE * 20 // 1000 * 2  # one 20 ms gate frame
+
+
+def silence(frames: int = 1) -> bytes:
+    return bytes(FRAME_BYTES * frames)
+
+
+def speech(frames: int = 1) -> bytes:
+    t = np.arange(FRAME_BYTES // 2 * frames) / SAMPLE_RATE
+    return (8000 * np.sin(2 * np.pi * 220 * t)).astype("<i2").tobytes()
+
+
+@pytest.fixture
+def gate():
+    return SilenceGate(sample_rate=SAMPLE_RATE, frame_ms=20, hangover_ms=60, preroll_ms=60)
+
+
+def test_silence_between_turns_is_dropped(gate):
+    assert gate.process(silence(10)) == b""
+    assert gate.stats.silent_frames == 10
+    # three frames wait in the pre-roll, the rest are gone for good
+    assert gate.stats.bytes_dropped == FRAME_BYTES * 7
+
+
+def test_speech_onset_carries_the_preroll(gate):
+    gate.process(silence(10))
+    out = gate.process(speech(2))
+    assert out == silence(3) + speech(2)
+    assert gate.stats.speech_frames == 2
+
+
+def test_hangover_keeps_trailing_silence(gate):
+    gate.process(speech(1))
+    out = gate.process(silence(5))
+    # the speech frame itself counts as the first of the three hangover frames
+    assert out == silence(2)
+
+
+def test_everything_is_forwarded_during_a_turn(gate):
+    gate.in_turn = True
+    assert gate.process(silence(4)) == silence(4)
+    assert gate.stats.bytes_dropped == 0
+
+
+def test_partial_frames_wait_for_the_rest(gate):
+    half = FRAME_BYTES // 2
+    chunk = speech(1)
+    assert gate.process(chunk[:half]) == b""
+    assert gate.process(chunk[half:]) == chunk
+
+
+def test_byte_accounting_never_goes_backwards(gate):
+    # sent + dropped + what the gate still holds always adds up to what came in
+    sent = 0
+    for chunk in (silence(10), speech(2), silence(8), speech(1), silence(20)):
+        dropped = gate.stats.bytes_dropped
+        sent += len(gate.process(chunk))
+        assert gate.stats.bytes_dropped >= dropped
+        held = len(gate._remainder) + sum(len(frame) for frame in gate._preroll)
+        assert sent + gate.stats.bytes_dropped + held == gate.stats.bytes_in
+    assert gate.stats.bytes_sent == sent
+
+
+def test_noise_floor_follows_background_noise(gate):
+    rng = np.random.default_rng(0)
+    noise = rng.normal(0, 100, FRAME_BYTES // 2 * 50).astype("<i2").tobytes()
+    before = gate.noise_floor_dbfs
+    gate.process(noise)
+    assert gate.noise_floor_dbfs > before
+
+
+def test_flush_sends_the_tail_while_the_gate_is_open(gate):
+    gate.in_turn = True
+    tail = silence()[:100]
+    assert gate.process(tail) == b""
+    assert gate.flush() == tail
+    assert gate.flush() == b""
+
+
+def test_flush_drops_the_tail_between_turns(gate):
+    gate.process(silence(5))
+    gate.process(silence()[:100])
+    assert gate.flush() == b""
+    assert gate.stats.bytes_dropped == FRAME_BYTES * 2 + 100
+
+
+def test_framer_yields_whole_frames_without_copying():
+    framer = PCMFramer(frame_ms=20, sample_rate=SAMPLE_RATE)
+    chunk = bytes(range(256)) * 10  # 2560 bytes: four frames
+    frames = list(framer.push(chunk))
+    assert [bytes(frame) for frame in frames] == [chunk[i:i + 640] for i in range(0, 2560, 640)]
+    assert all(frame.obj is chunk for frame in frames)
+    assert framer.flush() is None
+
+
+def test_framer_joins_frames_across_chunks():
+    framer = PCMFramer(frame_ms=20, sample_rate=SAMPLE_RATE)
+    data = bytes(range(256)) * 6  # 1536 bytes
+    frames = list(framer.push(data[:500])) + list(framer.push(data[500:1000])) + list(framer.push(data[1000:]))
+    assert [len(frame) for frame in frames] == [640, 640]
+    assert b"".join(frames) == data[:1280]
+    # the straddling frame is copied out, so later pushes cannot change it
+    first = bytes(frames[0])
+    assert list(framer.push(bytes(100))) == []
+    assert bytes(frames[0]) == first
+    assert framer.flush() == data[1280:] + bytes(100)
+    assert framer.flush() is None
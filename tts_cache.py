@@ -0,0 +1,152 @@
+"""
+Docstring for tts_cache
+
+Phrase-level cache of synthesized TTS audio.
+
+Agent openings and closings repeat almost word for word across interviews, so
+the PCM for each flushed phrase is kept under a content hash of
+(provider, voice, model, sample rate, normalized text). Only phrases that
+recur are stored: a phrase's audio is cached once it has been synthesized
+TTS_CACHE_MIN_OCCURRENCES times, so lines personalized with a candidate's
+name or answers do not fill the cache. There are two tiers:
+
+- memory: a ContentStore LRU local to the process.
+- disk (optional, TTS_CACHE_DIR): one raw PCM file per phrase. Files are
+  memory-mapped on read so frames are served straight from the page cache.
+  They survive restarts and are shared by every worker on the host. Past
+  TTS_CACHE_DIR_MAX_MB the least recently used files are deleted.
+"""
+
+import asyncio
+import contextlib
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional
+
+from loguru import logger
+
+from assets import ContentStore, content_id
+from settings import settings
+
+
+def normalize_phrase(text: str) -> str:
+    """Collapse whitespace; case and punctuation are kept since they change the audio."""
+    return " ".join(text.split())
+
+
+def phrase_key(provider: str, voice: str, model: str, sample_rate: int, text: str) -> str:
+    raw = "\x1f".join((provider, voice, model, str(sample_rate), normalize_phrase(text)))
+    return content_id(raw.encode("utf-8"))
+
+
+class TTSCache:
+    """Two-tier (memory LRU, optional mmap'd files) store of PCM by phrase key."""
+
+    def __init__(self, memory_items: int, directory: Optional[str] = None, max_chars: int = 200,
+                 min_occurrences: int = 2, max_disk_bytes: Optional[int] = None):
+        self.max_chars = max_chars
+        self.min_occurrences = min_occurrences
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: ContentStore[bytes] = ContentStore(memory_items)
+        # times each recently synthesized, not yet cached phrase was seen
+        self._seen: ContentStore[int] = ContentStore(memory_items * 4)
+        # open maps of disk entries, bounded like the memory tier
+        self._mapped: ContentStore[mmap.mmap] = ContentStore(memory_items, on_evict=self._unmap)
+        self.directory = Path(directory) if directory else None
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def cacheable(self, text: str) -> bool:
+        return 0 < len(normalize_phrase(text)) <= self.max_chars
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pcm"
+
+    def get(self, key: str) -> Optional[memoryview]:
+        audio = self._memory.get(key)
+        if audio is None and self.directory:
+            audio = self._mapped.get(key) or self._map(key)
+        if audio is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return memoryview(audio)
+
+    def _map(self, key: str) -> Optional[mmap.mmap]:
+        try:
+            with open(self._path(key), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # ValueError: empty file
+            return None
+        with contextlib.suppress(OSError):
+            # mark the file recently used for disk eviction
+            os.utime(self._path(key))
+        self._mapped.put(key, mapped)
+        return mapped
+
+    @staticmethod
+    def _unmap(key: str, mapped: mmap.mmap) -> None:
+        # frames of the phrase may still be queued for a client; the map is
+        # then released with the last of them
+        with contextlib.suppress(BufferError):
+            mapped.close()
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Record one synthesis of a phrase; its audio is stored once the phrase recurs."""
+        if not audio or key in self._memory:
+            return
+        seen = (self._seen.get(key) or 0) + 1
+        if seen < self.min_occurrences:
+            self._seen.put(key, seen)
+            return
+        self._memory.put(key, audio)
+        if self.directory and not self._path(key).exists():
+            asyncio.get_running_loop().run_in_executor(None, self._write, key, audio)
+
+    def _write(self, key: str, audio: bytes) -> None:
+        # write-then-rename so concurrent workers never map a partial file
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            logger.error(f"TTS cache: failed to write {key}: {e}")
+            return
+        if self.max_disk_bytes is not None:
+            self._evict_files()
+
+    def _evict_files(self) -> None:
+        """Delete the least recently used files until the directory fits max_disk_bytes."""
+        files = []
+        for path in self.directory.glob("*.pcm"):
+            with contextlib.suppress(FileNotFoundError):
+                stat = path.stat()
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda entry: entry[0]):
+            if total <= self.max_disk_bytes:
+                break
+            # another worker may have deleted it already; open maps stay valid
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+            total -= size
+
+
+def iter_frames(audio: memoryview, frame_bytes: int) -> Iterator[memoryview]:
+    """Zero-copy fixed-size slices of cached PCM."""
+    for offset in range(0, len(audio), frame_bytes):
+        yield audio[offset:offset + frame_bytes]
+
+
+tts_cache: Optional[TTSCache] = (
+    TTSCache(settings.TTS_CACHE_MEMORY_ITEMS, settings.TTS_CACHE_DIR, settings.TTS_CACHE_MAX_CHARS,
+             min_occurrences=settings.TTS_CACHE_MIN_OCCURRENCES,
+             max_disk_bytes=int(settings.TTS_CACHE_DIR_MAX_MB * 1024 * 1024))
+    if settings.TTS_CACHE_ENABLED else None
+)
@@ -6,13 +6,127 @@ and other common operations across the voice agent system.
 """
 
 import asyncio
-from typing import Any, AsyncIterator, TypeVar
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Generic, Hashable, Optional, TypeVar
 
 
 T = TypeVar("T")
 
+# Punctuation followed by whitespace marks a point where TTS can start speaking.
+_SENTENCE_BOUNDARY = re.compile(r"[.!?]+[\"')\]]*\s+")
+_CLAUSE_BOUNDARY = re.compile(r"[,;:\u2014]\s+")
 
-async def merge_async_iters(*aiters: AsyncIterator[T]) -> AsyncIterator[T]:
+
+@dataclass
+class QueueStats:
+    """Counters describing how a BoundedQueue behaved over its lifetime."""
+    enqueued: int = 0
+    coalesced: int = 0
+    max_depth: int = 0
+    total_wait: float = 0.0  # seconds items spent queued, summed
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        dequeued = self.enqueued - self.coalesced
+        return self.total_wait / dequeued if dequeued else 0.0
+
+
+class BoundedQueue(Generic[T]):
+    """
+    asyncio queue with a high-water mark, coalescing and stats.
+
+    - `maxsize`: producers block in `put` while this many items are queued,
+      so a slow consumer pushes back on its producers instead of letting
+      memory grow (0 means unbounded).
+    - `bypass(item)`: items for which this returns True never wait for space,
+      so small control events are not stuck behind a backlog of audio.
+    - `coalesce_key(item)`: items with a non-None key replace a still-queued
+      item with the same key instead of being appended, e.g. a newer partial
+      transcript supersedes an older one.
+    - `observer(wait_seconds, depth)`: called for every dequeued item.
+
+    `put(item, force=True)` skips both the high-water mark and coalescing, for
+    control items such as end-of-stream markers.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        bypass: Optional[Callable[[T], bool]] = None,
+        coalesce_key: Optional[Callable[[T], Optional[Hashable]]] = None,
+        observer: Optional[Callable[[float, int], None]] = None,
+    ):
+        self.maxsize = maxsize
+        self.bypass = bypass
+        self.coalesce_key = coalesce_key
+        self.observer = observer
+        self.stats = QueueStats()
+        # entries are [item, enqueued_at, coalesce key]
+        self._items: deque[list] = deque()
+        self._keyed: dict[Hashable, list] = {}
+        self._cond = asyncio.Condition()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    async def put(self, item: T, force: bool = False) -> None:
+        async with self._cond:
+            key = self.coalesce_key(item) if self.coalesce_key and not force else None
+            if key is not None and key in self._keyed:
+                self._keyed[key][0] = item
+                self.stats.enqueued += 1
+                self.stats.coalesced += 1
+                return
+
+            if self.maxsize > 0 and not force and not (self.bypass and self.bypass(item)):
+                await self._cond.wait_for(lambda: len(self._items) < self.maxsize)
+
+            entry = [item, time.monotonic(), key]
+            self._items.append(entry)
+            if key is not None:
+                self._keyed[key] = entry
+            self.stats.enqueued += 1
+            self.stats.max_depth = max(self.stats.max_depth, len(self._items))
+            self._cond.notify_all()
+
+    async def get(self) -> T:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._items)
+            entry = self._items.popleft()
+            item, enqueued_at, key = entry
+            if key is not None and self._keyed.get(key) is entry:
+                del self._keyed[key]
+
+            wait = time.monotonic() - enqueued_at
+            self.stats.total_wait += wait
+            self.stats.max_wait = max(self.stats.max_wait, wait)
+            if self.observer:
+                self.observer(wait, len(self._items))
+
+            self._cond.notify_all()
+            return item
+
+    async def purge(self, predicate: Callable[[T], bool]) -> int:
+        """Drop every queued item matching `predicate`; returns how many were dropped."""
+        async with self._cond:
+            kept: deque[list] = deque()
+            for entry in self._items:
+                if predicate(entry[0]):
+                    if entry[2] is not None and self._keyed.get(entry[2]) is entry:
+                        del self._keyed[entry[2]]
+                else:
+                    kept.append(entry)
+            purged = len(self._items) - len(kept)
+            self._items = kept
+            self._cond.notify_all()
+            return purged
+
+
+async def merge_async_iters(*aiters: AsyncIterator[T], queue: Optional[BoundedQueue] = None) -> AsyncIterator[T]:
     """
     Merge multiple async iterators into a single async iterator.
 
@@ -28,6 +142,8 @@ async def merge_async_iters(*aiters: AsyncIterator[T]) -> AsyncIterator[T]:
 
     Args:
         *aiters: Variable number of async iterators to merge.
+        queue: Optional BoundedQueue to merge through, to bound memory and
+            apply a bypass/coalescing policy. Defaults to an unbounded queue.
 
     Yields:
         Items from any of the input iterators, in the order they become
@@ -43,13 +159,15 @@ async def merge_async_iters(*aiters: AsyncIterator[T]) -> AsyncIterator[T]:
         >>> async for item in merge_async_iters(iter1(), iter2()):
         ...     print(item)  # Could print: 1, 'a', 2, 'b' (order may vary)
     """
-    queue: asyncio.Queue[Any] = asyncio.Queue()
     sentinel = object()
+    if queue is None:
+        queue = BoundedQueue()
 
     async def producer(aiter: AsyncIterator[Any]) -> None:
         async for item in aiter:
             await queue.put(item)
-        await queue.put(sentinel)
+        # the end-of-stream marker must never block or be coalesced away
+        await queue.put(sentinel, force=True)
 
     async with asyncio.TaskGroup() as tg:
         for aiter in aiters:
@@ -61,4 +179,38 @@ async def merge_async_iters(*aiters: AsyncIterator[T]) -> AsyncIterator[T]:
             if item is sentinel:
                 finished += 1
             else:
-                yield item
\ No newline at end of file
+                yield item
+
+
+def split_speakable(text: str, min_clause_chars: int = 40) -> tuple[str, str]:
+    """
+    Split streamed LLM text into a prefix that is ready to be spoken and the
+    remainder that should keep buffering.
+
+    The prefix ends at the last sentence boundary in ``text``. When there is no
+    sentence boundary yet, it falls back to the last clause boundary (comma,
+    semicolon, colon, dash) once at least ``min_clause_chars`` characters have
+    accumulated, so long opening sentences still start speaking early.
+
+    Args:
+        text: Buffered text received so far.
+        min_clause_chars: Minimum prefix length before splitting on a clause.
+
+    Returns:
+        A ``(speakable, remainder)`` tuple. ``speakable`` is empty when no
+        boundary has been reached yet.
+
+    Example:
+        >>> split_speakable("Hello there. How are")
+        ('Hello there. ', 'How are')
+    """
+    cut = 0
+    for match in _SENTENCE_BOUNDARY.finditer(text):
+        cut = match.end()
+
+    if not cut and len(text) >= min_clause_chars:
+        for match in _CLAUSE_BOUNDARY.finditer(text):
+            if match.end() >= min_clause_chars:
+                cut = match.end()
+
+    return text[:cut], text[cut:]
@@ -0,0 +1,175 @@
+"""
+Docstring for vad
+
+Uplink audio processing before STT: fixed-size framing, and energy-based
+voice activity detection that gates silence.
+
+The silence gate cuts audio into frames and computes each frame's RMS level in one
+vectorized pass per chunk. A frame counts as speech when it is louder than
+both an absolute threshold and an adaptive noise floor plus a margin. Silence
+is only dropped between candidate turns. Once the STT reports a start of turn,
+every frame is forwarded until its end of turn, because end-of-turn detection
+needs to hear the trailing silence. A short pre-roll is kept so that speech
+onsets are not clipped.
+
+Input: PCM 16-bit mono audio (bytes)
+Output: the parts of that audio worth sending to the STT provider
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+class PCMFramer:
+    """
+    Re-chunks a PCM byte stream into fixed-duration frames.
+
+    Whole frames inside an incoming chunk are yielded as memoryviews of that
+    chunk, so they are not copied. Only the bytes that straddle two chunks go
+    through one preallocated frame buffer.
+    """
+
+    def __init__(self, frame_ms: int = 40, sample_rate: int = 16000, sample_width: int = 2):
+        self.frame_bytes = sample_rate * frame_ms // 1000 * sample_width
+        self._buffer = bytearray(self.frame_bytes)
+        self._view = memoryview(self._buffer)
+        self._filled = 0
+
+    def push(self, chunk: bytes) -> Iterator[memoryview]:
+        data = memoryview(chunk)
+
+        if self._filled:
+            # complete the frame left over from the previous chunk
+            take = min(len(data), self.frame_bytes - self._filled)
+            self._view[self._filled:self._filled + take] = data[:take]
+            self._filled += take
+            data = data[take:]
+            if self._filled < self.frame_bytes:
+                return
+            self._filled = 0
+            # the buffer is reused, so this one frame has to be copied out
+            yield memoryview(bytes(self._view))
+
+        whole = len(data) - len(data) % self.frame_bytes
+        for offset in range(0, whole, self.frame_bytes):
+            yield data[offset:offset + self.frame_bytes]
+
+        tail = len(data) - whole
+        self._view[:tail] = data[whole:]
+        self._filled = tail
+
+    def flush(self) -> Optional[bytes]:
+        """The partial frame still buffered, if any."""
+        if not self._filled:
+            return None
+        tail = bytes(self._view[:self._filled])
+        self._filled = 0
+        return tail
+
+
+@dataclass
+class GateStats:
+    """Per-session counters of audio seen and forwarded to STT."""
+    bytes_in: int = 0
+    bytes_sent: int = 0
+    bytes_dropped: int = 0  # silence that fell out of the pre-roll, never to be sent
+    speech_frames: int = 0
+    silent_frames: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_sent
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.bytes_saved / self.bytes_in if self.bytes_in else 0.0
+
+
+class SilenceGate:
+    """Drops silent 16-bit PCM frames between turns, keeping a pre-roll and a hangover."""
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        threshold_dbfs: float = -50.0,
+        noise_margin_db: float = 10.0,
+        hangover_ms: int = 600,
+        preroll_ms: int = 200,
+    ):
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.threshold_dbfs = threshold_dbfs
+        self.noise_margin_db = noise_margin_db
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.noise_floor_dbfs = threshold_dbfs - noise_margin_db
+        # set by the STT stage between StartOfTurn and EndOfTurn
+        self.in_turn = False
+        self.stats = GateStats()
+        self._remainder = b""
+        self._preroll: deque[bytes] = deque(maxlen=max(1, preroll_ms // frame_ms))
+        self._hangover = 0
+
+    def _levels_dbfs(self, frames: np.ndarray) -> np.ndarray:
+        samples = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        return 20 * np.log10(np.maximum(rms, 1.0) / 32768.0)
+
+    def process(self, chunk: bytes | memoryview) -> bytes:
+        """Return the audio from `chunk` (plus any pre-roll) that should be sent."""
+        self.stats.bytes_in += len(chunk)
+        # frames from PCMFramer line up exactly, so nothing needs joining
+        data = self._remainder + chunk if self._remainder else chunk
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = bytes(data[usable:])
+        if not usable:
+            return b""
+
+        frames = np.frombuffer(data[:usable], dtype="<i2").reshape(-1, self.frame_bytes // 2)
+        levels = self._levels_dbfs(frames)
+        speech = levels > max(self.threshold_dbfs, self.noise_floor_dbfs + self.noise_margin_db)
+
+        # the noise floor follows the quietest non-speech frames
+        quiet = levels[~speech]
+        if quiet.size:
+            self.noise_floor_dbfs = 0.95 * self.noise_floor_dbfs + 0.05 * float(np.median(quiet))
+
+        self.stats.speech_frames += int(speech.sum())
+        self.stats.silent_frames += int(speech.size - speech.sum())
+
+        out = bytearray()
+        view = memoryview(data)
+        for index, is_speech in enumerate(speech):
+            frame = view[index * self.frame_bytes:(index + 1) * self.frame_bytes]
+            if is_speech:
+                self._hangover = self.hangover_frames
+            elif self._hangover:
+                self._hangover -= 1
+
+            if is_speech or self._hangover or self.in_turn:
+                while self._preroll:
+                    out += self._preroll.popleft()
+                out += frame
+            else:
+                if len(self._preroll) == self._preroll.maxlen:
+                    self.stats.bytes_dropped += len(self._preroll[0])
+                self._preroll.append(bytes(frame))
+
+        self.stats.bytes_sent += len(out)
+        return bytes(out)
+
+    def flush(self) -> bytes:
+        """
+        The partial frame left over from `process`, once no more audio follows.
+
+        It is sent if the gate is open (in a turn or in the hangover) and
+        dropped otherwise.
+        """
+        tail, self._remainder = self._remainder, b""
+        if self.in_turn or self._hangover:
+            self.stats.bytes_sent += len(tail)
+            return tail
+        self.stats.bytes_dropped += len(tail)
+        return b""
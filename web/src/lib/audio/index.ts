@@ -1,2 +1,9 @@
 export { createAudioCapture, type AudioCapture } from "./capture";
-export { createAudioPlayback, type AudioPlayback } from "./playback"
\ No newline at end of file
+export { createAudioPlayback, type AudioPlayback } from "./playback"
+export {
+    createOpusDownlink,
+    createOpusUplink,
+    opusSupported,
+    type OpusDownlink,
+    type OpusUplink,
+} from "./opus";
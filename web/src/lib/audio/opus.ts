@@ -0,0 +1,108 @@
+// Opus over the session socket, using the browser's WebCodecs encoder/decoder.
+// Uplink: one raw Opus packet per binary message (16 kHz mono).
+// Downlink: each audio frame's payload is a run of packets, each prefixed with
+// its uint16 little-endian length (see codec.py), decoded to 24 kHz Int16 PCM.
+
+const UPLINK_SAMPLE_RATE = 16000;
+const DOWNLINK_SAMPLE_RATE = 24000;
+
+export function opusSupported(): boolean {
+    return typeof AudioEncoder !== "undefined" && typeof AudioDecoder !== "undefined";
+}
+
+export interface OpusUplink {
+    encode: (pcm: ArrayBuffer) => void;
+    close: () => void;
+}
+
+export function createOpusUplink(onPacket: (packet: ArrayBuffer) => void): OpusUplink {
+    let timestampUs = 0;
+    const encoder = new AudioEncoder({
+        output: (chunk) => {
+            const packet = new ArrayBuffer(chunk.byteLength);
+            chunk.copyTo(packet);
+            onPacket(packet);
+        },
+        error: (e) => console.error("Opus encoder error", e),
+    });
+    encoder.configure({
+        codec: "opus",
+        sampleRate: UPLINK_SAMPLE_RATE,
+        numberOfChannels: 1,
+        bitrate: 24000,
+    });
+
+    function encode(pcm: ArrayBuffer): void {
+        if (encoder.state !== "configured") return;
+        const numberOfFrames = pcm.byteLength / 2;
+        const data = new AudioData({
+            format: "s16",
+            sampleRate: UPLINK_SAMPLE_RATE,
+            numberOfChannels: 1,
+            numberOfFrames,
+            timestamp: timestampUs,
+            data: pcm,
+        });
+        timestampUs += (numberOfFrames / UPLINK_SAMPLE_RATE) * 1e6;
+        encoder.encode(data);
+        data.close();
+    }
+
+    function close(): void {
+        if (encoder.state !== "closed") encoder.close();
+    }
+
+    return { encode, close };
+}
+
+export interface OpusDownlink {
+    decode: (payload: ArrayBuffer) => void;
+    close: () => void;
+}
+
+export function createOpusDownlink(onPcm: (pcm: ArrayBuffer) => void): OpusDownlink {
+    let timestampUs = 0;
+    const decoder = new AudioDecoder({
+        output: (audio) => {
+            const samples = new Float32Array(audio.numberOfFrames);
+            audio.copyTo(samples, { planeIndex: 0, format: "f32-planar" });
+            audio.close();
+            const pcm = new Int16Array(samples.length);
+            for (let i = 0; i < samples.length; i++) {
+                const s = Math.max(-1, Math.min(1, samples[i]));
+                pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+            }
+            onPcm(pcm.buffer);
+        },
+        error: (e) => console.error("Opus decoder error", e),
+    });
+    decoder.configure({
+        codec: "opus",
+        sampleRate: DOWNLINK_SAMPLE_RATE,
+        numberOfChannels: 1,
+    });
+
+    function decode(payload: ArrayBuffer): void {
+        if (decoder.state !== "configured") return;
+        const view = new DataView(payload);
+        let offset = 0;
+        while (offset + 2 <= payload.byteLength) {
+            const length = view.getUint16(offset, true);
+            offset += 2;
+            decoder.decode(new EncodedAudioChunk({
+                type: "key",
+                timestamp: timestampUs,
+                data: payload.slice(offset, offset + length),
+            }));
+            offset += length;
+            // nominal; playback schedules by sample count, not by timestamp
+            timestampUs += 20000;
+        }
+    }
+
+    function close(): void {
+        if (decoder.state !== "closed") decoder.close();
+    }
+
+    return { decode, close };
+}
@@ -4,7 +4,7 @@ import { writable, type Writable } from "svelte/store";
 const SAMPLE_RATE = 24000;
 
 export interface AudioPlayback {
-  push: (pcmBase64: string) => void;
+  push: (pcm: string | ArrayBuffer) => void;
   stop: () => void;
   resetScheduling: () => void;
   visualizerStore: Writable<{ ctx: AudioContext | null; node: GainNode | null }>;
@@ -21,7 +21,7 @@ export function createAudioPlayback(): AudioPlayback {
 
   let nextPlayTime = 0;
   let sourceQueue: AudioBufferSourceNode[] = [];
-  let base64Queue: string[] = [];
+  let pcmQueue: (string | ArrayBuffer)[] = [];
   let isProcessing = false;
 
   function ensureContext(): AudioContext {
@@ -89,12 +89,15 @@ export function createAudioPlayback(): AudioPlayback {
     if (isProcessing) return;
     isProcessing = true;
 
-    while (base64Queue.length > 0) {
-      const base64 = base64Queue.shift();
-      if (!base64) break;
+    while (pcmQueue.length > 0) {
+      const pcm = pcmQueue.shift();
+      if (!pcm) break;
 
       const ctx = ensureContext();
-      const { arrayBuffer, length } = pcmBase64ToArrayBuffer(base64);
+      // Binary frames arrive as raw PCM; JSON frames still carry base64
+      const { arrayBuffer, length } = typeof pcm === "string"
+        ? pcmBase64ToArrayBuffer(pcm)
+        : { arrayBuffer: pcm, length: pcm.byteLength };
       const audioBuffer = createAudioBuffer(arrayBuffer, length);
 
       const source = ctx.createBufferSource();
@@ -122,13 +125,13 @@ export function createAudioPlayback(): AudioPlayback {
     isProcessing = false;
   }
 
-  function push(pcmBase64: string): void {
-    base64Queue.push(pcmBase64);
+  function push(pcm: string | ArrayBuffer): void {
+    pcmQueue.push(pcm);
     processQueue();
   }
 
   function stop(): void {
-    base64Queue = [];
+    pcmQueue = [];
 
     for (const source of sourceQueue) {
       try {
@@ -3,7 +3,7 @@ export type ServerEvent =
   | { type: "stt_chunk"; timestamp: number; text: string }
   | { type: "stt_output"; timestamp: number; text: string }
   | { type: "agent_trigger"; timestamp: number; text: string}
-  | { type: "agent_chunk"; timestamp: number; text: string }
+  | { type: "agent_chunk"; timestamp: number; text: string; turn_id: number }
   | {
       type: "tool_call";
       timestamp: number;
@@ -17,9 +17,12 @@ export type ServerEvent =
       args: Record<string, unknown>;
     }
 
-  | { type: "agent_end"; timestamp: number; text: string }
-  | { type: "tts_chunk"; audio_data: string; timestamp: number }
-  | { type: "interrupt"; timestamp: number };
+  | { type: "agent_end"; timestamp: number; text: string; turn_id: number }
+  | { type: "tts_chunk"; audio_data: string | ArrayBuffer; timestamp: number; turn_id: number; seq?: number; opus?: boolean }
+  | { type: "interrupt"; timestamp: number }
+  | { type: "audio_flush"; timestamp: number; turn_id: number }
+  | { type: "turn_metrics"; timestamp: number; turn_id: number; stages_ms: Record<string, number> }
+  | { type: "session"; timestamp: number; session_id: string; resume_token: string; resumed: boolean; audio_codec: "pcm" | "opus" };
 
 // Session state
 export interface SessionState {
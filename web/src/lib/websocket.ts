@@ -10,9 +10,63 @@ import {
     resumeStore
 } from "./stores";
 
-import { createAudioCapture, createAudioPlayback } from "./audio";
+import {
+    createAudioCapture,
+    createAudioPlayback,
+    createOpusDownlink,
+    createOpusUplink,
+    opusSupported,
+    type OpusDownlink,
+    type OpusUplink,
+} from "./audio";
 import { get, type Writable } from "svelte/store";
 
+// Binary audio frame layout (must match FRAME_HEADER in events.py)
+const FRAME_HEADER_SIZE = 16;
+const FRAME_TYPES: Record<number, "tts_chunk"> = { 1: "tts_chunk" };
+const FRAME_FLAG_OPUS = 0x02;
+
+function parseBinaryFrame(data: ArrayBuffer): ServerEvent | null {
+    if (data.byteLength < FRAME_HEADER_SIZE) return null;
+    const view = new DataView(data);
+    const type = FRAME_TYPES[view.getUint8(0)];
+    if (!type) return null;
+    return {
+        type,
+        opus: (view.getUint8(1) & FRAME_FLAG_OPUS) !== 0,
+        turn_id: view.getUint16(2, true),
+        seq: view.getUint32(4, true),
+        timestamp: Number(view.getBigUint64(8, true)),
+        audio_data: data.slice(FRAME_HEADER_SIZE),
+    };
+}
+
+// Reconnect attempts after an unexpected close; the server parks the session
+// for SESSION_GRACE_SECONDS (30s by default), so keep retrying within that.
+const RECONNECT_DELAYS_MS = [250, 500, 1000, 2000, 4000, 8000, 8000];
+const ACK_INTERVAL_MS = 1000;
+
+interface SessionAssets {
+    job_description_id?: string;
+    resume_id?: string;
+}
+
+// Upload the JD and resume once over REST so the WebSocket init only carries IDs
+async function uploadSessionAssets(jobDescription: string, resumeBase64: string): Promise<SessionAssets | null> {
+    const apiUrl = import.meta.env.VITE_API_URL || "http://localhost:8000";
+    try {
+        const res = await fetch(`${apiUrl}/assets`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ job_description: jobDescription, resume_base64: resumeBase64 }),
+        });
+        if (!res.ok) return null;
+        return await res.json();
+    } catch {
+        return null;
+    }
+}
+
 export interface VoiceSession {
     start: (durationMins?: number) => Promise<void>;
     stop: () => void;
@@ -24,6 +78,20 @@ export function createVoiceSession(): VoiceSession {
     let ttsFinishTimeout: ReturnType<typeof setTimeout> | null = null;
     let sessionUnsubscribe: (() => void) | null = null;
 
+    // Reconnect state: the server's session credentials and the last message seen
+    let sessionId: string | null = null;
+    let resumeToken: string | null = null;
+    let lastSeq = -1;
+    let ackedSeq = -1;
+    let ackTimer: ReturnType<typeof setInterval> | null = null;
+    let reconnectAttempt = 0;
+    let stopping = false;
+
+    // Negotiated per socket: audio is held back until the session event says how to encode it
+    let sessionReady = false;
+    let uplink: OpusUplink | null = null;
+    let downlink: OpusDownlink | null = null;
+
     const audioCapture = createAudioCapture()
     const audioPlayback = createAudioPlayback()
 
@@ -91,10 +159,19 @@ export function createVoiceSession(): VoiceSession {
                 }
                 break;
 
+            case "audio_flush":
+                // Server-side barge-in: drop whatever agent audio is still buffered
+                audioPlayback.stop();
+                break;
+
             case "tts_chunk":
                 // console.log("Current turn state:", currentTurnstate);
                 currentTurn.ttsChunk(event.timestamp)
-                audioPlayback.push(event.audio_data)
+                if (event.opus) {
+                    downlink?.decode(event.audio_data as ArrayBuffer);
+                } else {
+                    audioPlayback.push(event.audio_data)
+                }
 
                 if (ttsFinishTimeout) clearTimeout(ttsFinishTimeout);
                 ttsFinishTimeout = setTimeout(() => {
@@ -105,11 +182,41 @@ export function createVoiceSession(): VoiceSession {
                 }, 300);
                 break;
 
+            case "turn_metrics":
+                logs.log(
+                    `Turn ${event.turn_id}: ` +
+                    Object.entries(event.stages_ms).map(([stage, ms]) => `${stage} ${ms}ms`).join(", ")
+                );
+                break;
+
+            case "session":
+                sessionId = event.session_id;
+                resumeToken = event.resume_token;
+                closeCodecs();
+                if (event.audio_codec === "opus") {
+                    uplink = createOpusUplink((packet) => {
+                        if (ws && ws.readyState == WebSocket.OPEN) {
+                            ws.send(packet);
+                        }
+                    });
+                    downlink = createOpusDownlink((pcm) => audioPlayback.push(pcm));
+                }
+                sessionReady = true;
+                logs.log(`${event.resumed ? "Resumed" : "Started"} session ${event.session_id}`);
+                break;
+
         }
     }
 
 
 
+    function closeCodecs() {
+        uplink?.close();
+        downlink?.close();
+        uplink = null;
+        downlink = null;
+    }
+
     function finishTurn() {
         const turn = get(currentTurn);
         waterfallData.set({ ...turn });
@@ -128,10 +235,31 @@ export function createVoiceSession(): VoiceSession {
         logs.clear();
 
         session.setStatus("connecting");
+        stopping = false;
+        sessionId = null;
+        resumeToken = null;
+        lastSeq = -1;
+        ackedSeq = -1;
+        reconnectAttempt = 0;
+
+        const jobDescForUpload = get(jobDescStore);
+        const resumeForUpload = get(resumeStore);
+        const assets = jobDescForUpload.description
+            ? await uploadSessionAssets(jobDescForUpload.description, resumeForUpload.fileBase64 || "")
+            : null;
+        if (jobDescForUpload.description && !assets) {
+            logs.log("Asset upload failed, sending job description inline.");
+        }
+
+        connect(assets, durationMins, false);
+    }
 
+    function connect(assets: SessionAssets | null, durationMins: number, resuming: boolean): void {
         // connect websocket
         const wsUrl = import.meta.env.VITE_WS_URL || "ws://localhost:8000/ws";
         ws = new WebSocket(wsUrl);
+        sessionReady = false;
+        const audioCodec = opusSupported() ? "opus" : "pcm";
 
         console.log("WebSocket connecting...", ws);
 
@@ -141,6 +269,20 @@ export function createVoiceSession(): VoiceSession {
         console.log(ws.binaryType)
 
         ws.onopen = async () => {
+            if (resuming) {
+                // Reattach to the parked session; the server replays what we missed
+                ws?.send(JSON.stringify({
+                    type: "init",
+                    session_id: sessionId,
+                    resume_token: resumeToken,
+                    last_seq: lastSeq,
+                    audio_transport: "binary",
+                    audio_codec: audioCodec,
+                }));
+                reconnectAttempt = 0;
+                logs.log("Reconnected.");
+                return;
+            }
 
             try {
                 session.connect(durationMins);
@@ -149,16 +291,24 @@ export function createVoiceSession(): VoiceSession {
                 
                 if (jobDesc.description && ws && ws.readyState == WebSocket.OPEN) {
                     const resume = get(resumeStore);
+                    // Prefer uploaded asset IDs, fall back to inline payloads
+                    const payload = assets
+                        ? { ...assets }
+                        : {
+                            job_description: jobDesc.description || "",
+                            resume_base64: resume.fileBase64 || "",
+                        };
                     ws.send(JSON.stringify({
                         type: "init",
-                        job_description: jobDesc.description || "",
-                        resume_base64: resume.fileBase64 || "",
+                        ...payload,
                         duration: currentSession.duration || 0,
                         time_left: currentSession.remainingTime || 0,
+                        audio_transport: "binary",
+                        audio_codec: audioCodec,
                     }));
                 }
 
-                // Subscribe to session updates to send reactive time to the backend
+                // Stop when the session timer runs out; the server keeps its own interview clock
                 let lastRemaining = currentSession.remainingTime;
                 sessionUnsubscribe = session.subscribe(($s) => {
                     if (ws && ws.readyState === WebSocket.OPEN && lastRemaining !== $s.remainingTime) {
@@ -167,21 +317,26 @@ export function createVoiceSession(): VoiceSession {
                             console.log("Time left is 0, stopping session");
                             stop();
                             session.setStatus("disconnected");
-                            return;
                         }
-                        ws.send(JSON.stringify({
-                            type: "time_update",
-                            duration: $s.duration || 0,
-                            time_left: $s.remainingTime || 0,
-                        }));
                     }
                 });
 
+                // Acknowledge received messages so the server can drop them from its replay buffer
+                ackTimer = setInterval(() => {
+                    if (ws && ws.readyState === WebSocket.OPEN && lastSeq > ackedSeq) {
+                        ws.send(JSON.stringify({ type: "ack", seq: lastSeq }));
+                        ackedSeq = lastSeq;
+                    }
+                }, ACK_INTERVAL_MS);
+
                 logs.log("Session started.");
                 // console.log("WebSocket connected.");
                 try {
                     await audioCapture.start((chunk) => {
-                        if (ws && ws.readyState == WebSocket.OPEN) {
+                        if (!sessionReady) return;
+                        if (uplink) {
+                            uplink.encode(chunk);
+                        } else if (ws && ws.readyState == WebSocket.OPEN) {
                             ws.send(chunk);
                         }
                     });
@@ -206,12 +361,47 @@ export function createVoiceSession(): VoiceSession {
 
         ws.onmessage = async (event) => {
             // console.log("WebSocket message received:", event);
-            const eventData: ServerEvent = JSON.parse(event.data)
+            const eventData: ServerEvent | null = event.data instanceof ArrayBuffer
+                ? parseBinaryFrame(event.data)
+                : JSON.parse(event.data);
+            if (!eventData) return;
             // console.log("Parsed event data:", eventData);
+            // The session event is numbered ahead of the replay that follows it
+            const seq = eventData.type === "session" ? undefined : (eventData as { seq?: number }).seq;
+            if (seq !== undefined) {
+                // replayed after a reconnect but already handled
+                if (seq <= lastSeq) return;
+                lastSeq = seq;
+            }
             handleEvent(eventData);
         };
 
-        ws.onclose = () => {
+        ws.onclose = (event) => {
+            if (event.code === 1008 && resuming && !stopping) {
+                // the session expired or the server no longer knows it: start a new one
+                logs.log(`Resume refused (${event.reason}), starting a new session`);
+                sessionId = null;
+                resumeToken = null;
+                lastSeq = -1;
+                ackedSeq = -1;
+                reconnectAttempt = 0;
+                connect(assets, durationMins, false);
+                return;
+            }
+            if (event.code === 1008) {
+                // the server refused the session, e.g. its uploaded assets expired
+                logs.log(`Session refused: ${event.reason}`);
+                session.setStatus("error");
+                return;
+            }
+            if (!stopping && sessionId && reconnectAttempt < RECONNECT_DELAYS_MS.length) {
+                const delay = RECONNECT_DELAYS_MS[reconnectAttempt++];
+                logs.log(`WebSocket dropped, reconnecting in ${delay}ms`);
+                setTimeout(() => {
+                    if (!stopping) connect(assets, durationMins, true);
+                }, delay);
+                return;
+            }
             session.disconnect();
             logs.log("WebSocket disconnected");
             // console.log("websocket closed");
@@ -226,6 +416,12 @@ export function createVoiceSession(): VoiceSession {
 
     function stop(): void {
         logs.log("Session ended");
+        stopping = true;
+
+        if (ackTimer) {
+            clearInterval(ackTimer);
+            ackTimer = null;
+        }
 
         if (ttsFinishTimeout) {
             clearTimeout(ttsFinishTimeout);
@@ -234,8 +430,13 @@ export function createVoiceSession(): VoiceSession {
 
         audioCapture.stop()
         audioPlayback.stop()
+        closeCodecs();
 
         if (ws) {
+            // tell the server not to keep the session parked for a reconnect
+            if (ws.readyState === WebSocket.OPEN) {
+                ws.send(JSON.stringify({ type: "end" }));
+            }
             ws.close();
             ws = null;
             // console.log("WebSocket closed");